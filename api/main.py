@@ -1,15 +1,50 @@
-from contextlib import asynccontextmanager
+import asyncio
+import logging
+from contextlib import asynccontextmanager, suppress
 
 from fastapi import FastAPI
 
 from app.api import api_router
-from app.services.qdrant_client import init_collection
+from app.api.routes import orchestrator
+from app.config import settings
+from app.services import health, qdrant_client
+from app.services.audit_log import audit_log
+from app.services.reindex import watch_policy_docs
+from app.services.snapshot import restore_if_empty
+
+logger = logging.getLogger(__name__)
+
+
+async def prepare_index():
+    """Restore the snapshot into an empty collection, then ensure it exists"""
+    if settings.SNAPSHOT_RESTORE_ON_STARTUP:
+        try:
+            await restore_if_empty()
+        except Exception as e:
+            logger.error(f"Snapshot restore failed; starting with an empty index: {e}")
+    await qdrant_client.init_collection()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    init_collection()
+    await qdrant_client.connect()
+    await prepare_index()
+    # Pay for the first encode, search and DIAL handshake before taking traffic
+    await health.warm_up(orchestrator.llm_service)
+    if settings.AUDIT_LOG_ENABLED:
+        audit_log.start()
+    watcher = None
+    if settings.POLICY_WATCH_ENABLED:
+        watcher = asyncio.create_task(watch_policy_docs())
     yield
+    health.mark_stopping()
+    if watcher is not None:
+        watcher.cancel()
+        with suppress(asyncio.CancelledError):
+            await watcher
+    # Write out queued audit entries before the worker exits
+    await audit_log.stop()
+    await qdrant_client.close()
 
 
 app = FastAPI(title="Hate Speech Policy API", version="1.0", lifespan=lifespan)
@@ -0,0 +1,146 @@
+"""
+Pre-fork multi-worker server.
+
+    python -m api.serve --workers 4 --port 8000
+
+The parent process imports the app, loads the embedding model (and the
+cross-encoder when enabled), prepares the vector index once and binds the
+listening socket, then forks the workers. The model weights are shared
+copy-on-write, whereas `uvicorn --workers` starts fresh interpreters that
+each load their own copy. Workers that die are restarted.
+"""
+
+import argparse
+import asyncio
+import gc
+import logging
+import os
+import signal
+import socket
+import time
+
+import torch
+import uvicorn
+
+from api.main import app, prepare_index
+from app.config import settings
+from app.services import qdrant_client
+from app.services.embed_service import get_embedding_service
+from app.services.reranker import get_reranker
+
+logger = logging.getLogger(__name__)
+
+# Delay before restarting a worker that exited, so a crash loop stays cheap
+RESTART_DELAY_SECONDS = 1.0
+
+
+def preload_models() -> None:
+    """
+    Load model weights in the parent. No inference runs here: a torch/OpenMP
+    thread pool started before fork() is not usable in the children.
+    """
+    os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+    get_embedding_service()
+    reranker = get_reranker()
+    if reranker is not None:
+        reranker.load()
+
+
+async def _prepare() -> None:
+    # The connection is closed again so every worker opens its own pool
+    await qdrant_client.connect()
+    try:
+        await prepare_index()
+    finally:
+        await qdrant_client.close()
+
+
+def _bind(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(index: int, workers: int, sock: socket.socket) -> None:
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    # Split the cores between workers instead of every worker using all of them
+    torch.set_num_threads(max(1, (os.cpu_count() or 1) // workers))
+    if index > 0:
+        # One policy watcher (and so one reindexer) per deployment
+        settings.POLICY_WATCH_ENABLED = False
+
+    config = uvicorn.Config(app, log_level="info")
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def serve(host: str, port: int, workers: int, preload: bool = True) -> None:
+    if preload:
+        preload_models()
+        asyncio.run(_prepare())
+        # Keep the garbage collector from touching (and so copying) shared pages
+        gc.freeze()
+    sock = _bind(host, port)
+
+    children = {}
+    stopping = False
+
+    def spawn(index: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            status = 0
+            try:
+                _run_worker(index, workers, sock)
+            except BaseException:
+                logger.exception(f"Worker {index} failed")
+                status = 1
+            finally:
+                os._exit(status)
+        children[pid] = index
+        logger.info(f"Started worker {index} (pid {pid})")
+
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for index in range(workers):
+        spawn(index)
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        index = children.pop(pid, None)
+        if index is not None and not stopping:
+            logger.warning(f"Worker {index} (pid {pid}) exited ({status}); restarting")
+            time.sleep(RESTART_DELAY_SECONDS)
+            spawn(index)
+    sock.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Serve the API from several forked workers sharing one model"
+    )
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=settings.API_WORKERS)
+    parser.add_argument(
+        "--no-preload",
+        action="store_true",
+        help="load the models in each worker instead (for comparison)",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    serve(args.host, args.port, args.workers, preload=not args.no_preload)
@@ -1,4 +1,7 @@
+import asyncio
 import logging
+import time
+from typing import List, Optional
 
 from app.agents.classification_agent import ClassificationAgent
 from app.agents.reasoner import PolicyReasoner
@@ -14,7 +17,10 @@ from app.models.schemas import (
     PolicySummary,
     SeverityLevel,
 )
+from app.services.audit_log import audit_log
 from app.services.llm_services import DIALService
+from app.services.profiler import stage
+from app.services.vector_store import PayloadFilter
 
 logger = logging.getLogger(__name__)
 
@@ -23,54 +29,124 @@ class HateSpeechOrchestrator:
     """Coordinates classification, retrieval, reasoning, and action recommendation."""
 
     def __init__(self):
-        llm_service = DIALService()
-        self.detector = ClassificationAgent(llm_service)
+        self.llm_service = DIALService()
+        self.detector = ClassificationAgent(self.llm_service)
         self.retriever = HybridRetriever()
-        self.reasoner = PolicyReasoner(llm_service)
+        self.reasoner = PolicyReasoner(self.llm_service)
         self.recommender = ActionRecommender()
         self.error_handler = ErrorHandlerAgent()
 
-    async def run(self, text: str) -> DetailedAnalyzeResponse:
-        """Main pipeline for analyzing input text."""
+    async def run(
+        self, text: str, filters: Optional[PayloadFilter] = None
+    ) -> DetailedAnalyzeResponse:
+        """
+        Main pipeline for analyzing input text. `filters` restricts policy
+        retrieval (e.g. to the caller's platform).
+        """
         validation_result = self.error_handler.validate_input(text)
         if not validation_result["valid"]:
             raise ValueError(validation_result["message"])
 
+        started = time.perf_counter()
         original_text = text.strip()
         logger.info(f"Processing text: '{original_text[:50]}...'")
 
         try:
-            classification = await self.detector._execute(original_text)
+            with stage("classify"):
+                classification = await self.detector._execute(original_text)
 
-            retrieval_result = await self.retriever._execute(
-                original_text, classification
+            with stage("retrieve"):
+                retrieval_result = await self.retriever._execute(
+                    original_text, classification, filters
+                )
+            return await self._reason_and_respond(
+                original_text, classification, retrieval_result.policies, started
             )
-            policies = retrieval_result.policies
 
-            reasoning_output = await self.reasoner._execute(
-                original_text, policies, classification
-            )
-            explanation = reasoning_output.get(
-                "explanation", "No global explanation returned."
-            )
-            policy_explanations = reasoning_output.get("policy_summaries", {})
+        except Exception as e:
+            error_response = self.error_handler.handle_error(e, "orchestrator.run")
+            logger.error(f"Orchestrator handled error: {error_response}")
+            raise
 
-            recommendation = await self.recommender._execute(classification)
+    async def run_batch(
+        self, texts: List[str], filters: Optional[PayloadFilter] = None
+    ) -> List[DetailedAnalyzeResponse]:
+        """
+        Analyze several texts together. Classification and reasoning run
+        concurrently per text; policy retrieval for all of them is a single
+        batched embedding and vector search.
+        """
+        started = time.perf_counter()
+        cleaned = []
+        for text in texts:
+            validation_result = self.error_handler.validate_input(text)
+            if not validation_result["valid"]:
+                raise ValueError(validation_result["message"])
+            cleaned.append(text.strip())
+        logger.info(f"Processing batch of {len(cleaned)} texts")
 
-            for p in policies:
-                p.explanation = policy_explanations.get(
-                    p.id, "No specific summary provided."
+        try:
+            with stage("classify"):
+                classifications = await asyncio.gather(
+                    *(self.detector._execute(text) for text in cleaned)
+                )
+            with stage("retrieve"):
+                retrieval_results = await self.retriever.run_batch(
+                    cleaned, list(classifications), filters
+                )
+            return list(
+                await asyncio.gather(
+                    *(
+                        self._reason_and_respond(
+                            text, classification, result.policies, started
+                        )
+                        for text, classification, result in zip(
+                            cleaned, classifications, retrieval_results
+                        )
+                    )
                 )
-
-            return self._build_detailed_response(
-                classification, policies, explanation, recommendation
             )
 
         except Exception as e:
-            error_response = self.error_handler.handle_error(e, "orchestrator.run")
+            error_response = self.error_handler.handle_error(
+                e, "orchestrator.run_batch"
+            )
             logger.error(f"Orchestrator handled error: {error_response}")
             raise
 
+    async def _reason_and_respond(
+        self, text: str, classification, policies, started: float
+    ) -> DetailedAnalyzeResponse:
+        """
+        Reasoning, recommendation and response assembly for one text.
+        `started` is the perf_counter() reading when the analysis began.
+        """
+        with stage("reason"):
+            reasoning_output = await self.reasoner._execute(
+                text, policies, classification
+            )
+        explanation = reasoning_output.get(
+            "explanation", "No global explanation returned."
+        )
+        policy_explanations = reasoning_output.get("policy_summaries", {})
+
+        with stage("recommend"):
+            recommendation = await self.recommender._execute(classification)
+
+        for p in policies:
+            p.explanation = policy_explanations.get(
+                p.id, "No specific summary provided."
+            )
+
+        response = self._build_detailed_response(
+            classification, policies, explanation, recommendation
+        )
+        # Queued only; written in batches off the request path
+        audit_log.record(
+            text, response, latency_ms=(time.perf_counter() - started) * 1000
+        )
+        return response
+
     def _build_detailed_response(
         self, classification, policies, explanation, recommendation
     ) -> DetailedAnalyzeResponse:
@@ -84,13 +160,14 @@ class HateSpeechOrchestrator:
 
         policy_summaries = [
             PolicySummary(
+                id=p.id,
                 source=p.source,
                 summary=f"{p.title}: {p.content}\n{p.explanation}",
                 relevance_score=round(p.relevance_score * 100, 2),
             )
             for p in policies
         ]
-        print("Policy summary ran", policy_summaries )
+        print("Policy summary ran", policy_summaries)
         return DetailedAnalyzeResponse(
             hate_speech=hate_speech_classification,
             policies=policy_summaries,
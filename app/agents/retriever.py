@@ -1,26 +1,83 @@
 # app/agents/retriever.py
 
 import re
-from typing import Dict, List
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+import numpy as np
 
 from app.agents.base import BaseAgent
+from app.config import settings
 from app.models.schemas import ClassificationResult, PolicyDocument, RetrievalResult
+from app.services.bm25 import keyword_search, reciprocal_rank_fusion, tokenize
+from app.services.content_store import fetch_contents
 from app.services.embed_service import get_embedding_service
-from app.services.qdrant_client import search_policies
+from app.services.metrics import metrics
+from app.services.qdrant_client import (
+    hybrid_enabled,
+    search_policies,
+    search_policies_batch,
+)
+from app.services.reranker import get_reranker
+from app.services.vector_store import PayloadFilter
 from app.utils.exceptions import RetrievalError
 
 # Constants
 DEFAULT_TITLE = "Untitled"
 DEFAULT_PROVIDER = "Unknown"
 DEFAULT_TYPE = "general"
+CANDIDATE_CHUNKS = 16
+TOP_K = 3
+REASONING_TERM_WEIGHT = 0.05
+LABEL_TERM_WEIGHT = 0.1
+# In a fused (RRF) ranking, one rank position weighs as much as a label term
+FUSED_RANK_WEIGHT = LABEL_TERM_WEIGHT
+
+LABEL_TERMS = {
+    "hate": ["hate", "harassment", "discrimination"],
+    "toxic": ["toxic", "abuse", "harmful"],
+    "offensive": ["offensive", "slur", "inappropriate"],
+}
+# Policy types favored for each label, applied as a score boost inside the search
+TYPE_BOOSTS = {
+    "hate": {"legal_framework": 0.15, "community_guidelines": 0.1},
+    "toxic": {"community_guidelines": 0.15, "platform_policy": 0.1},
+    "offensive": {"platform_policy": 0.1},
+}
+# Payload fields fetched with each vector hit; chunk text (and with it the
+# keyword terms) is loaded from the content store in one lookup per request
+SEARCH_FIELDS = [
+    "title",
+    "provider",
+    "type",
+    "section",
+    "chunk_index",
+    "parent_id",
+    "filename",
+]
+KEYWORD_STOPWORDS = frozenset(
+    {"the", "and", "with", "for", "that", "this", "from", "into", "such"}
+)
+
+
+@lru_cache(maxsize=256)
+def _title_terms(title: str) -> frozenset:
+    return frozenset(tokenize(title))
+
+
+@lru_cache(maxsize=4096)
+def _chunk_terms(text: str) -> frozenset:
+    return frozenset(tokenize(text))
 
 
 class HybridRetriever(BaseAgent):
     """
     Scores top policies based on:
-    1. Semantic similarity
+    1. Semantic similarity, boosted by policy type relevance in the search itself,
+       fused with BM25 keyword rank (reciprocal rank fusion), either here or by
+       the vector store in the same request (HYBRID_FUSION=server)
     2. Keyword match
-    3. Policy type relevance
+    The result can then be reordered by a local cross-encoder (RERANKER_ENABLED).
     """
 
     def __init__(self):
@@ -28,110 +85,348 @@ class HybridRetriever(BaseAgent):
         self.embedding_service = get_embedding_service()
 
     async def _execute(
-        self, text: str, classification: ClassificationResult
+        self,
+        text: str,
+        classification: ClassificationResult,
+        filters: Optional[PayloadFilter] = None,
     ) -> RetrievalResult:
+        """
+        Retrieve the top policies for `text`. `filters` restricts both the
+        vector and keyword search to matching payloads (e.g. one provider).
+        """
+        try:
+            self._validate_text(text)
+            server_fused = hybrid_enabled()
+            chunk_hits = await search_policies(
+                text,
+                limit=CANDIDATE_CHUNKS,
+                filters=filters,
+                boosts=self._type_boosts(classification),
+                fields=SEARCH_FIELDS,
+                keyword_query=(
+                    self._keyword_query(text, classification) if server_fused else None
+                ),
+            )
+            candidates = self._candidates(
+                text, classification, chunk_hits, filters, server_fused
+            )
+            await self._attach_content(candidates)
+            ranked = await self._rank(text, classification, candidates)
+            return self._to_result(text, ranked[:TOP_K], len(candidates))
+
+        except Exception as e:
+            raise RetrievalError(f"Hybrid retrieval failed: {e}")
+
+    async def run_batch(
+        self,
+        texts: List[str],
+        classifications: List[ClassificationResult],
+        filters: Optional[PayloadFilter] = None,
+    ) -> List[RetrievalResult]:
+        """
+        Retrieve policies for several texts at once: one encode call and one
+        batched vector search for all of them, then the usual per-item fusion
+        and rerank. Policy text for every item's candidates is loaded in one
+        lookup.
+        """
         try:
-            if not text or not isinstance(text, str):
-                raise RetrievalError("Input text must be a non-empty string.")
-            raw_results = search_policies(text, limit=8)
-
-            if not raw_results:
-                return RetrievalResult(policies=[], query_used=text, total_candidates=0)
-
-            scored_results = self._score_and_explain(raw_results, text, classification)
-            top_results = sorted(
-                scored_results, key=lambda r: r["score"], reverse=True
-            )[:3]
-
-            policies = [
-                PolicyDocument(
-                    id=result["id"],
-                    title=result["data"].get("title", DEFAULT_TITLE),
-                    content=result["data"].get("content", ""),
-                    category=result["data"].get("type", DEFAULT_TYPE),
-                    relevance_score=result["score"],
-                    source=result["data"].get("provider", DEFAULT_PROVIDER),
-                    policy_type=result["data"].get("type", DEFAULT_TYPE),
-                    explanation=result["explanation"],
+            if len(texts) != len(classifications):
+                raise RetrievalError("Expected one classification per text.")
+            for text in texts:
+                self._validate_text(text)
+
+            server_fused = hybrid_enabled()
+            hit_lists = await search_policies_batch(
+                texts,
+                limit=CANDIDATE_CHUNKS,
+                filters=filters,
+                boosts=[self._type_boosts(c) for c in classifications],
+                fields=SEARCH_FIELDS,
+                keyword_queries=(
+                    [self._keyword_query(t, c) for t, c in zip(texts, classifications)]
+                    if server_fused
+                    else None
+                ),
+            )
+            candidate_lists = [
+                self._candidates(
+                    text, classification, chunk_hits, filters, server_fused
+                )
+                for text, classification, chunk_hits in zip(
+                    texts, classifications, hit_lists
                 )
-                for result in top_results
             ]
+            await self._attach_content([r for c in candidate_lists for r in c])
+            results = []
+            for text, classification, candidates in zip(
+                texts, classifications, candidate_lists
+            ):
+                ranked = await self._rank(text, classification, candidates)
+                results.append(self._to_result(text, ranked[:TOP_K], len(candidates)))
+            return results
+
+        except Exception as e:
+            raise RetrievalError(f"Hybrid batch retrieval failed: {e}")
+
+    def _validate_text(self, text: str) -> None:
+        if not text or not isinstance(text, str):
+            raise RetrievalError("Input text must be a non-empty string.")
 
-            return RetrievalResult(
-                policies=policies, query_used=text, total_candidates=len(raw_results)
+    def _type_boosts(self, classification: ClassificationResult) -> Optional[Dict]:
+        type_boosts = TYPE_BOOSTS.get(classification.label)
+        return {"type": type_boosts} if type_boosts else None
+
+    def _keyword_query(self, text: str, classification: ClassificationResult) -> str:
+        return f"{text} {classification.reasoning}"
+
+    def _candidates(
+        self,
+        text: str,
+        classification: ClassificationResult,
+        chunk_hits: List[Dict],
+        filters: Optional[PayloadFilter],
+        server_fused: bool = False,
+    ) -> List[Dict]:
+        """
+        Fuse dense hits with BM25 hits (unless the vector store already did)
+        and aggregate them per policy.
+        """
+        if not server_fused:
+            # Lexical recall independent of the dense top-k
+            keyword_hits = keyword_search(
+                self._keyword_query(text, classification),
+                limit=CANDIDATE_CHUNKS,
+                filters=filters,
             )
+            if keyword_hits:
+                chunk_hits = reciprocal_rank_fusion(
+                    [chunk_hits, keyword_hits], k=settings.RRF_K
+                )[:CANDIDATE_CHUNKS]
 
-        except Exception as e:
-            raise RetrievalError(f"Hybrid retrieval failed: {e}")
+        if not chunk_hits:
+            return []
+        if "fused" in chunk_hits[0]:
+            # Scores stay dense similarities; the fused order goes by rank
+            for position, hit in enumerate(chunk_hits):
+                hit["rank"] = position
+        return self._aggregate_chunks(chunk_hits)
+
+    async def _rank(
+        self, text: str, classification: ClassificationResult, candidates: List[Dict]
+    ) -> List[Dict]:
+        """
+        Score candidates (with their content attached) by keyword relevance
+        and rerank them.
+        """
+        scored_results = self._score_and_explain(candidates, text, classification)
+        ranked = sorted(scored_results, key=lambda r: r["order"], reverse=True)
+        return await self._cross_encoder_rerank(text, ranked, classification.label)
+
+    def _to_result(
+        self, text: str, top_results: List[Dict], candidates: int
+    ) -> RetrievalResult:
+        policies = [
+            PolicyDocument(
+                id=result["id"],
+                title=result["data"].get("title", DEFAULT_TITLE),
+                content=result["data"].get("content", ""),
+                category=result["data"].get("type", DEFAULT_TYPE),
+                relevance_score=result["score"],
+                source=result["data"].get("provider", DEFAULT_PROVIDER),
+                policy_type=result["data"].get("type", DEFAULT_TYPE),
+                explanation=result["explanation"],
+            )
+            for result in top_results
+        ]
+        return RetrievalResult(
+            policies=policies, query_used=text, total_candidates=candidates
+        )
+
+    def _aggregate_chunks(self, hits: List[Dict]) -> List[Dict]:
+        """
+        Group chunk hits by parent policy. Each parent keeps its best chunk
+        score and only the matched sections, in document order.
+        Hits without a parent_id are treated as whole documents.
+
+        Parent content is only joined here when every chunk hit carries its
+        text; otherwise `_attach_content` fills it in later.
+        """
+        grouped: Dict[str, List[Dict]] = {}
+        for hit in hits:
+            parent_id = str(hit["data"].get("parent_id") or hit["id"])
+            grouped.setdefault(parent_id, []).append(hit)
+
+        parents = []
+        for parent_id, chunks in grouped.items():
+            chunks.sort(key=lambda h: h["data"].get("chunk_index", 0))
+            data = dict(chunks[0]["data"])
+            data["chunk_ids"] = [str(c["id"]) for c in chunks]
+            data["chunk_texts"] = [c["data"].get("content") for c in chunks]
+            if None in data["chunk_texts"]:
+                data.pop("content", None)
+            else:
+                data["content"] = "\n\n".join(data["chunk_texts"])
+            data["sections"] = [c["data"].get("section") for c in chunks]
+            if all("terms" in c["data"] for c in chunks):
+                data["terms"] = frozenset().union(*(c["data"]["terms"] for c in chunks))
+            else:
+                data.pop("terms", None)
+            parent = {
+                "id": parent_id,
+                "score": max(c["score"] for c in chunks),
+                "data": data,
+            }
+            if all("rank" in c for c in chunks):
+                parent["rank"] = min(c["rank"] for c in chunks)
+            parents.append(parent)
+        return parents
 
     def _score_and_explain(
         self, results: List[Dict], text: str, classification: ClassificationResult
     ) -> List[Dict]:
         """
         Rerank raw results by combining:
-        - Semantic similarity
+        - Semantic similarity (already including the policy type boost)
         - Keyword relevance (reasoning + label keywords)
-        - Policy type boost
+        `score` is the similarity plus the keyword bonus, capped at 1.0.
+        `order` is what ranking sorts by: the same value, or for results of a
+        fused ranking the keyword bonus minus FUSED_RANK_WEIGHT per rank.
+
+        Keyword relevance is computed over each candidate's precomputed term
+        set: a (candidates x query terms) match matrix is built from set
+        intersections and scored with one matrix-vector product per term group.
         """
+        if not results:
+            return results
+
         reasoning_terms = self._extract_keywords(classification.reasoning)
-        label_terms = {
-            "hate": ["hate", "harassment", "discrimination"],
-            "toxic": ["toxic", "abuse", "harmful"],
-            "offensive": ["offensive", "slur", "inappropriate"],
-        }.get(classification.label, [])
-
-        for r in results:
-            content = r["data"].get("content", "").lower()
-            title = r["data"].get("title", "").lower()
-
-            reasoning_score = (
-                sum(1 for w in reasoning_terms if w in content or w in title) * 0.05
-            )
-            label_score = sum(1 for w in label_terms if w in content) * 0.1
-            type_bonus = self._policy_type_boost(
-                r["data"].get("type", ""), classification.label
-            )
+        label_terms = LABEL_TERMS.get(classification.label, [])
+
+        vocab = list(dict.fromkeys(reasoning_terms + label_terms))
+        column = {term: i for i, term in enumerate(vocab)}
+        reasoning_weights = np.zeros(len(vocab))
+        for term in reasoning_terms:
+            reasoning_weights[column[term]] += REASONING_TERM_WEIGHT
+        label_weights = np.zeros(len(vocab))
+        for term in label_terms:
+            label_weights[column[term]] += LABEL_TERM_WEIGHT
+
+        in_content = np.zeros((len(results), len(vocab)), dtype=bool)
+        in_title = np.zeros((len(results), len(vocab)), dtype=bool)
+        query_terms = set(vocab)
+        for row, r in enumerate(results):
+            for term in self._term_set(r["data"]) & query_terms:
+                in_content[row, column[term]] = True
+            for term in _title_terms(r["data"].get("title", "")) & query_terms:
+                in_title[row, column[term]] = True
+
+        base = np.array([r["score"] for r in results], dtype=float)
+        bonuses = (in_content | in_title) @ reasoning_weights + (
+            in_content @ label_weights
+        )
+        final_scores = base + bonuses
 
-            final_score = r["score"] + reasoning_score + label_score + type_bonus
-            r["score"] = min(final_score, 1.0)  # cap at 1.0
+        for row, r in enumerate(results):
+            matched = [
+                vocab[j] for j in np.flatnonzero(in_content[row] | in_title[row])
+            ]
+            r["score"] = min(float(final_scores[row]), 1.0)  # cap at 1.0
+            r["order"] = (
+                float(bonuses[row]) - r["rank"] * FUSED_RANK_WEIGHT
+                if "rank" in r
+                else r["score"]
+            )
+            r["matched_terms"] = matched
             r["explanation"] = self._generate_explanation(
                 r["data"].get("title", DEFAULT_TITLE),
                 r["data"].get("provider", DEFAULT_PROVIDER),
-                reasoning_terms + label_terms,
+                matched,
                 classification.label,
-                final_score,
+                float(final_scores[row]),
             )
 
         return results
 
+    async def _attach_content(self, results: List[Dict]) -> None:
+        """
+        Fill in `content` for results whose chunk text was projected out of
+        the vector search, with one content store lookup for all of them.
+        """
+        pending = [r for r in results if "content" not in r["data"]]
+        missing = [
+            chunk_id
+            for r in pending
+            for chunk_id, text in zip(r["data"]["chunk_ids"], r["data"]["chunk_texts"])
+            if text is None
+        ]
+        if not missing:
+            return
+
+        contents = await fetch_contents(missing)
+        for r in pending:
+            r["data"]["chunk_texts"] = [
+                text if text is not None else contents.get(chunk_id, "")
+                for chunk_id, text in zip(
+                    r["data"]["chunk_ids"], r["data"]["chunk_texts"]
+                )
+            ]
+            r["data"]["content"] = "\n\n".join(r["data"]["chunk_texts"])
+
+    async def _cross_encoder_rerank(
+        self, text: str, ranked: List[Dict], label: str
+    ) -> List[Dict]:
+        """
+        Reorder heuristically ranked candidates by cross-encoder relevance.
+        Keeps the heuristic order when the reranker is disabled, fails, or
+        misses its latency budget.
+        """
+        reranker = get_reranker()
+        if reranker is None or len(ranked) < 2:
+            return ranked
+
+        passages = [
+            f"{r['data'].get('title', DEFAULT_TITLE)}\n{r['data'].get('content', '')}"
+            for r in ranked
+        ]
+        scores = await reranker.score_within_budget(
+            text, passages, settings.RERANKER_BUDGET_MS
+        )
+        if scores is None:
+            return ranked
+
+        reranked = [dict(r, score=score) for r, score in zip(ranked, scores)]
+        reranked.sort(key=lambda r: r["score"], reverse=True)
+        for r in reranked:
+            r["explanation"] = self._generate_explanation(
+                r["data"].get("title", DEFAULT_TITLE),
+                r["data"].get("provider", DEFAULT_PROVIDER),
+                r.get("matched_terms", []),
+                label,
+                r["score"],
+            )
+
+        metrics.increment("retrieval.rerank.calls")
+        if {r["id"] for r in reranked[:TOP_K]} != {r["id"] for r in ranked[:TOP_K]}:
+            metrics.increment("retrieval.rerank.top_k_changed")
+        return reranked
+
+    def _term_set(self, data: Dict) -> frozenset:
+        """
+        Normalized token set for a candidate. Uses `terms` when the payload
+        carries them, otherwise the union of its chunks' cached token sets.
+        """
+        terms = data.get("terms")
+        if terms is not None:
+            return terms if isinstance(terms, frozenset) else frozenset(terms)
+        texts = data.get("chunk_texts") or [data.get("content", "")]
+        return frozenset().union(*(_chunk_terms(text or "") for text in texts))
+
     def _extract_keywords(self, text: str) -> List[str]:
         """
         Extract significant keywords from reasoning text.
         """
         words = re.findall(r"\b\w+\b", text.lower())
-        stopwords = {
-            "the",
-            "and",
-            "with",
-            "for",
-            "that",
-            "this",
-            "from",
-            "into",
-            "such",
-        }
-        return [w for w in words if len(w) > 3 and w not in stopwords]
-
-    def _policy_type_boost(self, policy_type: str, label: str) -> float:
-        """
-        Return a score bonus based on policy type relevance for the classification label.
-        """
-        boost_map = {
-            "hate": {"legal_framework": 0.15, "community_guidelines": 0.1},
-            "toxic": {"community_guidelines": 0.15, "platform_policy": 0.1},
-            "offensive": {"platform_policy": 0.1},
-        }
-        return boost_map.get(label, {}).get(policy_type, 0.0)
+        return [w for w in words if len(w) > 3 and w not in KEYWORD_STOPWORDS]
 
     def _generate_explanation(
         self,
@@ -1,8 +1,18 @@
 from fastapi import APIRouter
 
+from app.api.health import router as health_router
+from app.api.history import router as history_router
+from app.api.metrics import router as metrics_router
 from app.api.policies import router as policy_router
+from app.api.profiling import router as profiling_router
 from app.api.routes import router as analyze_router
+from app.api.stream import router as stream_router
 
 api_router = APIRouter()
 api_router.include_router(analyze_router)
+api_router.include_router(stream_router)
 api_router.include_router(policy_router)
+api_router.include_router(metrics_router)
+api_router.include_router(health_router)
+api_router.include_router(profiling_router)
+api_router.include_router(history_router)
@@ -0,0 +1,29 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app.api.routes import orchestrator
+from app.services import health
+
+router = APIRouter(tags=["Monitoring"])
+
+
+@router.get("/ready")
+async def ready():
+    """200 once startup warmup has primed the models and connections, else 503"""
+    if health.readiness_state() == "failed":
+        # A dependency was down at startup; try again on each probe
+        await health.warm_up(orchestrator.llm_service)
+    state = health.readiness_state()
+    return JSONResponse(
+        status_code=200 if state == "ready" else 503,
+        content={"status": state, "warmup": health.warmup_report()},
+    )
+
+
+@router.get("/health")
+async def get_health():
+    """Probe each dependency and report its status and latency"""
+    report = await health.check_health(orchestrator.llm_service)
+    return JSONResponse(
+        status_code=503 if report["status"] == "down" else 200, content=report
+    )
@@ -0,0 +1,55 @@
+import asyncio
+from datetime import date
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Query
+
+from app.services.history_store import default_range, get_history_store
+
+router = APIRouter(prefix="/api/v1/history", tags=["History"])
+
+Bucket = Literal["hour", "day", "week", "month"]
+Dimension = Literal["label", "action", "severity", "confidence"]
+
+
+@router.get("/distribution")
+async def get_distribution(
+    by: Dimension = "label",
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    bucket: Bucket = "day",
+    label: Optional[List[str]] = Query(None),
+):
+    """Analyses per time bucket, split by label, action, severity or confidence"""
+    start, end = default_range(start, end)
+    buckets = await asyncio.to_thread(
+        get_history_store().distribution, by, start, end, bucket, label
+    )
+    return {"start": start, "end": end, "buckets": buckets}
+
+
+@router.get("/providers")
+async def get_provider_hits(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    label: Optional[List[str]] = Query(None),
+):
+    """Share of analyses that matched a policy from each provider"""
+    start, end = default_range(start, end)
+    hits = await asyncio.to_thread(get_history_store().provider_hits, start, end, label)
+    return {"start": start, "end": end, **hits}
+
+
+@router.get("/latency")
+async def get_latency(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    bucket: Bucket = "day",
+    label: Optional[List[str]] = Query(None),
+):
+    """Analysis latency percentiles (p50/p95/p99, ms) per time bucket"""
+    start, end = default_range(start, end)
+    buckets = await asyncio.to_thread(
+        get_history_store().latency, start, end, bucket, label
+    )
+    return {"start": start, "end": end, "buckets": buckets}
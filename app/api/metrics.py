@@ -0,0 +1,11 @@
+from fastapi import APIRouter
+
+from app.services.metrics import metrics
+
+router = APIRouter(tags=["Monitoring"])
+
+
+@router.get("/metrics")
+def get_metrics():
+    """Return in-process counters, gauges and latency percentiles"""
+    return metrics.snapshot()
@@ -1,27 +1,90 @@
-from fastapi import APIRouter, HTTPException
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
 
 from app.models.policies import PolicyInput
-from app.services.policy_store import store_policy
-from app.services.qdrant_client import search_policies
+from app.services.policy_store import store_policies_jsonl, store_policy
+from app.services.qdrant_client import build_filters, search_policies
+from app.services.reindex import is_reindexing, rollback, start_reindex
+from app.services.versions import read_state
+from app.utils.exceptions import PolicyLoadError
 
 router = APIRouter(prefix="/policy", tags=["Policy"])
 
 
+async def _iter_lines(request: Request):
+    """Re-split the streamed request body into lines without buffering all of it."""
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line
+    if buffer:
+        yield buffer
+
+
 @router.post("/add")
-def add_policy(policy: PolicyInput):
+async def add_policy(policy: PolicyInput):
     """Add a new policy"""
     try:
-        policy_id = store_policy(policy)
+        policy_id = await store_policy(policy)
         return {"message": "Policy stored successfully", "id": policy_id}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post("/bulk")
+async def bulk_add_policies(request: Request):
+    """
+    Bulk-add policies from a JSONL body (Content-Type: application/x-ndjson),
+    one {"text", "provider", "type", "title"?} object per line.
+    """
+    try:
+        report, rejected = await store_policies_jsonl(_iter_lines(request))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return {**report.to_dict(), "rejected_lines": rejected}
+
+
 @router.get("/search")
-def search(query: str, limit: int = 3):
-    """Search similar policies"""
+async def search(
+    query: str,
+    limit: int = 3,
+    provider: Optional[List[str]] = Query(None),
+    policy_type: Optional[List[str]] = Query(None, alias="type"),
+):
+    """Search similar policies, optionally restricted to providers and/or types"""
     try:
-        results = search_policies(query, limit)
+        filters = build_filters(provider, policy_type)
+        results = await search_policies(query, limit, filters=filters)
         return {"results": results}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/reindex", status_code=202)
+async def reindex():
+    """
+    Rebuild the policy corpus from the policy docs into a new version in the
+    background; it goes live atomically once validated.
+    """
+    if not start_reindex():
+        raise HTTPException(status_code=409, detail="A reindex is already running")
+    return {"message": "Reindex started"}
+
+
+@router.post("/rollback")
+async def rollback_version():
+    """Switch back to the previous corpus version"""
+    try:
+        return {"active": await rollback()}
+    except PolicyLoadError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.get("/version")
+async def corpus_version():
+    """Active and previous corpus versions"""
+    return {**read_state(), "reindexing": is_reindexing()}
@@ -0,0 +1,51 @@
+import re
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse, Response
+
+from app.config import settings
+from app.services.profiler import RequestProfile, profile_path
+
+router = APIRouter(prefix="/api/v1", tags=["Monitoring"])
+
+_PROFILE_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+def _authorize(token: Optional[str]) -> None:
+    if not settings.PROFILING_ENABLED:
+        raise HTTPException(status_code=403, detail="Profiling is disabled")
+    if settings.PROFILING_TOKEN and token != settings.PROFILING_TOKEN:
+        raise HTTPException(status_code=403, detail="Invalid X-Profile-Token")
+
+
+def profiling_requested(
+    profile: bool = Query(False, include_in_schema=False),
+    x_profile: Optional[str] = Header(None, include_in_schema=False),
+    x_profile_token: Optional[str] = Header(None, include_in_schema=False),
+) -> bool:
+    """Whether to profile this request (`?profile=true` or `X-Profile: 1`)"""
+    if not profile and x_profile not in ("1", "true"):
+        return False
+    _authorize(x_profile_token)
+    return True
+
+
+def with_profile(response: Response, profile: RequestProfile) -> Response:
+    """Point the response at its stored profile and add per-stage timings"""
+    response.headers["X-Profile-Id"] = profile.id
+    response.headers["Server-Timing"] = profile.server_timing()
+    return response
+
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+def get_profile(
+    profile_id: str,
+    x_profile_token: Optional[str] = Header(None, include_in_schema=False),
+):
+    """Collapsed stacks of a profiled request (flamegraph.pl / speedscope input)"""
+    _authorize(x_profile_token)
+    path = profile_path(profile_id)
+    if not _PROFILE_ID.match(profile_id) or not path.exists():
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(path.read_text())
@@ -0,0 +1,57 @@
+from typing import Optional
+
+from fastapi import HTTPException
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+from app.models.schemas import DetailedAnalyzeResponse
+
+ANALYZE_FIELDS = set(DetailedAnalyzeResponse.model_fields)
+
+# What is left of each policy when the policy text is left out
+POLICY_REF_FIELDS = {"id", "source", "relevance_score"}
+# Nested objects without their free-text reasoning, for the compact response
+COMPACT_FIELDS = {
+    "policies": {"__all__": POLICY_REF_FIELDS},
+    "hate_speech": {"classification", "confidence"},
+    "action": {"action", "severity"},
+}
+
+
+def analysis_projection(
+    fields: Optional[str] = None, include_policy_text: bool = True
+) -> Optional[dict]:
+    """
+    Build the pydantic `include` spec for one analysis from the `fields`
+    (comma-separated top-level fields) and `include_policy_text` query
+    options. Without policy text, all reasoning strings are dropped and each
+    policy is reduced to its ID, source and score. None means everything.
+    """
+    if fields:
+        selected = {f.strip() for f in fields.split(",") if f.strip()}
+        unknown = selected - ANALYZE_FIELDS
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown fields: {', '.join(sorted(unknown))}",
+            )
+    elif include_policy_text:
+        return None
+    else:
+        selected = set(ANALYZE_FIELDS)
+
+    spec = {name: True for name in selected}
+    if not include_policy_text:
+        spec.pop("reasoning", None)
+        for name, compact in COMPACT_FIELDS.items():
+            if name in spec:
+                spec[name] = compact
+    return spec
+
+
+def render(model: BaseModel, include: Optional[dict] = None) -> ORJSONResponse:
+    """
+    Serialize a response model straight to an orjson response, bypassing
+    FastAPI's re-validation and jsonable_encoder pass over `response_model`.
+    """
+    return ORJSONResponse(model.model_dump(mode="json", include=include))
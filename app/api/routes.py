@@ -1,19 +1,105 @@
-from fastapi import APIRouter, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
 
 from app.agents.orchestrator import HateSpeechOrchestrator
-from app.models.schemas import AnalyzeRequest, DetailedAnalyzeResponse
+from app.api.profiling import profiling_requested, with_profile
+from app.api.responses import analysis_projection, render
+from app.models.schemas import (
+    AnalyzeBatchRequest,
+    AnalyzeBatchResponse,
+    AnalyzeRequest,
+    DetailedAnalyzeResponse,
+)
+from app.services.admission import analysis_admission
+from app.services.profiler import run_profiled
+from app.services.qdrant_client import build_filters
+from app.services.scheduler import Lane, current_lane
+from app.utils.exceptions import OverloadedError
 
 router = APIRouter(prefix="/api/v1", tags=["Hate Speech Detection"])
 orchestrator = HateSpeechOrchestrator()
 
 
-@router.post("/analyze", response_model=DetailedAnalyzeResponse)
-async def analyze_text(payload: AnalyzeRequest):
+async def admitted():
+    """Hold an analysis slot for the request, or shed it with 429 when saturated"""
+    try:
+        async with analysis_admission.admit():
+            yield
+    except OverloadedError as e:
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+
+def priority(default: Lane):
+    """
+    Put the request in the lane named by its X-Priority header
+    ("interactive" or "bulk"), falling back to the endpoint's default.
+    """
+
+    async def set_lane(x_priority: Optional[str] = Header(None)):
+        try:
+            lane = Lane(x_priority.strip().lower()) if x_priority else default
+        except ValueError:
+            raise HTTPException(
+                status_code=400, detail=f"Unknown X-Priority: {x_priority}"
+            )
+        # Each request is served in its own task, so this does not leak across requests
+        current_lane.set(lane)
+
+    return set_lane
+
+
+@router.post(
+    "/analyze",
+    response_model=DetailedAnalyzeResponse,
+    dependencies=[Depends(priority(Lane.INTERACTIVE)), Depends(admitted)],
+)
+async def analyze_text(
+    payload: AnalyzeRequest,
+    include: Optional[dict] = Depends(analysis_projection),
+    profile: bool = Depends(profiling_requested),
+):
     """
     Endpoint to analyze user text for hate speech detection, retrieve matching policies,
     generate reasoning, and recommend a moderation action.
+    `?fields=hate_speech,action&include_policy_text=false` trims the response.
+    """
+    try:
+        filters = build_filters(payload.providers, payload.policy_types)
+        if not profile:
+            return render(await orchestrator.run(payload.text, filters), include)
+        result, request_profile = await run_profiled(
+            orchestrator.run(payload.text, filters)
+        )
+        return with_profile(render(result, include), request_profile)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error analyzing input: {str(e)}")
+
+
+@router.post(
+    "/analyze/batch",
+    response_model=AnalyzeBatchResponse,
+    dependencies=[Depends(priority(Lane.BULK)), Depends(admitted)],
+)
+async def analyze_batch(
+    payload: AnalyzeBatchRequest,
+    include: Optional[dict] = Depends(analysis_projection),
+):
+    """
+    Analyze several texts in one request. Policy retrieval for all texts is
+    batched into a single embedding call and vector search. Accepts the same
+    `fields` / `include_policy_text` options as /analyze, applied per result.
     """
     try:
-        return await orchestrator.run(payload.text)
+        filters = build_filters(payload.providers, payload.policy_types)
+        results = await orchestrator.run_batch(payload.texts, filters)
+        return render(
+            AnalyzeBatchResponse(results=results),
+            {"results": {"__all__": include}} if include else None,
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error analyzing input: {str(e)}")
@@ -0,0 +1,129 @@
+import asyncio
+import logging
+from typing import Optional
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
+
+from app.api.responses import analysis_projection
+from app.api.routes import orchestrator, priority
+from app.config import settings
+from app.models.schemas import AnalyzeStreamMessage
+from app.services.admission import analysis_admission
+from app.services.metrics import metrics
+from app.services.qdrant_client import build_filters
+from app.services.scheduler import Lane
+from app.utils.exceptions import OverloadedError
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/v1", tags=["Hate Speech Detection"])
+
+_connections = 0
+
+
+class AnalysisStream:
+    """
+    One WebSocket connection. Each incoming message is analyzed in its own
+    task and answered as soon as it finishes, so replies can arrive out of
+    order and carry the message's `id`. At most `max_in_flight` messages are
+    in flight, counted until their reply has been sent (or dropped); after
+    that the stream stops reading, so the client's sends back up through the
+    TCP window instead of queueing in the server. A client that stops
+    reading replies therefore also stops being read.
+    """
+
+    def __init__(
+        self, websocket: WebSocket, include: Optional[dict], max_in_flight: int
+    ):
+        self.websocket = websocket
+        self.include = include
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._send_lock = asyncio.Lock()
+        self._tasks: set = set()
+
+    async def serve(self) -> None:
+        try:
+            while True:
+                await self._slots.acquire()
+                raw = await self.websocket.receive_text()
+                try:
+                    message = AnalyzeStreamMessage.model_validate_json(raw)
+                except ValidationError as e:
+                    error = e.errors()[0]
+                    await self._reply(
+                        {"id": None, "error": f"Invalid message: {error['msg']}"}
+                    )
+                    self._slots.release()
+                    continue
+                task = asyncio.create_task(self._handle(message))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+        except WebSocketDisconnect:
+            pass
+        finally:
+            for task in self._tasks:
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _handle(self, message: AnalyzeStreamMessage) -> None:
+        metrics.increment("ws.analyze.messages")
+        try:
+            try:
+                async with analysis_admission.admit():
+                    filters = build_filters(message.providers, message.policy_types)
+                    result = await orchestrator.run(message.text, filters)
+                reply = {
+                    "id": message.id,
+                    "result": result.model_dump(mode="json", include=self.include),
+                }
+            except OverloadedError as e:
+                reply = {
+                    "id": message.id,
+                    "error": str(e),
+                    "retry_after": e.retry_after,
+                }
+            except Exception as e:
+                metrics.increment("ws.analyze.errors")
+                reply = {"id": message.id, "error": f"Error analyzing input: {e}"}
+            await self._reply(reply)
+        finally:
+            # Unsent replies count against the limit too
+            self._slots.release()
+
+    async def _reply(self, message: dict) -> None:
+        # Concurrent handlers must not interleave frames on the socket
+        async with self._send_lock:
+            try:
+                await self.websocket.send_text(orjson.dumps(message).decode())
+            except (WebSocketDisconnect, RuntimeError):
+                logger.info(f"Dropped reply {message.get('id')}: client went away")
+
+
+@router.websocket("/ws/analyze", dependencies=[Depends(priority(Lane.INTERACTIVE))])
+async def analyze_stream(
+    websocket: WebSocket,
+    fields: Optional[str] = None,
+    include_policy_text: bool = True,
+):
+    """
+    Stream analyses over one connection. Send {"id", "text", "providers"?,
+    "policy_types"?} messages; each reply is {"id", "result"} or {"id",
+    "error"}, in completion order. `fields` and `include_policy_text` work
+    as on /analyze.
+    """
+    global _connections
+    try:
+        include = analysis_projection(fields, include_policy_text)
+    except HTTPException as e:
+        await websocket.close(code=1008, reason=str(e.detail))
+        return
+    await websocket.accept()
+    _connections += 1
+    metrics.set_gauge("ws.analyze.connections", _connections)
+    try:
+        await AnalysisStream(websocket, include, settings.WS_MAX_IN_FLIGHT).serve()
+    finally:
+        _connections -= 1
+        metrics.set_gauge("ws.analyze.connections", _connections)
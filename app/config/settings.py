@@ -0,0 +1,192 @@
+"""
+Central configuration for the hate speech detection service.
+All values are read from the environment (or .env) with local-friendly defaults.
+"""
+
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# ─── Vector Store ─────────────────────────────────────────────────────
+
+# "qdrant" (remote Qdrant server) or "local" (in-process NumPy index)
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "qdrant").lower()
+
+QDRANT_HOST = os.getenv("QDRANT_HOST", "http://localhost:6333")
+QDRANT_COLLECTION_NAME = os.getenv("QDRANT_COLLECTION_NAME", "policies")
+
+LOCAL_INDEX_PATH = os.getenv("LOCAL_INDEX_PATH", "data/index/policies.npz")
+
+# Per-call timeout (seconds) and connection pool for the async Qdrant client
+QDRANT_TIMEOUT = float(os.getenv("QDRANT_TIMEOUT", "5"))
+QDRANT_POOL_SIZE = int(os.getenv("QDRANT_POOL_SIZE", "20"))
+QDRANT_KEEPALIVE_EXPIRY = float(os.getenv("QDRANT_KEEPALIVE_EXPIRY", "30"))
+
+# ─── Ingestion ────────────────────────────────────────────────────────
+
+CHUNK_MAX_WORDS = int(os.getenv("CHUNK_MAX_WORDS", "120"))
+CHUNK_OVERLAP_WORDS = int(os.getenv("CHUNK_OVERLAP_WORDS", "20"))
+
+# Bulk ingestion: chunks per embed/upsert batch, concurrent batches, retries per batch
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "64"))
+INGEST_CONCURRENCY = int(os.getenv("INGEST_CONCURRENCY", "4"))
+INGEST_MAX_RETRIES = int(os.getenv("INGEST_MAX_RETRIES", "3"))
+
+# Record of indexed sources/content hashes used for incremental re-indexing
+INDEX_MANIFEST_PATH = os.getenv("INDEX_MANIFEST_PATH", "data/index/manifest.json")
+
+# ─── Retrieval ────────────────────────────────────────────────────────
+
+# BM25 side index built at ingestion time, fused with dense hits via RRF
+BM25_INDEX_PATH = os.getenv("BM25_INDEX_PATH", "data/index/bm25.json")
+RRF_K = int(os.getenv("RRF_K", "60"))
+# "client": fuse dense hits with the BM25 side index in the retriever.
+# "server": store sparse BM25 term vectors in Qdrant and fuse there, in the same
+# request (new collections only; reindex after switching)
+HYBRID_FUSION = os.getenv("HYBRID_FUSION", "client")
+
+# Optional cross-encoder reranking of the fused candidates (off by default)
+RERANKER_ENABLED = os.getenv("RERANKER_ENABLED", "false").lower() == "true"
+RERANKER_MODEL = os.getenv("RERANKER_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+RERANKER_BATCH_SIZE = int(os.getenv("RERANKER_BATCH_SIZE", "16"))
+# Rerank calls slower than this fall back to the heuristic scores
+RERANKER_BUDGET_MS = float(os.getenv("RERANKER_BUDGET_MS", "250"))
+RERANKER_CACHE_SIZE = int(os.getenv("RERANKER_CACHE_SIZE", "4096"))
+
+# ─── Qdrant Collection Tuning ─────────────────────────────────────────
+# Applied when the collection is created; drop the collection to change them
+
+QDRANT_HNSW_M = int(os.getenv("QDRANT_HNSW_M", "16"))
+QDRANT_HNSW_EF_CONSTRUCT = int(os.getenv("QDRANT_HNSW_EF_CONSTRUCT", "100"))
+# Search-time HNSW beam width (higher = better recall, slower)
+QDRANT_HNSW_EF = int(os.getenv("QDRANT_HNSW_EF", "128"))
+
+# Scalar int8 quantization (4x smaller vectors in RAM), rescored with originals
+QDRANT_INT8_QUANTIZATION = (
+    os.getenv("QDRANT_INT8_QUANTIZATION", "false").lower() == "true"
+)
+QDRANT_QUANTIZATION_RESCORE = (
+    os.getenv("QDRANT_QUANTIZATION_RESCORE", "true").lower() == "true"
+)
+QDRANT_QUANTIZATION_OVERSAMPLING = float(
+    os.getenv("QDRANT_QUANTIZATION_OVERSAMPLING", "2.0")
+)
+
+# Keep original vectors / payloads on disk instead of RAM
+QDRANT_ON_DISK_VECTORS = os.getenv("QDRANT_ON_DISK_VECTORS", "false").lower() == "true"
+QDRANT_ON_DISK_PAYLOAD = os.getenv("QDRANT_ON_DISK_PAYLOAD", "false").lower() == "true"
+
+# ─── Content Store ────────────────────────────────────────────────────
+
+# SQLite table of chunk text keyed by point ID; vector search returns only
+# the small payload fields and the final policies' text is read from here
+CONTENT_STORE_PATH = os.getenv("CONTENT_STORE_PATH", "data/index/content.db")
+
+# ─── Corpus Versions ──────────────────────────────────────────────────
+# A reindex builds a new versioned collection (<QDRANT_COLLECTION_NAME>_<version>,
+# or a local index under INDEX_VERSIONS_DIR) and atomically points the
+# QDRANT_COLLECTION_NAME alias (or the local pointer) at it
+
+INDEX_VERSIONS_DIR = os.getenv("INDEX_VERSIONS_DIR", "data/index/versions")
+INDEX_VERSION_STATE_PATH = os.getenv(
+    "INDEX_VERSION_STATE_PATH", "data/index/versions.json"
+)
+POLICY_DOCS_PATH = os.getenv("POLICY_DOCS_PATH", "data/policy_docs")
+
+# Reindex automatically when files in POLICY_DOCS_PATH change
+POLICY_WATCH_ENABLED = os.getenv("POLICY_WATCH_ENABLED", "false").lower() == "true"
+POLICY_WATCH_DEBOUNCE_SECONDS = float(os.getenv("POLICY_WATCH_DEBOUNCE_SECONDS", "5"))
+
+# ─── Snapshots ────────────────────────────────────────────────────────
+
+# Portable export of the active corpus version (vectors, payloads, BM25 index)
+SNAPSHOT_PATH = os.getenv("SNAPSHOT_PATH", "data/snapshots/policies.npz")
+# Restore SNAPSHOT_PATH at startup when the policy collection is missing or empty
+SNAPSHOT_RESTORE_ON_STARTUP = (
+    os.getenv("SNAPSHOT_RESTORE_ON_STARTUP", "true").lower() == "true"
+)
+
+# ─── Serving ──────────────────────────────────────────────────────────
+
+# Worker processes forked by `python -m api.serve` after the models are loaded
+API_WORKERS = int(os.getenv("API_WORKERS", "1"))
+
+# Startup warmup (dummy encode, vector search, rerank) before /ready reports
+# ready; with LLM_PING_ENABLED warmup and /health also send DIAL a 1-token call
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+WARMUP_TIMEOUT_SECONDS = float(os.getenv("WARMUP_TIMEOUT_SECONDS", "60"))
+LLM_PING_ENABLED = os.getenv("LLM_PING_ENABLED", "false").lower() == "true"
+HEALTH_CHECK_TIMEOUT_SECONDS = float(os.getenv("HEALTH_CHECK_TIMEOUT_SECONDS", "2"))
+
+# On-demand profiling of single /analyze calls (`?profile=true` or
+# `X-Profile: 1`, plus `X-Profile-Token` when PROFILING_TOKEN is set); the
+# collapsed-stack profiles are kept under PROFILE_DIR
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")
+PROFILING_INTERVAL_MS = float(os.getenv("PROFILING_INTERVAL_MS", "5"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "data/profiles")
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "100"))
+
+# Admission control for /api/v1/analyze (per worker): requests beyond
+# MAX_IN_FLIGHT wait in a bounded queue per lane; a full queue or a wait
+# longer than QUEUE_TIMEOUT gets an immediate 429 with Retry-After.
+# INTERACTIVE_RESERVED slots are never given to bulk requests
+ADMISSION_MAX_IN_FLIGHT = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "16"))
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "32"))
+ADMISSION_INTERACTIVE_RESERVED = int(
+    os.getenv("ADMISSION_INTERACTIVE_RESERVED", "4")
+)
+ADMISSION_QUEUE_TIMEOUT_SECONDS = float(
+    os.getenv("ADMISSION_QUEUE_TIMEOUT_SECONDS", "2")
+)
+
+# Messages one /api/v1/ws/analyze connection may have in flight; beyond it
+# the server stops reading from the socket until a result has been sent
+WS_MAX_IN_FLIGHT = int(os.getenv("WS_MAX_IN_FLIGHT", "8"))
+
+# ─── Priority Lanes ───────────────────────────────────────────────────
+# Requests are "interactive" or "bulk" (X-Priority header, or per endpoint).
+# LLM and query-embedding calls share these slots; the reserved ones are
+# never given to bulk work, and waiting lanes are served in proportion to
+# their weights
+
+# Concurrent DIAL calls (the starting point when adaptive concurrency is on)
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_INTERACTIVE_RESERVED = int(os.getenv("LLM_INTERACTIVE_RESERVED", "2"))
+EMBED_MAX_CONCURRENCY = int(os.getenv("EMBED_MAX_CONCURRENCY", "2"))
+EMBED_INTERACTIVE_RESERVED = int(os.getenv("EMBED_INTERACTIVE_RESERVED", "1"))
+LANE_WEIGHT_INTERACTIVE = float(os.getenv("LANE_WEIGHT_INTERACTIVE", "4"))
+LANE_WEIGHT_BULK = float(os.getenv("LANE_WEIGHT_BULK", "1"))
+
+# Adaptive (AIMD) DIAL concurrency: grow the limit by ~1 per round of healthy
+# calls, multiply it by BACKOFF on 429s, timeouts or latency above
+# LATENCY_TOLERANCE x the running baseline; always within [FLOOR, CEILING]
+LLM_ADAPTIVE_CONCURRENCY = (
+    os.getenv("LLM_ADAPTIVE_CONCURRENCY", "true").lower() == "true"
+)
+LLM_CONCURRENCY_FLOOR = int(os.getenv("LLM_CONCURRENCY_FLOOR", "2"))
+LLM_CONCURRENCY_CEILING = int(os.getenv("LLM_CONCURRENCY_CEILING", "32"))
+LLM_AIMD_BACKOFF = float(os.getenv("LLM_AIMD_BACKOFF", "0.5"))
+LLM_AIMD_LATENCY_TOLERANCE = float(os.getenv("LLM_AIMD_LATENCY_TOLERANCE", "2.0"))
+
+# ─── Audit Log ────────────────────────────────────────────────────────
+# Write-behind log of every classification (ClassificationLog rows in SQLite),
+# flushed in batches of AUDIT_LOG_BATCH_SIZE or every AUDIT_LOG_FLUSH_SECONDS;
+# entries beyond AUDIT_LOG_MAX_QUEUE waiting to be written are dropped
+
+AUDIT_LOG_ENABLED = os.getenv("AUDIT_LOG_ENABLED", "true").lower() == "true"
+AUDIT_LOG_PATH = os.getenv("AUDIT_LOG_PATH", "data/audit/classifications.db")
+AUDIT_LOG_BATCH_SIZE = int(os.getenv("AUDIT_LOG_BATCH_SIZE", "200"))
+AUDIT_LOG_FLUSH_SECONDS = float(os.getenv("AUDIT_LOG_FLUSH_SECONDS", "1"))
+AUDIT_LOG_MAX_QUEUE = int(os.getenv("AUDIT_LOG_MAX_QUEUE", "10000"))
+
+# ─── Analysis History ─────────────────────────────────────────────────
+# Columnar copy of the audit log for analytics: Parquet files partitioned by
+# date and label under HISTORY_PATH, written by the same batched flush.
+# /history queries default to the last HISTORY_DEFAULT_DAYS days
+
+HISTORY_ENABLED = os.getenv("HISTORY_ENABLED", "true").lower() == "true"
+HISTORY_PATH = os.getenv("HISTORY_PATH", "data/history")
+HISTORY_DEFAULT_DAYS = int(os.getenv("HISTORY_DEFAULT_DAYS", "7"))
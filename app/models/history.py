@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import List, Optional
 
 from pydantic import BaseModel
 
@@ -9,16 +10,8 @@ class ClassificationLog(BaseModel):
     policy_match: str
     moderation_action: str
     timestamp: datetime
-
-
-from datetime import datetime
-
-from pydantic import BaseModel
-
-
-class ClassificationLog(BaseModel):
-    input_text: str
-    classification: str
-    policy_match: str
-    moderation_action: str
-    timestamp: datetime
+    # Analytics fields, kept in the columnar history store
+    confidence: Optional[str] = None
+    severity: Optional[str] = None
+    providers: List[str] = []
+    latency_ms: Optional[float] = None
@@ -1,4 +1,5 @@
-from typing import Literal
+from dataclasses import dataclass
+from typing import Literal, Optional
 
 from pydantic import BaseModel, Field
 
@@ -9,3 +10,16 @@ class PolicyInput(BaseModel):
     text: str
     provider: str
     type: str
+    title: Optional[str] = None
+
+
+@dataclass
+class PolicyMetadata:
+    """Metadata structure for a policy document."""
+
+    filename: str
+    provider: str
+    policy_type: str
+    title: str
+    content: str
+    word_count: int
@@ -1,10 +1,13 @@
 # app/models/schemas.py
 
 from enum import Enum
-from typing import List
+from typing import List, Optional
 
 from pydantic import BaseModel, Field
 
+# Largest number of texts accepted by one batch analysis request
+MAX_BATCH_TEXTS = 32
+
 
 class ClassificationLabel(str, Enum):
     hate = "hate"
@@ -38,6 +41,38 @@ class SeverityLevel(str, Enum):
 
 class AnalyzeRequest(BaseModel):
     text: str = Field(..., description="The user input text to be analyzed.")
+    providers: Optional[List[str]] = Field(
+        None, description="Only retrieve policies from these providers."
+    )
+    policy_types: Optional[List[str]] = Field(
+        None, description="Only retrieve policies of these types."
+    )
+
+
+class AnalyzeBatchRequest(BaseModel):
+    texts: List[str] = Field(
+        ...,
+        min_length=1,
+        max_length=MAX_BATCH_TEXTS,
+        description="The user input texts to be analyzed together.",
+    )
+    providers: Optional[List[str]] = Field(
+        None, description="Only retrieve policies from these providers."
+    )
+    policy_types: Optional[List[str]] = Field(
+        None, description="Only retrieve policies of these types."
+    )
+
+
+class AnalyzeStreamMessage(BaseModel):
+    id: str = Field(..., description="Client correlation ID echoed in the reply.")
+    text: str = Field(..., description="The user input text to be analyzed.")
+    providers: Optional[List[str]] = Field(
+        None, description="Only retrieve policies from these providers."
+    )
+    policy_types: Optional[List[str]] = Field(
+        None, description="Only retrieve policies of these types."
+    )
 
 
 class ClassificationResult(BaseModel):
@@ -88,6 +123,7 @@ class HateSpeechClassification(BaseModel):
 
 
 class PolicySummary(BaseModel):
+    id: Optional[str] = Field(None, description="ID of the matched policy")
     source: str = Field(..., description="Policy source (e.g., Meta, Reddit, Google)")
     summary: str = Field(..., description="Brief summary of how the policy applies")
     relevance_score: float = Field(..., description="Relevance score as percentage")
@@ -110,3 +146,9 @@ class DetailedAnalyzeResponse(BaseModel):
     action: ActionRecommendation = Field(
         ..., description="Recommended moderation action"
     )
+
+
+class AnalyzeBatchResponse(BaseModel):
+    results: List[DetailedAnalyzeResponse] = Field(
+        ..., description="One analysis per input text, in request order"
+    )
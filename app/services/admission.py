@@ -0,0 +1,125 @@
+import asyncio
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from app.config import settings
+from app.services.metrics import metrics
+from app.services.scheduler import LANE_WEIGHTS, Lane, LaneScheduler, current_lane
+from app.utils.exceptions import OverloadedError
+
+# Weight of the newest request in the running service-time average
+SERVICE_TIME_ALPHA = 0.2
+
+
+class AdmissionController:
+    """
+    Bounds the requests one worker processes at once.
+
+    Up to `max_in_flight` requests run concurrently; up to `max_queue` more
+    per lane wait for at most `queue_timeout` seconds. Anything beyond that
+    is rejected immediately with OverloadedError, whose `retry_after`
+    estimates when a slot frees up, instead of piling onto the LLM backend.
+
+    Slots are handed out by a LaneScheduler: `reserved` of them are kept for
+    interactive requests, so a saturating bulk lane (which is also shed on
+    its own budget) never gets interactive requests rejected.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_in_flight: int,
+        max_queue: int,
+        queue_timeout: float,
+        reserved: int = 0,
+    ):
+        self.name = name
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self.queued = 0
+        self._queued = {lane: 0 for lane in Lane}
+        self._service_time = 1.0
+        self._slots = LaneScheduler(
+            f"admission.{name}", max_in_flight, reserved, LANE_WEIGHTS
+        )
+
+    @asynccontextmanager
+    async def admit(self, lane: Optional[Lane] = None):
+        """Hold a processing slot for the block, in `lane` or the current one."""
+        lane = lane or current_lane.get()
+        if self._queue_full(lane):
+            self._reject("queue_full")
+        if self._slots.available(lane):
+            await self._slots.acquire(lane)
+        else:
+            await self._wait_for_slot(lane)
+
+        self.in_flight += 1
+        self._publish()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self._service_time += SERVICE_TIME_ALPHA * (elapsed - self._service_time)
+            self.in_flight -= 1
+            self._slots.release(lane)
+            self._publish()
+
+    def _queue_full(self, lane: Lane) -> bool:
+        """Whether `lane` already fills the slots it may use plus its queue."""
+        if lane is Lane.BULK:
+            running, limit = self._slots.in_flight[Lane.BULK], self._slots.bulk_limit
+        else:
+            running, limit = self.in_flight, self.max_in_flight
+        return running + self._queued[lane] >= limit + self.max_queue
+
+    async def _wait_for_slot(self, lane: Lane) -> None:
+        self.queued += 1
+        self._queued[lane] += 1
+        self._publish()
+        start = time.perf_counter()
+        acquired = False
+        try:
+            await asyncio.wait_for(self._slots.acquire(lane), self.queue_timeout)
+            acquired = True
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            self.queued -= 1
+            self._queued[lane] -= 1
+            metrics.observe(
+                f"admission.{self.name}.queue_wait", time.perf_counter() - start
+            )
+        if not acquired:
+            self._reject("queue_timeout")
+
+    def retry_after(self) -> int:
+        """Seconds until the current queue has likely drained (at least 1)."""
+        waves = (self.queued + 1) / self.max_in_flight
+        return max(1, math.ceil(self._service_time * waves))
+
+    def _reject(self, reason: str) -> None:
+        metrics.increment(f"admission.{self.name}.rejected")
+        metrics.increment(f"admission.{self.name}.rejected.{reason}")
+        self._publish()
+        raise OverloadedError(
+            f"Server is at capacity ({reason})", retry_after=self.retry_after()
+        )
+
+    def _publish(self) -> None:
+        metrics.set_gauge(f"admission.{self.name}.in_flight", self.in_flight)
+        metrics.set_gauge(f"admission.{self.name}.queued", self.queued)
+
+
+analysis_admission = AdmissionController(
+    "analyze",
+    max_in_flight=settings.ADMISSION_MAX_IN_FLIGHT,
+    max_queue=settings.ADMISSION_MAX_QUEUE,
+    queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+    reserved=settings.ADMISSION_INTERACTIVE_RESERVED,
+)
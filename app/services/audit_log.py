@@ -0,0 +1,216 @@
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import suppress
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Optional
+
+from app.config import settings
+from app.models.history import ClassificationLog
+from app.models.schemas import DetailedAnalyzeResponse
+from app.services.history_store import HistoryStore
+from app.services.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class AuditStore:
+    """
+    Append-only SQLite table of ClassificationLog rows. Each thread gets its
+    own connection; WAL mode lets forked workers append to the same file.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS classification_log ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "timestamp TEXT NOT NULL, "
+                "input_text TEXT NOT NULL, "
+                "classification TEXT NOT NULL, "
+                "policy_match TEXT NOT NULL, "
+                "moderation_action TEXT NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS classification_log_timestamp "
+                "ON classification_log (timestamp)"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def append_many(self, entries: List[ClassificationLog]) -> None:
+        with self._connection() as conn:
+            conn.executemany(
+                "INSERT INTO classification_log (timestamp, input_text, "
+                "classification, policy_match, moderation_action) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [
+                    (
+                        e.timestamp.isoformat(),
+                        e.input_text,
+                        e.classification,
+                        e.policy_match,
+                        e.moderation_action,
+                    )
+                    for e in entries
+                ],
+            )
+
+    def count(self) -> int:
+        return (
+            self._connection()
+            .execute("SELECT COUNT(*) FROM classification_log")
+            .fetchone()[0]
+        )
+
+
+class AuditLog:
+    """
+    Write-behind log of classification decisions.
+
+    `record` only appends to an in-memory queue and never waits: when the
+    queue is full the entry is dropped and counted. A background task writes
+    the queue to the AuditStore in batches, as soon as `batch_size` entries
+    are waiting or `flush_interval` seconds after the oldest one arrived.
+    `stop` flushes whatever is still queued. With a `history_path`, each batch
+    is also appended to the columnar HistoryStore used for analytics.
+    """
+
+    def __init__(
+        self,
+        store_path: str = settings.AUDIT_LOG_PATH,
+        batch_size: int = settings.AUDIT_LOG_BATCH_SIZE,
+        flush_interval: float = settings.AUDIT_LOG_FLUSH_SECONDS,
+        max_queue: int = settings.AUDIT_LOG_MAX_QUEUE,
+        history_path: Optional[str] = None,
+    ):
+        self.store_path = store_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.history_path = history_path
+        self.store: Optional[AuditStore] = None
+        self.history: Optional[HistoryStore] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Open the store and start flushing (called from the app lifespan)"""
+        if self._task is not None:
+            return
+        self.store = AuditStore(self.store_path)
+        if self.history_path:
+            self.history = HistoryStore(self.history_path)
+        self._queue = asyncio.Queue(self.max_queue)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flusher after writing out everything still queued"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+        while not self._queue.empty():
+            await self._flush(self._take(self.batch_size))
+
+    def record(
+        self,
+        text: str,
+        response: DetailedAnalyzeResponse,
+        latency_ms: Optional[float] = None,
+    ) -> None:
+        """Queue one decision. A no-op until the log has been started."""
+        if self._task is None:
+            return
+        entry = ClassificationLog(
+            input_text=text,
+            classification=response.hate_speech.classification,
+            policy_match=",".join(p.id or p.source for p in response.policies),
+            moderation_action=response.action.action.value,
+            timestamp=datetime.now(timezone.utc),
+            confidence=response.hate_speech.confidence.value,
+            severity=response.action.severity.value,
+            providers=sorted({p.source for p in response.policies}),
+            latency_ms=latency_ms,
+        )
+        try:
+            self._queue.put_nowait(entry)
+        except asyncio.QueueFull:
+            metrics.increment("audit_log.dropped")
+            return
+        metrics.set_gauge("audit_log.queued", self._queue.qsize())
+
+    def _take(self, limit: int) -> List[ClassificationLog]:
+        batch = []
+        while len(batch) < limit and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _run(self) -> None:
+        batch: List[ClassificationLog] = []
+        try:
+            while True:
+                batch = [await self._queue.get()]
+                deadline = time.monotonic() + self.flush_interval
+                while len(batch) < self.batch_size:
+                    batch.extend(self._take(self.batch_size - len(batch)))
+                    remaining = deadline - time.monotonic()
+                    if len(batch) >= self.batch_size or remaining <= 0:
+                        break
+                    try:
+                        batch.append(
+                            await asyncio.wait_for(self._queue.get(), remaining)
+                        )
+                    except asyncio.TimeoutError:
+                        break
+                # A write cancelled by stop() still completes in its thread
+                pending, batch = batch, []
+                await self._flush(pending)
+        except asyncio.CancelledError:
+            # Entries already taken off the queue would otherwise be lost
+            await self._flush(batch)
+            raise
+
+    def _write(self, batch: List[ClassificationLog]) -> None:
+        self.store.append_many(batch)
+        if self.history is None:
+            return
+        # The SQLite rows are the record of truth; a failed analytics write
+        # must not count the batch as dropped
+        try:
+            self.history.append(batch)
+        except Exception as e:
+            logger.error(f"Failed to write {len(batch)} history rows: {e}")
+            metrics.increment("history.write_errors")
+
+    async def _flush(self, batch: List[ClassificationLog]) -> None:
+        if not batch:
+            return
+        try:
+            with metrics.timer("audit_log.flush"):
+                await asyncio.to_thread(self._write, batch)
+        except Exception as e:
+            logger.error(f"Dropped {len(batch)} audit log entries: {e}")
+            metrics.increment("audit_log.dropped", len(batch))
+            return
+        metrics.increment("audit_log.written", len(batch))
+        metrics.set_gauge("audit_log.queued", self._queue.qsize())
+
+
+audit_log = AuditLog(
+    history_path=settings.HISTORY_PATH if settings.HISTORY_ENABLED else None
+)
@@ -0,0 +1,272 @@
+import heapq
+import json
+import logging
+import math
+import os
+import re
+import zlib
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from app.services.vector_store import PayloadFilter, SparseTerms, matches_filter
+from app.services.versions import bm25_index_path
+
+logger = logging.getLogger(__name__)
+
+STOPWORDS = frozenset(
+    {
+        "a",
+        "an",
+        "and",
+        "are",
+        "as",
+        "at",
+        "be",
+        "by",
+        "for",
+        "from",
+        "in",
+        "into",
+        "is",
+        "it",
+        "of",
+        "on",
+        "or",
+        "such",
+        "that",
+        "the",
+        "this",
+        "to",
+        "with",
+    }
+)
+
+_TOKEN_RE = re.compile(r"\b\w+\b")
+
+# Assumed average chunk length (in tokens) for sparse term weights; the true
+# average is not known while chunks are indexed one batch at a time
+SPARSE_AVG_TERMS = 60
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with stopwords and single characters removed."""
+    return [
+        t for t in _TOKEN_RE.findall(text.lower()) if len(t) > 1 and t not in STOPWORDS
+    ]
+
+
+def _term_id(term: str) -> int:
+    return zlib.crc32(term.encode("utf-8"))
+
+
+def sparse_terms(text: str, k1: float = 1.5, b: float = 0.75) -> SparseTerms:
+    """
+    Sparse lexical vector of a chunk: the BM25 term-frequency component of
+    each term, keyed by a stable hash of the term. The IDF part is applied
+    by the vector store at query time.
+    """
+    tfs = Counter(tokenize(text))
+    length_norm = k1 * (1 - b + b * sum(tfs.values()) / SPARSE_AVG_TERMS)
+    weights: Dict[int, float] = {}
+    for term, tf in tfs.items():
+        term_id = _term_id(term)
+        weights[term_id] = weights.get(term_id, 0.0) + tf * (k1 + 1) / (
+            tf + length_norm
+        )
+    ids = sorted(weights)
+    return ids, [weights[i] for i in ids]
+
+
+def sparse_query(text: str) -> SparseTerms:
+    """Sparse lexical vector of a query: each distinct term with weight 1."""
+    ids = sorted({_term_id(term) for term in tokenize(text)})
+    return ids, [1.0] * len(ids)
+
+
+class BM25Index:
+    """
+    Okapi BM25 inverted index over policy chunks.
+
+    Documents are stored as term-frequency maps (plus their payload, so
+    keyword-only hits can be returned without a vector store lookup);
+    the postings lists are rebuilt from them on load.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.doc_tfs: Dict[str, Dict[str, int]] = {}
+        self.payloads: Dict[str, dict] = {}
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.doc_lengths: Dict[str, int] = {}
+        self.total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.doc_tfs)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self.doc_tfs
+
+    def add(self, doc_id: str, text: str, payload: dict) -> None:
+        """Index (or re-index) a document."""
+        if doc_id in self.doc_tfs:
+            self.remove([doc_id])
+
+        self._insert(doc_id, dict(Counter(tokenize(text))), payload)
+
+    def _insert(self, doc_id: str, tfs: Dict[str, int], payload: dict) -> None:
+        self.doc_tfs[doc_id] = tfs
+        self.payloads[doc_id] = payload
+        self.doc_lengths[doc_id] = sum(tfs.values())
+        self.total_length += self.doc_lengths[doc_id]
+        for term, tf in tfs.items():
+            self.postings.setdefault(term, {})[doc_id] = tf
+
+    def remove(self, doc_ids: Iterable[str]) -> None:
+        for doc_id in doc_ids:
+            tfs = self.doc_tfs.pop(doc_id, None)
+            if tfs is None:
+                continue
+            self.payloads.pop(doc_id, None)
+            self.total_length -= self.doc_lengths.pop(doc_id, 0)
+            for term in tfs:
+                posting = self.postings.get(term)
+                if posting is not None:
+                    posting.pop(doc_id, None)
+                    if not posting:
+                        del self.postings[term]
+
+    def search(
+        self, query: str, limit: int = 10, filters: Optional[PayloadFilter] = None
+    ) -> List[dict]:
+        """
+        Return the top `limit` documents as {"id", "score", "data"} dicts,
+        considering only documents whose payload passes `filters`.
+        """
+        if not self.doc_tfs:
+            return []
+
+        n_docs = len(self.doc_tfs)
+        avg_length = self.total_length / n_docs or 1.0
+        scores: Dict[str, float] = {}
+
+        for term in set(tokenize(query)):
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            df = len(posting)
+            idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            for doc_id, tf in posting.items():
+                if filters and not matches_filter(self.payloads[doc_id], filters):
+                    continue
+                length = self.doc_lengths[doc_id]
+                norm = tf + self.k1 * (1 - self.b + self.b * length / avg_length)
+                scores[doc_id] = (
+                    scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / norm
+                )
+
+        top = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [
+            {"id": doc_id, "score": score, "data": self.payloads[doc_id]}
+            for doc_id, score in top
+        ]
+
+    def save(self, path: str) -> None:
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = target.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "k1": self.k1,
+                    "b": self.b,
+                    "docs": {
+                        doc_id: {"tf": tfs, "payload": self.payloads[doc_id]}
+                        for doc_id, tfs in self.doc_tfs.items()
+                    },
+                },
+                f,
+            )
+        os.replace(tmp_path, target)
+
+    @classmethod
+    def load(cls, path: str) -> "BM25Index":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        index = cls(k1=data.get("k1", 1.5), b=data.get("b", 0.75))
+        for doc_id, doc in data.get("docs", {}).items():
+            index._insert(doc_id, doc["tf"], doc["payload"])
+        return index
+
+
+def get_bm25_index() -> BM25Index:
+    """The BM25 side index of the active corpus version."""
+    return _load_bm25_index(bm25_index_path())
+
+
+@lru_cache(maxsize=2)
+def _load_bm25_index(path: str) -> BM25Index:
+    """Load a persisted BM25 index, or start an empty one."""
+    if os.path.exists(path):
+        try:
+            index = BM25Index.load(path)
+            logger.info(f"Loaded BM25 index with {len(index)} chunks from {path}")
+            return index
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable BM25 index {path}: {e}")
+    return BM25Index()
+
+
+def save_bm25_index() -> None:
+    path = bm25_index_path()
+    _load_bm25_index(path).save(path)
+
+
+def keyword_search(
+    query: str, limit: int = 10, filters: Optional[PayloadFilter] = None
+) -> List[dict]:
+    """BM25 search over indexed policy chunks"""
+    return get_bm25_index().search(query, limit, filters)
+
+
+def reciprocal_rank_fusion(ranked_lists: List[List[dict]], k: int = 60) -> List[dict]:
+    """
+    Fuse several ranked result lists with reciprocal rank fusion.
+
+    The fused list is ordered by RRF. Each hit keeps the payload of its first
+    occurrence, the RRF score normalized to [0, 1] (1.0 = ranked first in
+    every list) as `fused`, and the per-list raw scores as `source_scores`.
+    `score` stays the hit's score in the first (primary) list; hits missing
+    from it get the lowest score that list returned, an upper bound on theirs.
+    """
+    if not ranked_lists:
+        return []
+
+    fused: Dict[str, dict] = {}
+    for list_index, results in enumerate(ranked_lists):
+        for rank, hit in enumerate(results):
+            key = str(hit["id"])
+            entry = fused.setdefault(
+                key,
+                {
+                    "id": hit["id"],
+                    "data": hit["data"],
+                    "rrf": 0.0,
+                    "source_scores": [None] * len(ranked_lists),
+                },
+            )
+            entry["rrf"] += 1.0 / (k + rank + 1)
+            entry["source_scores"][list_index] = hit["score"]
+
+    best_possible = len(ranked_lists) / (k + 1)
+    primary = [hit["score"] for hit in ranked_lists[0]]
+    floor = min(primary) if primary else 0.0
+    merged = sorted(fused.values(), key=lambda e: e["rrf"], reverse=True)
+    for entry in merged:
+        entry["fused"] = entry.pop("rrf") / best_possible
+        first = entry["source_scores"][0]
+        entry["score"] = first if first is not None else floor
+    return merged
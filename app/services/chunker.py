@@ -0,0 +1,106 @@
+"""
+Section-level chunking of policy documents.
+
+Policy files are written as blank-line separated blocks, each usually led by
+a heading such as "Prohibited Content:" or "Enforcement Actions:" followed by
+a list. Every block becomes a chunk carrying its heading; blocks longer than
+`max_words` are split on line boundaries with a trailing overlap.
+"""
+
+from dataclasses import dataclass
+from typing import List
+
+# Lines at most this long (in words) are treated as headings
+MAX_HEADING_WORDS = 12
+
+
+@dataclass
+class PolicyChunk:
+    """A contiguous section of a policy document."""
+
+    section: str
+    text: str
+    chunk_index: int
+
+
+def _is_heading(line: str) -> bool:
+    return (
+        not line.startswith("-")
+        and len(line.split()) <= MAX_HEADING_WORDS
+        and (line.endswith(":") or not line.endswith("."))
+    )
+
+
+def _split_blocks(text: str) -> List[List[str]]:
+    blocks, current = [], []
+    for raw in text.splitlines():
+        line = raw.strip()
+        if line:
+            current.append(line)
+        elif current:
+            blocks.append(current)
+            current = []
+    if current:
+        blocks.append(current)
+    return blocks
+
+
+def _windows(lines: List[str], max_words: int, overlap_words: int) -> List[List[str]]:
+    """Group lines into windows of at most `max_words`, overlapping by whole lines."""
+    windows, current, count = [], [], 0
+    for line in lines:
+        words = len(line.split())
+        if current and count + words > max_words:
+            windows.append(current)
+            overlap, overlap_count = [], 0
+            for prev in reversed(current):
+                if overlap_count >= overlap_words:
+                    break
+                overlap.insert(0, prev)
+                overlap_count += len(prev.split())
+            current, count = overlap, overlap_count
+        current.append(line)
+        count += words
+    if current:
+        windows.append(current)
+    return windows
+
+
+def chunk_policy_text(
+    text: str, max_words: int = 120, overlap_words: int = 20
+) -> List[PolicyChunk]:
+    """
+    Split a policy document into heading-scoped chunks.
+
+    A block that consists only of a heading (the document title, or e.g.
+    "Platform-Specific Policies:") is used as a prefix for the next section.
+
+    Returns:
+        Chunks in document order.
+    """
+    chunks: List[PolicyChunk] = []
+    pending_heading = ""
+
+    for block in _split_blocks(text):
+        if len(block) == 1 and _is_heading(block[0]):
+            pending_heading = block[0].rstrip(":")
+            continue
+
+        if _is_heading(block[0]) and len(block) > 1:
+            heading, body = block[0].rstrip(":"), block[1:]
+        else:
+            heading, body = "", block
+
+        section = " > ".join(h for h in (pending_heading, heading) if h) or "General"
+        pending_heading = ""
+
+        for window in _windows(body, max_words, overlap_words):
+            chunks.append(
+                PolicyChunk(
+                    section=section,
+                    text=f"{section}:\n" + "\n".join(window),
+                    chunk_index=len(chunks),
+                )
+            )
+
+    return chunks
@@ -0,0 +1,103 @@
+import asyncio
+import logging
+import sqlite3
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+from app.config import settings
+from app.services.qdrant_client import retrieve
+
+logger = logging.getLogger(__name__)
+
+# SQLite's default limit on bound parameters is 999
+_QUERY_CHUNK = 500
+
+
+class ContentStore:
+    """
+    Chunk text keyed by point ID, in a local SQLite file.
+
+    Lets vector search skip the (large) `content` payload field: only the
+    final top-k policies have their text read, by primary key, from here.
+    Each thread gets its own connection; WAL mode lets readers run while
+    ingestion writes.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS chunks "
+                "(id TEXT PRIMARY KEY, content TEXT NOT NULL)"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def put_many(self, contents: Dict[str, str]) -> None:
+        if not contents:
+            return
+        with self._connection() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO chunks (id, content) VALUES (?, ?)",
+                contents.items(),
+            )
+
+    def get_many(self, ids: Iterable[str]) -> Dict[str, str]:
+        ids = list(dict.fromkeys(ids))
+        found: Dict[str, str] = {}
+        conn = self._connection()
+        for start in range(0, len(ids), _QUERY_CHUNK):
+            part = ids[start : start + _QUERY_CHUNK]
+            rows = conn.execute(
+                f"SELECT id, content FROM chunks WHERE id IN ({','.join('?' * len(part))})",
+                part,
+            )
+            found.update(rows)
+        return found
+
+    def delete(self, ids: Iterable[str]) -> None:
+        ids = list(ids)
+        with self._connection() as conn:
+            for start in range(0, len(ids), _QUERY_CHUNK):
+                part = ids[start : start + _QUERY_CHUNK]
+                conn.execute(
+                    f"DELETE FROM chunks WHERE id IN ({','.join('?' * len(part))})",
+                    part,
+                )
+
+
+@lru_cache(maxsize=1)
+def get_content_store() -> ContentStore:
+    return ContentStore(settings.CONTENT_STORE_PATH)
+
+
+async def fetch_contents(ids: List[str]) -> Dict[str, str]:
+    """
+    Text of the given chunks. Chunks missing from the content store (e.g. it
+    was created after the vectors) are read from the vector store payload
+    and written back.
+    """
+    store = get_content_store()
+    found = await asyncio.to_thread(store.get_many, ids)
+    missing = [point_id for point_id in ids if point_id not in found]
+    if missing:
+        logger.info(f"Backfilling {len(missing)} chunks into the content store")
+        points = await retrieve(missing, fields=["content"])
+        recovered = {
+            str(p["id"]): p["data"]["content"]
+            for p in points
+            if p["data"].get("content") is not None
+        }
+        await asyncio.to_thread(store.put_many, recovered)
+        found.update(recovered)
+    return found
@@ -17,6 +17,18 @@ class EmbeddingService:
         embedding = self.model.encode(text, normalize_embeddings=True)
         return embedding.tolist()
 
+    def embed_batch(self, texts: list[str], batch_size: int = 32) -> list[list[float]]:
+        """Encode several texts in a single model call."""
+        if not texts:
+            return []
+        if not all(isinstance(t, str) and t for t in texts):
+            raise ValueError("All texts must be non-empty strings")
+
+        embeddings = self.model.encode(
+            texts, batch_size=batch_size, normalize_embeddings=True
+        )
+        return embeddings.tolist()
+
 
 @lru_cache(maxsize=1)
 def get_embedding_service() -> EmbeddingService:
@@ -0,0 +1,151 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Optional
+
+from app.config import settings
+from app.services import qdrant_client
+from app.services.embed_service import get_embedding_service
+from app.services.metrics import metrics
+from app.services.reranker import get_reranker
+
+logger = logging.getLogger(__name__)
+
+WARMUP_TEXT = "warmup: is this message hateful?"
+
+# Dependencies that must work for the service to be ready; the others degrade
+REQUIRED_CHECKS = ("embedding", "vector_store")
+
+# "starting" until warmup succeeds, then "ready"; "failed" if a required
+# dependency did not come up; "stopping" once shutdown begins
+_state = "starting"
+_warmup: Dict[str, "CheckResult"] = {}
+_warmup_lock = asyncio.Lock()
+
+
+@dataclass
+class CheckResult:
+    """Outcome of probing one dependency."""
+
+    status: str  # "up", "down" or "skipped"
+    latency_ms: Optional[float] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        result = {"status": self.status}
+        if self.latency_ms is not None:
+            result["latency_ms"] = self.latency_ms
+        if self.error is not None:
+            result["error"] = self.error
+        return result
+
+
+async def _probe(
+    name: str, check: Callable[[], Awaitable[None]], timeout: float
+) -> CheckResult:
+    start = time.perf_counter()
+    try:
+        await asyncio.wait_for(check(), timeout)
+    except Exception as e:
+        elapsed = time.perf_counter() - start
+        metrics.increment(f"health.{name}.failures")
+        return CheckResult("down", round(elapsed * 1000, 3), str(e) or type(e).__name__)
+    elapsed = time.perf_counter() - start
+    metrics.observe(f"health.{name}", elapsed)
+    return CheckResult("up", round(elapsed * 1000, 3))
+
+
+def _checks(llm_service=None) -> Dict[str, Optional[Callable[[], Awaitable[None]]]]:
+    """One probe per dependency; None for the ones that are turned off."""
+    embedding_service = get_embedding_service()
+    reranker = get_reranker()
+
+    async def embedding():
+        # The first forward pass allocates torch buffers and is much slower
+        await asyncio.to_thread(embedding_service.embed_text, WARMUP_TEXT)
+
+    async def vector_store():
+        # Any unit vector will do; this opens the pooled connection
+        probe = [1.0] + [0.0] * (embedding_service.dimension - 1)
+        await qdrant_client.search(probe, limit=1)
+
+    async def rerank():
+        await asyncio.to_thread(reranker.score, WARMUP_TEXT, [WARMUP_TEXT])
+
+    async def llm():
+        await llm_service.ping()
+
+    return {
+        "embedding": embedding,
+        "vector_store": vector_store,
+        "reranker": rerank if reranker is not None else None,
+        "llm": llm if llm_service is not None and settings.LLM_PING_ENABLED else None,
+    }
+
+
+async def _run_checks(llm_service, timeout: float) -> Dict[str, CheckResult]:
+    checks = _checks(llm_service)
+    names = [name for name, check in checks.items() if check is not None]
+    results = await asyncio.gather(
+        *(_probe(name, checks[name], timeout) for name in names)
+    )
+    report = {name: CheckResult("skipped") for name in checks}
+    report.update(zip(names, results))
+    return report
+
+
+def _healthy(report: Dict[str, CheckResult]) -> bool:
+    return all(report[name].status == "up" for name in REQUIRED_CHECKS)
+
+
+async def warm_up(llm_service=None) -> bool:
+    """
+    Prime the embedding model, the vector store connection, the reranker and
+    (with LLM_PING_ENABLED) the DIAL connection, so the first real request
+    does not pay for them. The service is ready once the required ones work.
+    """
+    global _state, _warmup
+    async with _warmup_lock:
+        if _state in ("ready", "stopping"):
+            return _state == "ready"
+        if not settings.WARMUP_ENABLED:
+            _state = "ready"
+            return True
+        start = time.perf_counter()
+        _warmup = await _run_checks(llm_service, settings.WARMUP_TIMEOUT_SECONDS)
+        _state = "ready" if _healthy(_warmup) else "failed"
+        failed = [name for name, r in _warmup.items() if r.status == "down"]
+        if failed:
+            logger.warning(f"Warmup failed for: {', '.join(failed)}")
+        logger.info(f"Warmup finished in {time.perf_counter() - start:.2f}s ({_state})")
+        return _state == "ready"
+
+
+def readiness_state() -> str:
+    return _state
+
+
+def mark_stopping() -> None:
+    """Stop reporting ready while the app shuts down."""
+    global _state
+    _state = "stopping"
+
+
+def warmup_report() -> dict:
+    return {name: result.to_dict() for name, result in _warmup.items()}
+
+
+async def check_health(llm_service=None) -> dict:
+    """Probe every dependency now. `status` is "down" if a required one is."""
+    report = await _run_checks(llm_service, settings.HEALTH_CHECK_TIMEOUT_SECONDS)
+    if not _healthy(report):
+        status = "down"
+    elif any(r.status == "down" for r in report.values()):
+        status = "degraded"
+    else:
+        status = "ok"
+    return {
+        "status": status,
+        "dependencies": {name: r.to_dict() for name, r in report.items()},
+    }
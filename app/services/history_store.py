@@ -0,0 +1,297 @@
+import argparse
+import fcntl
+import json
+import uuid
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from app.config import settings
+from app.models.history import ClassificationLog
+
+# Columns stored in the Parquet files; date and label are directory partitions
+SCHEMA = pa.schema(
+    [
+        ("timestamp", pa.timestamp("us", tz="UTC")),
+        ("confidence", pa.string()),
+        ("action", pa.string()),
+        ("severity", pa.string()),
+        ("providers", pa.list_(pa.string())),
+        ("policy_ids", pa.list_(pa.string())),
+        ("latency_ms", pa.float64()),
+    ]
+)
+PARTITIONING = ds.partitioning(
+    pa.schema([("date", pa.string()), ("label", pa.string())]), flavor="hive"
+)
+
+BUCKETS = ("hour", "day", "week", "month")
+# Columns that /history/distribution can count by
+DIMENSIONS = ("label", "action", "severity", "confidence")
+PERCENTILES = (0.5, 0.95, 0.99)
+# Held shared by queries and exclusively while compaction swaps files; the
+# leading dot keeps it out of the dataset
+LOCK_FILENAME = ".lock"
+
+
+def _bucket_value(value) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+class HistoryStore:
+    """
+    Analysis history as Parquet files partitioned by date and label
+    (<path>/date=2026-10-19/label=hate/part-*.parquet).
+
+    Every write-behind flush adds one file per (date, label) it touches.
+    Queries read only the columns they need, and date/label predicates prune
+    whole partitions before any file is opened, so dashboards over months of
+    history only touch the days and labels asked for. `compact` merges each
+    past day's small files into one per partition.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+
+    # ─── Writing ──────────────────────────────────────────────────────
+
+    def append(self, entries: List[ClassificationLog]) -> None:
+        if not entries:
+            return
+        timestamps = [e.timestamp.astimezone(timezone.utc) for e in entries]
+        table = pa.table(
+            {
+                "timestamp": timestamps,
+                "confidence": [e.confidence for e in entries],
+                "action": [e.moderation_action for e in entries],
+                "severity": [e.severity for e in entries],
+                "providers": [e.providers for e in entries],
+                "policy_ids": [
+                    [p for p in e.policy_match.split(",") if p] for e in entries
+                ],
+                "latency_ms": [e.latency_ms for e in entries],
+                "date": [t.date().isoformat() for t in timestamps],
+                "label": [e.classification.lower() for e in entries],
+            },
+            schema=SCHEMA.append(pa.field("date", pa.string())).append(
+                pa.field("label", pa.string())
+            ),
+        )
+        ds.write_dataset(
+            table,
+            self.path,
+            format="parquet",
+            partitioning=PARTITIONING,
+            # Unique per flush, so concurrent workers never collide
+            basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+        )
+
+    def compact(self, before: Optional[date] = None) -> int:
+        """
+        Merge the files of every partition dated before `before` (default:
+        today, UTC, which is still being written) into one. Returns files
+        removed.
+
+        The merged file is written under a hidden name first. Removing the
+        originals and renaming it in happens under the exclusive lock that
+        queries hold shared, so a query never sees rows twice or not at all.
+        """
+        before = before or datetime.now(timezone.utc).date()
+        removed = 0
+        for partition in sorted(self.path.glob("date=*/label=*")):
+            if partition.parent.name.split("=", 1)[1] >= before.isoformat():
+                continue
+            files = sorted(partition.glob("*.parquet"))
+            if len(files) < 2:
+                continue
+            table = pa.concat_tables(pq.read_table(f, schema=SCHEMA) for f in files)
+            table = table.sort_by("timestamp")
+            tmp = partition / f".compact-{uuid.uuid4().hex}.tmp"
+            pq.write_table(table, tmp)
+            with self._locked(fcntl.LOCK_EX):
+                for f in files:
+                    f.unlink()
+                tmp.rename(partition / f"part-{uuid.uuid4().hex}-compacted.parquet")
+            removed += len(files) - 1
+        return removed
+
+    @contextmanager
+    def _locked(self, operation: int):
+        with open(self.path / LOCK_FILENAME, "a") as lock_file:
+            fcntl.flock(lock_file, operation)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    # ─── Queries ──────────────────────────────────────────────────────
+
+    def _scan(
+        self,
+        columns: List[str],
+        start: date,
+        end: date,
+        labels: Optional[List[str]] = None,
+    ) -> pa.Table:
+        if not self.path.exists():
+            return pa.table({c: pa.array([], self._type(c)) for c in columns})
+        condition = (ds.field("date") >= start.isoformat()) & (
+            ds.field("date") <= end.isoformat()
+        )
+        if labels:
+            condition &= ds.field("label").isin([label.lower() for label in labels])
+        # File discovery and reads must not interleave with a compaction swap
+        with self._locked(fcntl.LOCK_SH):
+            dataset = ds.dataset(
+                self.path,
+                format="parquet",
+                partitioning=PARTITIONING,
+                exclude_invalid_files=True,
+            )
+            return dataset.to_table(columns=columns, filter=condition)
+
+    @staticmethod
+    def _type(column: str) -> pa.DataType:
+        return SCHEMA.field(column).type if column in SCHEMA.names else pa.string()
+
+    def distribution(
+        self,
+        by: str,
+        start: date,
+        end: date,
+        bucket: str = "day",
+        labels: Optional[List[str]] = None,
+    ) -> List[dict]:
+        """Analyses per time bucket and value of `by` (label, action, ...)."""
+        table = self._scan(["timestamp", by], start, end, labels)
+        grouped = (
+            pa.table(
+                {
+                    "bucket": pc.floor_temporal(table["timestamp"], unit=bucket),
+                    by: table[by],
+                }
+            )
+            .group_by(["bucket", by])
+            .aggregate([([], "count_all")])
+            .sort_by([("bucket", "ascending"), (by, "ascending")])
+        )
+        return [
+            {
+                "bucket": _bucket_value(row["bucket"]),
+                by: row[by],
+                "count": row["count_all"],
+            }
+            for row in grouped.to_pylist()
+        ]
+
+    def provider_hits(
+        self, start: date, end: date, labels: Optional[List[str]] = None
+    ) -> dict:
+        """Share of analyses that matched at least one policy of each provider."""
+        providers = self._scan(["providers"], start, end, labels)["providers"]
+        total = len(providers)
+        flat = pc.list_flatten(providers)
+        pairs = (
+            pa.table({"row": pc.list_parent_indices(providers), "provider": flat})
+            .group_by(["row", "provider"])
+            .aggregate([])
+        )
+        hits = pairs.group_by("provider").aggregate([([], "count_all")])
+        rows = sorted(hits.to_pylist(), key=lambda r: -r["count_all"])
+        return {
+            "analyses": total,
+            "providers": [
+                {
+                    "provider": r["provider"],
+                    "hits": r["count_all"],
+                    "hit_rate": round(r["count_all"] / total, 4) if total else 0.0,
+                }
+                for r in rows
+            ],
+        }
+
+    def latency(
+        self,
+        start: date,
+        end: date,
+        bucket: str = "day",
+        labels: Optional[List[str]] = None,
+    ) -> List[dict]:
+        """Count, mean and p50/p95/p99 latency (ms) per time bucket."""
+        table = self._scan(["timestamp", "latency_ms"], start, end, labels)
+        grouped = (
+            pa.table(
+                {
+                    "bucket": pc.floor_temporal(table["timestamp"], unit=bucket),
+                    "latency_ms": table["latency_ms"],
+                }
+            )
+            .group_by("bucket")
+            .aggregate(
+                [
+                    ("latency_ms", "count"),
+                    ("latency_ms", "mean"),
+                    ("latency_ms", "tdigest", pc.TDigestOptions(q=list(PERCENTILES))),
+                ]
+            )
+            .sort_by("bucket")
+        )
+        results = []
+        for row in grouped.to_pylist():
+            quantiles = row["latency_ms_tdigest"] or [None] * len(PERCENTILES)
+            result = {
+                "bucket": _bucket_value(row["bucket"]),
+                "count": row["latency_ms_count"],
+                "mean_ms": row["latency_ms_mean"],
+            }
+            for q, value in zip(PERCENTILES, quantiles):
+                result[f"p{int(q * 100)}_ms"] = value
+            results.append(result)
+        return results
+
+
+@lru_cache(maxsize=1)
+def get_history_store() -> HistoryStore:
+    return HistoryStore(settings.HISTORY_PATH)
+
+
+def default_range(start: Optional[date], end: Optional[date]) -> Tuple[date, date]:
+    """Fill in a missing end (today, UTC) and start (HISTORY_DEFAULT_DAYS back)"""
+    end = end or datetime.now(timezone.utc).date()
+    start = start or end - timedelta(days=settings.HISTORY_DEFAULT_DAYS - 1)
+    return start, end
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query the analysis history")
+    parser.add_argument(
+        "query", choices=["distribution", "providers", "latency", "compact"]
+    )
+    parser.add_argument("--path", default=settings.HISTORY_PATH)
+    parser.add_argument("--start", type=date.fromisoformat)
+    parser.add_argument("--end", type=date.fromisoformat)
+    parser.add_argument("--bucket", choices=BUCKETS, default="day")
+    parser.add_argument("--by", choices=DIMENSIONS, default="label")
+    parser.add_argument("--label", action="append", help="repeat for several")
+    args = parser.parse_args()
+
+    store = HistoryStore(args.path)
+    start, end = default_range(args.start, args.end)
+    if args.query == "compact":
+        print(f"✅ Removed {store.compact()} files")
+    elif args.query == "distribution":
+        result = store.distribution(args.by, start, end, args.bucket, args.label)
+        print(json.dumps(result, indent=2))
+    elif args.query == "providers":
+        print(json.dumps(store.provider_hits(start, end, args.label), indent=2))
+    else:
+        result = store.latency(start, end, args.bucket, args.label)
+        print(json.dumps(result, indent=2))
@@ -0,0 +1,258 @@
+import asyncio
+import hashlib
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import AsyncIterable, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from app.config import settings
+from app.models.policies import PolicyMetadata
+from app.services.bm25 import (
+    BM25Index,
+    get_bm25_index,
+    save_bm25_index,
+    sparse_terms,
+    tokenize,
+)
+from app.services.chunker import chunk_policy_text
+from app.services.content_store import get_content_store
+from app.services.embed_service import get_embedding_service
+from app.services.metrics import metrics
+from app.services.qdrant_client import flush, upsert
+from app.services.scheduler import Lane, embedding_scheduler
+from app.services.vector_store import VectorStore
+
+logger = logging.getLogger(__name__)
+
+# (point id, text to embed, payload)
+ChunkPoint = Tuple[str, str, dict]
+
+# Namespace for deterministic point IDs (Qdrant requires UUIDs or integers)
+POINT_NAMESPACE = uuid.UUID("6f1c1f3e-2b9a-4f57-9a43-3f5d7c1b8e21")
+
+
+@dataclass
+class IngestionReport:
+    """Outcome of a bulk ingestion run."""
+
+    documents: int = 0
+    chunks: int = 0
+    batches: int = 0
+    failed_batches: int = 0
+    failed_chunks: int = 0
+    seconds: float = 0.0
+    stored: Dict[str, List[str]] = field(default_factory=dict)
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def docs_per_second(self) -> float:
+        return self.documents / self.seconds if self.seconds > 0 else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "documents": self.documents,
+            "chunks": self.chunks,
+            "batches": self.batches,
+            "failed_batches": self.failed_batches,
+            "failed_chunks": self.failed_chunks,
+            "seconds": round(self.seconds, 3),
+            "docs_per_second": round(self.docs_per_second, 2),
+            "ids": self.stored,
+            "errors": self.errors,
+        }
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def parent_id_for(policy: PolicyMetadata) -> str:
+    """
+    Files are identified by filename; API-submitted policies by a hash of
+    their provider, type and text, so re-submitting the same policy is a no-op.
+    """
+    if policy.filename:
+        return policy.filename
+    digest = content_hash(f"{policy.provider}\n{policy.policy_type}\n{policy.content}")
+    return f"api-{digest[:16]}"
+
+
+def point_id_for(parent_id: str, chunk_index: int, text: str) -> str:
+    """Deterministic point ID, so re-indexing overwrites instead of duplicating."""
+    return str(
+        uuid.uuid5(POINT_NAMESPACE, f"{parent_id}#{chunk_index}:{content_hash(text)}")
+    )
+
+
+def policy_to_points(policy: PolicyMetadata) -> List[ChunkPoint]:
+    """Chunk a policy and build the points to index, all sharing one parent_id."""
+    parent_id = parent_id_for(policy)
+    chunks = chunk_policy_text(
+        policy.content,
+        max_words=settings.CHUNK_MAX_WORDS,
+        overlap_words=settings.CHUNK_OVERLAP_WORDS,
+    )
+    return [
+        (
+            point_id_for(parent_id, chunk.chunk_index, chunk.text),
+            chunk.text,
+            {
+                "provider": policy.provider,
+                "type": policy.policy_type,
+                "title": policy.title,
+                "content": chunk.text,
+                "section": chunk.section,
+                "chunk_index": chunk.chunk_index,
+                "parent_id": parent_id,
+                "filename": policy.filename,
+                "word_count": len(chunk.text.split()),
+                # Normalized token set, so reranking needs no per-request scanning
+                "terms": sorted(set(tokenize(chunk.text))),
+            },
+        )
+        for chunk in chunks
+    ]
+
+
+async def _aiter(documents: Union[Iterable, AsyncIterable]):
+    if hasattr(documents, "__aiter__"):
+        async for doc in documents:
+            yield doc
+    else:
+        for doc in documents:
+            yield doc
+
+
+class IngestionPipeline:
+    """
+    Streams policy documents into the vector store.
+
+    Chunks are grouped into fixed-size batches; each batch is embedded with a
+    single encode call and written with a single upsert. At most `concurrency`
+    batches are in flight, which also bounds how far the input is read ahead.
+    Failed batches are retried with exponential backoff. Encode calls take
+    bulk-lane slots of the embedding scheduler, so ingestion never uses the
+    ones reserved for interactive queries.
+
+    By default chunks go to the live vector store and BM25 index; a reindex
+    passes the store and index of the corpus version it is building.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = settings.INGEST_BATCH_SIZE,
+        concurrency: int = settings.INGEST_CONCURRENCY,
+        max_retries: int = settings.INGEST_MAX_RETRIES,
+        retry_backoff: float = 0.5,
+        vector_store: Optional[VectorStore] = None,
+        bm25_index: Optional[BM25Index] = None,
+    ):
+        if batch_size < 1 or concurrency < 1:
+            raise ValueError("batch_size and concurrency must be positive")
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.vector_store = vector_store
+        self.bm25_index = bm25_index
+        self.embedding_service = get_embedding_service()
+
+    async def run(
+        self,
+        documents: Union[Iterable[PolicyMetadata], AsyncIterable[PolicyMetadata]],
+        skip_ids: Optional[Set[str]] = None,
+    ) -> IngestionReport:
+        """
+        Ingest `documents`. Chunks whose point ID is in `skip_ids` are already
+        indexed with identical content and are neither embedded nor upserted.
+        """
+        skip_ids = skip_ids or set()
+        report = IngestionReport()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks: List[asyncio.Task] = []
+        pending: List[ChunkPoint] = []
+        start = time.perf_counter()
+
+        async def dispatch(batch: List[ChunkPoint]):
+            await semaphore.acquire()
+            report.batches += 1
+            tasks.append(asyncio.create_task(self._run_batch(batch, semaphore, report)))
+
+        async for policy in _aiter(documents):
+            report.documents += 1
+            pending.extend(p for p in policy_to_points(policy) if p[0] not in skip_ids)
+            while len(pending) >= self.batch_size:
+                batch, pending = pending[: self.batch_size], pending[self.batch_size :]
+                await dispatch(batch)
+
+        if pending:
+            await dispatch(pending)
+        await asyncio.gather(*tasks)
+        if report.chunks:
+            await flush(self.vector_store)
+        if report.chunks and self.bm25_index is None:
+            save_bm25_index()
+
+        report.seconds = time.perf_counter() - start
+        metrics.increment("ingestion.documents", report.documents)
+        metrics.increment("ingestion.failed_batches", report.failed_batches)
+        metrics.set_gauge("ingestion.docs_per_second", report.docs_per_second)
+        logger.info(
+            f"Ingested {report.documents} documents ({report.chunks} chunks, "
+            f"{report.batches} batches) in {report.seconds:.2f}s "
+            f"= {report.docs_per_second:.1f} docs/s; "
+            f"{report.failed_batches} batches failed"
+        )
+        return report
+
+    async def _run_batch(
+        self,
+        batch: List[ChunkPoint],
+        semaphore: asyncio.Semaphore,
+        report: IngestionReport,
+    ) -> None:
+        ids = [point[0] for point in batch]
+        texts = [point[1] for point in batch]
+        payloads = [point[2] for point in batch]
+        sparse_vectors = [sparse_terms(text) for text in texts]
+
+        try:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    with metrics.timer("ingestion.batch"):
+                        # Shares the model with queries, which keep their reserve
+                        async with embedding_scheduler.slot(Lane.BULK):
+                            vectors = await asyncio.to_thread(
+                                self.embedding_service.embed_batch, texts
+                            )
+                        await upsert(
+                            ids,
+                            vectors,
+                            payloads,
+                            store=self.vector_store,
+                            sparse_vectors=sparse_vectors,
+                        )
+                    break
+                except Exception as e:
+                    if attempt == self.max_retries:
+                        logger.error(f"Batch of {len(batch)} chunks failed: {e}")
+                        report.failed_batches += 1
+                        report.failed_chunks += len(batch)
+                        report.errors.append(str(e))
+                        return
+                    delay = self.retry_backoff * (2**attempt)
+                    logger.warning(
+                        f"Batch failed (attempt {attempt + 1}), retrying in {delay}s: {e}"
+                    )
+                    await asyncio.sleep(delay)
+
+            report.chunks += len(batch)
+            await asyncio.to_thread(get_content_store().put_many, dict(zip(ids, texts)))
+            bm25 = self.bm25_index if self.bm25_index is not None else get_bm25_index()
+            for point_id, text, payload in batch:
+                bm25.add(point_id, text, payload)
+            for point_id, payload in zip(ids, payloads):
+                report.stored.setdefault(payload["parent_id"], []).append(point_id)
+        finally:
+            semaphore.release()
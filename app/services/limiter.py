@@ -0,0 +1,80 @@
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+from app.services.metrics import metrics
+from app.services.scheduler import LaneScheduler
+
+# Weight of the newest sample in the running latency baseline
+BASELINE_ALPHA = 0.05
+
+
+class AIMDLimiter:
+    """
+    Adapts a LaneScheduler's capacity to what the backend can take.
+
+    Every healthy call raises the limit by 1 / limit, i.e. by about one slot
+    per limit's worth of calls (additive increase). A call that fails with an
+    overload error, or takes longer than `latency_tolerance` times the running
+    latency baseline, multiplies the limit by `backoff` (multiplicative
+    decrease). Decreases are spaced at least one baseline latency apart, so a
+    burst of 429s from calls that were in flight together counts once. The
+    limit stays within [floor, ceiling].
+    """
+
+    def __init__(
+        self,
+        scheduler: LaneScheduler,
+        floor: int,
+        ceiling: int,
+        backoff: float = 0.5,
+        latency_tolerance: float = 2.0,
+        is_overload: Callable[[Exception], bool] = lambda e: False,
+    ):
+        self.scheduler = scheduler
+        self.floor = floor
+        self.ceiling = max(floor, ceiling)
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.is_overload = is_overload
+        self._baseline: Optional[float] = None
+        self._last_decrease = float("-inf")
+        self.limit = 0.0
+        self._set_limit(scheduler.capacity)
+
+    @contextmanager
+    def track(self):
+        """Feed the outcome and latency of the call in the block to the limiter."""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            if self.is_overload(e):
+                self._decrease("overload")
+            raise
+        self._on_success(time.perf_counter() - start)
+
+    def _on_success(self, latency: float) -> None:
+        if self._baseline is None:
+            self._baseline = latency
+        if latency > self._baseline * self.latency_tolerance:
+            self._decrease("latency")
+        else:
+            self._set_limit(self.limit + 1 / self.limit)
+        # Updated on every sample so a lasting latency shift becomes the new normal
+        self._baseline += BASELINE_ALPHA * (latency - self._baseline)
+
+    def _decrease(self, reason: str) -> None:
+        now = time.perf_counter()
+        if now - self._last_decrease < (self._baseline or 0.0):
+            return
+        self._last_decrease = now
+        metrics.increment(f"scheduler.{self.scheduler.name}.limit_decrease.{reason}")
+        self._set_limit(self.limit * self.backoff)
+
+    def _set_limit(self, limit: float) -> None:
+        self.limit = min(self.ceiling, max(self.floor, limit))
+        metrics.set_gauge(f"scheduler.{self.scheduler.name}.limit", self.limit)
+        capacity = int(self.limit)
+        if capacity != self.scheduler.capacity:
+            self.scheduler.set_capacity(capacity)
@@ -2,12 +2,17 @@
 import json
 import logging
 import os
+from contextlib import contextmanager
 from typing import Any, Dict
 
+import openai
 from dotenv import load_dotenv
 from langchain.schema import HumanMessage, SystemMessage
 from langchain_openai import AzureChatOpenAI
 
+from app.config import settings
+from app.services.limiter import AIMDLimiter
+from app.services.scheduler import llm_scheduler
 from app.utils.exceptions import LLMServiceError
 
 load_dotenv()
@@ -16,6 +21,37 @@ logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
 
+def _is_overload(exc: Exception) -> bool:
+    """429s and timeouts mean DIAL is saturated"""
+    return isinstance(
+        exc, (openai.RateLimitError, openai.APITimeoutError, TimeoutError)
+    )
+
+
+llm_limiter = (
+    AIMDLimiter(
+        llm_scheduler,
+        floor=settings.LLM_CONCURRENCY_FLOOR,
+        ceiling=settings.LLM_CONCURRENCY_CEILING,
+        backoff=settings.LLM_AIMD_BACKOFF,
+        latency_tolerance=settings.LLM_AIMD_LATENCY_TOLERANCE,
+        is_overload=_is_overload,
+    )
+    if settings.LLM_ADAPTIVE_CONCURRENCY
+    else None
+)
+
+
+@contextmanager
+def _tracked():
+    """Report the DIAL call in the block to the adaptive limiter, if enabled"""
+    if llm_limiter is None:
+        yield
+    else:
+        with llm_limiter.track():
+            yield
+
+
 class DIALService:
     """
     DIALService wraps LangChain's AzureChatOpenAI for classifying text via the DIAL API.
@@ -42,6 +78,16 @@ class DIALService:
             logger.error(f"Failed to initialize AzureChatOpenAI: {e}")
             raise LLMServiceError("DIALService initialization failed")
 
+    async def ping(self) -> None:
+        """
+        Minimal one-token completion. Opens (and so warms) the HTTPS
+        connection to DIAL; used by warmup and health checks.
+        """
+        try:
+            await self.client.ainvoke([HumanMessage(content="ping")], max_tokens=1)
+        except Exception as e:
+            raise LLMServiceError(f"DIAL ping failed: {e}")
+
     async def classify_text(self, text: str) -> Dict[str, Any]:
         """
         Sends a classification prompt to the DIAL LLM and parses the response as JSON.
@@ -63,7 +109,9 @@ class DIALService:
 
         try:
             logger.info(f"Sending classification request to DIAL for: {text}")
-            response = await self.client.ainvoke(messages)
+            async with llm_scheduler.slot():
+                with _tracked():
+                    response = await self.client.ainvoke(messages)
             content = response.content.strip()
             logger.info(f"Raw LLM response: {content}")
 
@@ -94,7 +142,9 @@ class DIALService:
 
         try:
             logger.info("Sending reasoning prompt to DIAL")
-            response = await self.client.ainvoke(messages)
+            async with llm_scheduler.slot():
+                with _tracked():
+                    response = await self.client.ainvoke(messages)
             content = response.content.strip()
             logger.info(f"Raw reasoning response: {content}")
 
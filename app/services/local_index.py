@@ -0,0 +1,276 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+
+from app.services.vector_store import (
+    BatchBoosts,
+    PayloadBoosts,
+    PayloadFilter,
+    SparseTerms,
+    VectorStore,
+    boosts_per_query,
+    matches_filter,
+    payload_boost,
+    project,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class LocalVectorStore(VectorStore):
+    """
+    In-process vector store backed by a dense NumPy matrix.
+
+    The policy corpus is small enough that an exact cosine search
+    (one matrix-vector product) is cheaper than a network round trip.
+    The index is persisted to a single .npz file so it survives restarts.
+    Writes are saved in a background thread, coalescing whatever changed while
+    the previous save ran; `flush` (also called by `close`) waits for them.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._dirty = False
+        self._saving: Optional[asyncio.Task] = None
+        self._ids: list[str] = []
+        self._payloads: list[dict] = []
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+
+        if self.path.exists():
+            self._load()
+
+    async def init_collection(self, dimension: int) -> None:
+        with self._lock:
+            if self._matrix.shape[0] == 0:
+                self._matrix = np.zeros((0, dimension), dtype=np.float32)
+            elif self._matrix.shape[1] != dimension:
+                raise ValueError(
+                    f"Local index at {self.path} has dimension "
+                    f"{self._matrix.shape[1]}, expected {dimension}"
+                )
+
+    async def close(self) -> None:
+        await self.flush()
+
+    async def flush(self) -> None:
+        if self._saving is not None:
+            await self._saving
+        if self._dirty:
+            # The background save failed; retry here and let the error surface
+            self._dirty = False
+            await asyncio.to_thread(self._save)
+
+    async def drop(self) -> None:
+        await self.flush()
+        with self._lock:
+            self._ids, self._payloads = [], []
+            self._matrix = np.zeros((0, 0), dtype=np.float32)
+            self.path.unlink(missing_ok=True)
+
+    async def add(
+        self,
+        ids: list[str],
+        vectors: list[list[float]],
+        payloads: list[dict],
+        sparse_vectors: Optional[List[SparseTerms]] = None,
+    ) -> None:
+        if not ids:
+            return
+        new_rows = self._normalize(np.asarray(vectors, dtype=np.float32))
+
+        with self._lock:
+            index = {point_id: i for i, point_id in enumerate(self._ids)}
+            matrix = self._matrix
+            if matrix.shape[0] == 0:
+                matrix = np.zeros((0, new_rows.shape[1]), dtype=np.float32)
+            if matrix.shape[1] != new_rows.shape[1]:
+                raise ValueError("Vector dimension does not match the local index")
+
+            # Copy-on-write so concurrent searches keep a consistent snapshot
+            matrix = matrix.copy()
+            point_ids = list(self._ids)
+            point_payloads = list(self._payloads)
+            appended = []
+
+            for row, (point_id, payload) in enumerate(zip(ids, payloads)):
+                if point_id in index:
+                    matrix[index[point_id]] = new_rows[row]
+                    point_payloads[index[point_id]] = payload
+                else:
+                    index[point_id] = len(point_ids)
+                    point_ids.append(point_id)
+                    point_payloads.append(payload)
+                    appended.append(row)
+
+            if appended:
+                matrix = np.vstack([matrix, new_rows[appended]])
+
+            self._matrix, self._ids, self._payloads = matrix, point_ids, point_payloads
+        self._schedule_save()
+
+    async def delete(self, ids: list[str]) -> None:
+        removed = set(ids)
+        with self._lock:
+            keep = [
+                i for i, point_id in enumerate(self._ids) if point_id not in removed
+            ]
+            if len(keep) == len(self._ids):
+                return
+            self._matrix = self._matrix[keep]
+            self._ids = [self._ids[i] for i in keep]
+            self._payloads = [self._payloads[i] for i in keep]
+        self._schedule_save()
+
+    async def count(self) -> int:
+        return len(self._ids)
+
+    async def scroll(
+        self, offset: Any = None, limit: int = 256
+    ) -> Tuple[list[dict], Any]:
+        start = offset or 0
+        matrix, ids, payloads = self._matrix, self._ids, self._payloads
+        end = min(start + limit, len(ids))
+        points = [
+            {"id": ids[i], "vector": matrix[i].tolist(), "data": payloads[i]}
+            for i in range(start, end)
+        ]
+        return points, (end if end < len(ids) else None)
+
+    async def retrieve(
+        self, ids: list[str], fields: Optional[List[str]] = None
+    ) -> list[dict]:
+        wanted = set(ids)
+        point_ids, payloads = self._ids, self._payloads
+        return [
+            {"id": point_id, "data": project(payload, fields)}
+            for point_id, payload in zip(point_ids, payloads)
+            if point_id in wanted
+        ]
+
+    async def search(
+        self,
+        vector: list[float],
+        limit: int = 3,
+        filters: Optional[PayloadFilter] = None,
+        boosts: Optional[PayloadBoosts] = None,
+        fields: Optional[List[str]] = None,
+    ) -> list[dict]:
+        return (await self.search_batch([vector], limit, filters, boosts, fields))[0]
+
+    async def search_batch(
+        self,
+        vectors: list[list[float]],
+        limit: int = 3,
+        filters: Optional[PayloadFilter] = None,
+        boosts: Optional[BatchBoosts] = None,
+        fields: Optional[List[str]] = None,
+    ) -> list[list[dict]]:
+        matrix, ids, payloads = self._matrix, self._ids, self._payloads
+        if not vectors:
+            return []
+        if matrix.shape[0] == 0:
+            return [[] for _ in vectors]
+
+        queries = self._normalize(np.asarray(vectors, dtype=np.float32))
+        scores = queries @ matrix.T
+        per_query = boosts_per_query(boosts, len(vectors))
+        if any(per_query):
+            bonus_rows: dict = {}
+            for row, query_boosts in enumerate(per_query):
+                if not query_boosts:
+                    continue
+                key = json.dumps(query_boosts, sort_keys=True)
+                if key not in bonus_rows:
+                    bonus_rows[key] = np.array(
+                        [payload_boost(p, query_boosts) for p in payloads]
+                    )
+                scores[row] += bonus_rows[key]
+        candidates = matrix.shape[0]
+        if filters:
+            allowed = np.array([matches_filter(p, filters) for p in payloads])
+            scores[:, ~allowed] = -np.inf
+            candidates = int(allowed.sum())
+        k = min(limit, candidates)
+        if k == 0:
+            return [[] for _ in vectors]
+
+        results = []
+        for row in scores:
+            top = np.argpartition(-row, k - 1)[:k]
+            top = top[np.argsort(-row[top])]
+            results.append(
+                [
+                    {
+                        "id": ids[i],
+                        "score": float(row[i]),
+                        "data": project(payloads[i], fields),
+                    }
+                    for i in top
+                ]
+            )
+        return results
+
+    async def hybrid_search_batch(
+        self,
+        vectors: list[list[float]],
+        sparse_queries: List[SparseTerms],
+        limit: int = 3,
+        filters: Optional[PayloadFilter] = None,
+        boosts: Optional[BatchBoosts] = None,
+        fields: Optional[List[str]] = None,
+    ) -> list[list[dict]]:
+        raise NotImplementedError(
+            "The local vector store keeps no sparse vectors; "
+            "it is fused with the BM25 index client-side (HYBRID_FUSION=client)"
+        )
+
+    def _normalize(self, matrix: np.ndarray) -> np.ndarray:
+        if matrix.ndim == 1:
+            matrix = matrix.reshape(1, -1)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def _load(self) -> None:
+        with np.load(self.path, allow_pickle=False) as data:
+            self._matrix = data["vectors"].astype(np.float32)
+            self._ids = [str(i) for i in data["ids"]]
+            self._payloads = json.loads(str(data["payloads"]))
+        logger.info(f"Loaded {len(self._ids)} vectors from {self.path}")
+
+    def _schedule_save(self) -> None:
+        self._dirty = True
+        if self._saving is None or self._saving.done():
+            self._saving = asyncio.create_task(self._save_pending())
+
+    async def _save_pending(self) -> None:
+        try:
+            while self._dirty:
+                self._dirty = False
+                await asyncio.to_thread(self._save)
+        except Exception as e:
+            self._dirty = True
+            logger.error(f"Failed to save local index {self.path}: {e}")
+
+    def _save(self) -> None:
+        # Always writes the latest state; the arrays are replaced, never mutated
+        with self._save_lock:
+            with self._lock:
+                matrix, ids, payloads = self._matrix, self._ids, self._payloads
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp.npz")
+            np.savez(
+                tmp_path,
+                vectors=matrix,
+                ids=np.asarray(ids, dtype=str),
+                payloads=np.asarray(json.dumps(payloads)),
+            )
+            os.replace(tmp_path, self.path)
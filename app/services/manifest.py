@@ -0,0 +1,71 @@
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+
+
+class IndexManifest:
+    """
+    Record of which policy sources are indexed, with their content hash and
+    the point IDs of their chunks. Used to re-index incrementally.
+
+    A manifest is bound to one target (backend + collection); loading it for a
+    different target yields an empty manifest, which forces a full re-index.
+    """
+
+    def __init__(self, path: str, target: str):
+        self.path = Path(path)
+        self.target = target
+        self.sources: Dict[str, dict] = {}
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable manifest {self.path}: {e}")
+            return
+
+        if data.get("version") != MANIFEST_VERSION or data.get("target") != self.target:
+            logger.info(f"Manifest {self.path} is for another target; starting fresh")
+            return
+        self.sources = data.get("sources", {})
+
+    def content_hash(self, source: str) -> str:
+        return self.sources.get(source, {}).get("content_hash", "")
+
+    def point_ids(self, source: str) -> List[str]:
+        return list(self.sources.get(source, {}).get("ids", []))
+
+    def all_point_ids(self) -> set:
+        return {pid for entry in self.sources.values() for pid in entry.get("ids", [])}
+
+    def record(self, source: str, content_hash: str, ids: List[str]) -> None:
+        self.sources[source] = {"content_hash": content_hash, "ids": ids}
+
+    def remove(self, source: str) -> None:
+        self.sources.pop(source, None)
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "version": MANIFEST_VERSION,
+                    "target": self.target,
+                    "sources": self.sources,
+                },
+                f,
+                indent=2,
+                sort_keys=True,
+            )
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,89 @@
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Dict
+
+# Number of recent samples kept per timer for percentile estimates
+TIMER_WINDOW = 1024
+
+
+class MetricsRegistry:
+    """
+    Minimal in-process metrics registry (counters, gauges and latency timers).
+    Exposed as JSON through the /metrics endpoint.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = defaultdict(int)
+        self._gauges: Dict[str, float] = {}
+        self._timers: Dict[str, deque] = defaultdict(lambda: deque(maxlen=TIMER_WINDOW))
+        self._timer_counts: Dict[str, int] = defaultdict(int)
+
+    def increment(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += value
+
+    def set_gauge(self, name: str, value: float) -> None:
+        with self._lock:
+            self._gauges[name] = value
+
+    def observe(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self._timers[name].append(seconds)
+            self._timer_counts[name] += 1
+
+    @contextmanager
+    def timer(self, name: str):
+        """Time a block and record it under `name`, counting failures separately."""
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.increment(f"{name}.errors")
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            timers = {
+                name: self._summarize(list(samples), self._timer_counts[name])
+                for name, samples in self._timers.items()
+            }
+            return {
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+                "timers": timers,
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._timers.clear()
+            self._timer_counts.clear()
+
+    @staticmethod
+    def _summarize(samples: list, count: int) -> dict:
+        if not samples:
+            return {"count": count}
+        ordered = sorted(samples)
+
+        def pct(p: float) -> float:
+            return round(
+                ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000, 3
+            )
+
+        return {
+            "count": count,
+            "avg_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+            "p99_ms": pct(0.99),
+            "max_ms": round(ordered[-1] * 1000, 3),
+        }
+
+
+metrics = MetricsRegistry()
@@ -1,26 +1,45 @@
+import argparse
+import asyncio
 import logging
-import os
-from dataclasses import dataclass
+import time
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Dict, List, Optional
 
+from app.config import settings
+from app.models.policies import PolicyMetadata
+from app.services.bm25 import get_bm25_index, save_bm25_index
+from app.services.content_store import get_content_store
 from app.services.embed_service import get_embedding_service
-from app.services.qdrant_client import add_policy, init_collection
+from app.services.ingestion import IngestionPipeline, content_hash, policy_to_points
+from app.services.manifest import IndexManifest
+from app.services.qdrant_client import delete, flush, init_collection
+from app.services.versions import active_version
 from app.utils.exceptions import PolicyLoadError
 
 logger = logging.getLogger(__name__)
 
 
 @dataclass
-class PolicyMetadata:
-    """Metadata structure for a policy document."""
-
-    filename: str
-    provider: str
-    policy_type: str
-    title: str
-    content: str
-    word_count: int
+class SyncReport:
+    """Outcome of an incremental policy sync."""
+
+    added: List[str] = field(default_factory=list)
+    updated: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    failed: List[str] = field(default_factory=list)
+    upserted_chunks: int = 0
+    deleted_chunks: int = 0
+    seconds: float = 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{len(self.added)} added, {len(self.updated)} updated, "
+            f"{len(self.unchanged)} unchanged, {len(self.removed)} removed, "
+            f"{len(self.failed)} failed; {self.upserted_chunks} chunks upserted, "
+            f"{self.deleted_chunks} deleted in {self.seconds:.2f}s"
+        )
 
 
 class PolicyDocumentLoader:
@@ -132,44 +151,153 @@ class PolicyDocumentLoader:
             logger.error(f"Unexpected error with {file_path.name}: {e}")
             return None
 
-    def store_policies_in_vector_db(
+    async def store_policies_in_vector_db(
         self, policies: List[PolicyMetadata]
-    ) -> Dict[str, str]:
+    ) -> Dict[str, List[str]]:
+        """
+        Splits policies into section chunks and stores them as vectors,
+        embedding and upserting in batches. Every chunk carries its parent
+        document ID so hits can be aggregated back to whole policies.
+
+        Returns:
+            Dict mapping filenames to the vector IDs of their chunks.
+        """
+        try:
+            await init_collection()
+            report = await IngestionPipeline().run(policies)
+            if report.failed_batches:
+                raise PolicyLoadError(
+                    f"{report.failed_batches} batches failed: {report.errors[-1]}"
+                )
+            return report.stored
+        except Exception as e:
+            raise PolicyLoadError(f"Failed to store policies in vector DB: {e}")
+
+    async def sync_policies_in_vector_db(
+        self, policies: List[PolicyMetadata], full: bool = False
+    ) -> SyncReport:
         """
-        Stores policies as vectors into the Qdrant vector database.
+        Incrementally re-index policies against the index manifest.
+
+        Unchanged files are skipped, changed files only embed chunks whose
+        deterministic ID is new, stale chunks are deleted after the new ones
+        are written, and files that disappeared are removed from the index.
+        With `full=True` every chunk is re-embedded and rewritten; the manifest
+        is still used to find stale chunks and removed files.
 
         Returns:
-            Dict mapping filenames to Qdrant vector IDs.
+            A SyncReport describing what changed.
         """
+        start = time.perf_counter()
+        manifest = IndexManifest(settings.INDEX_MANIFEST_PATH, _manifest_target())
+        report = SyncReport()
+
         try:
-            init_collection()
-            stored = {}
+            await init_collection()
 
+            changed, new_ids, current_ids = [], {}, {}
             for policy in policies:
-                vector = self.embedding_service.embed_text(policy.content)
-                metadata = {
-                    "provider": policy.provider,
-                    "type": policy.policy_type,
-                    "title": policy.title,
-                    "content": policy.content,
-                    "filename": policy.filename,
-                    "word_count": policy.word_count,
-                }
-                vector_id = add_policy(vector, metadata)
-                stored[policy.filename] = vector_id
-                logger.info(f"Stored: {policy.title} (ID: {vector_id})")
-
-            return stored
+                digest = content_hash(policy.content)
+                if not full and manifest.content_hash(policy.filename) == digest:
+                    report.unchanged.append(policy.filename)
+                    continue
+                ids = [point[0] for point in policy_to_points(policy)]
+                current_ids[policy.filename] = (digest, ids)
+                new_ids[policy.filename] = set(ids)
+                if not full:
+                    new_ids[policy.filename] -= set(manifest.point_ids(policy.filename))
+                changed.append(policy)
+                if manifest.content_hash(policy.filename):
+                    report.updated.append(policy.filename)
+                else:
+                    report.added.append(policy.filename)
+
+            # Chunks that already exist with identical content are not re-embedded
+            ingestion = await IngestionPipeline().run(
+                changed, skip_ids=None if full else manifest.all_point_ids()
+            )
+            report.upserted_chunks = ingestion.chunks
+
+            stale = []
+            for filename, (digest, ids) in current_ids.items():
+                stored = set(ingestion.stored.get(filename, []))
+                if not new_ids[filename] <= stored:
+                    # Leave the old manifest entry so the next run retries this file
+                    report.failed.append(filename)
+                    continue
+                stale.extend(set(manifest.point_ids(filename)) - set(ids))
+                manifest.record(filename, digest, ids)
+
+            present = {policy.filename for policy in policies}
+            for filename in list(manifest.sources):
+                if filename not in present:
+                    stale.extend(manifest.point_ids(filename))
+                    manifest.remove(filename)
+                    report.removed.append(filename)
+
+            await delete(stale)
+            await flush()
+            report.deleted_chunks = len(stale)
+            self._sync_side_indexes(policies, stale, set(report.failed))
+            manifest.save()
         except Exception as e:
-            raise PolicyLoadError(f"Failed to store policies in vector DB: {e}")
+            raise PolicyLoadError(f"Failed to sync policies in vector DB: {e}")
 
+        report.seconds = time.perf_counter() - start
+        logger.info(f"Policy sync finished: {report.summary()}")
+        return report
 
-def initialize_policy_database(docs_path: str = "data/policy_docs") -> int:
+    def _sync_side_indexes(
+        self, policies: List[PolicyMetadata], stale: List[str], failed: set
+    ) -> None:
+        """
+        Bring the BM25 index and the content store in line with the vector
+        store. Missing chunks are filled in from the source text, which needs
+        no embedding, so a side index lost or created after the vectors is
+        rebuilt cheaply.
+        """
+        bm25 = get_bm25_index()
+        bm25.remove(stale)
+        content_store = get_content_store()
+        content_store.delete(stale)
+
+        points = [
+            point
+            for policy in policies
+            if policy.filename not in failed
+            for point in policy_to_points(policy)
+        ]
+        stored = content_store.get_many(point[0] for point in points)
+        content_store.put_many(
+            {point_id: text for point_id, text, _ in points if point_id not in stored}
+        )
+        for point_id, text, payload in points:
+            if point_id not in bm25:
+                bm25.add(point_id, text, payload)
+        save_bm25_index()
+
+
+def _manifest_target() -> str:
+    if settings.VECTOR_BACKEND == "local":
+        target = f"local:{settings.LOCAL_INDEX_PATH}"
+    else:
+        target = (
+            f"{settings.VECTOR_BACKEND}:"
+            f"{settings.QDRANT_HOST}/{settings.QDRANT_COLLECTION_NAME}"
+        )
+    version = active_version()
+    return f"{target}@{version}" if version else target
+
+
+async def initialize_policy_database(
+    docs_path: str = "data/policy_docs", full: bool = False
+) -> int:
     """
-    Load and store all .txt policies from a given directory.
+    Load all .txt policies from a given directory and incrementally
+    sync them into the vector store.
 
     Returns:
-        Number of successfully stored policies.
+        Number of policies in the index after the sync.
     """
     loader = PolicyDocumentLoader(docs_path)
     policies = loader.load_all_policies()
@@ -177,14 +305,25 @@ def initialize_policy_database(docs_path: str = "data/policy_docs") -> int:
     if not policies:
         raise PolicyLoadError("No valid policy documents found.")
 
-    stored = loader.store_policies_in_vector_db(policies)
-    return len(stored)
+    report = await loader.sync_policies_in_vector_db(policies, full=full)
+    if report.failed:
+        raise PolicyLoadError(f"Failed to index: {', '.join(report.failed)}")
+    return len(policies)
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Index policy documents")
+    parser.add_argument("--docs-path", default="data/policy_docs")
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Re-embed every chunk instead of only changed ones",
+    )
+    args = parser.parse_args()
+
     logging.basicConfig(level=logging.INFO)
     try:
-        count = initialize_policy_database()
-        print(f"✅ Successfully stored {count} policies into Qdrant.")
+        count = asyncio.run(initialize_policy_database(args.docs_path, full=args.full))
+        print(f"✅ Successfully synced {count} policies into the vector store.")
     except PolicyLoadError as e:
         print(f"❌ Policy loading failed: {e}")
@@ -1,16 +1,60 @@
-from app.models.policies import PolicyInput
-from app.services.embed_service import get_embedding_service
-from app.services.qdrant_client import add_policy
+import json
+import logging
+from typing import AsyncIterable, List, Tuple
 
-embedding_service = get_embedding_service()
+from pydantic import ValidationError
 
+from app.models.policies import PolicyInput, PolicyMetadata
+from app.services.ingestion import IngestionPipeline, IngestionReport
 
-def store_policy(policy: PolicyInput) -> str:
-    """Process and store policy"""
+logger = logging.getLogger(__name__)
+
+
+def _to_metadata(policy: PolicyInput) -> PolicyMetadata:
     if not policy.text or not policy.provider or not policy.type:
         raise ValueError("Missing required fields")
 
-    vector = embedding_service.embed_text(policy.text)
-    metadata = {"provider": policy.provider, "type": policy.type, "text": policy.text}
+    return PolicyMetadata(
+        filename="",
+        provider=policy.provider,
+        policy_type=policy.type,
+        title=policy.title or f"{policy.provider} {policy.type} policy",
+        content=policy.text,
+        word_count=len(policy.text.split()),
+    )
+
+
+async def store_policy(policy: PolicyInput) -> str:
+    """Process and store policy"""
+    report = await IngestionPipeline().run([_to_metadata(policy)])
+    if report.failed_batches or not report.stored:
+        raise ValueError(f"Failed to store policy: {report.errors}")
+
+    return next(iter(report.stored))
+
+
+async def store_policies_jsonl(
+    lines: AsyncIterable[bytes],
+) -> Tuple[IngestionReport, List[dict]]:
+    """
+    Stream JSONL policies (one PolicyInput object per line) into the vector store.
+
+    Returns:
+        The ingestion report and a list of rejected lines with their errors.
+    """
+    rejected: List[dict] = []
+
+    async def parse():
+        line_no = 0
+        async for line in lines:
+            line_no += 1
+            if not line.strip():
+                continue
+            try:
+                yield _to_metadata(PolicyInput(**json.loads(line)))
+            except (json.JSONDecodeError, ValidationError, ValueError, TypeError) as e:
+                logger.warning(f"Rejected JSONL line {line_no}: {e}")
+                rejected.append({"line": line_no, "error": str(e)})
 
-    return add_policy(vector, metadata)
+    report = await IngestionPipeline().run(parse())
+    return report, rejected
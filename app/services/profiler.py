@@ -0,0 +1,157 @@
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Awaitable, List, Optional, Tuple, TypeVar
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Leaf frames of an idle executor thread waiting for work
+_IDLE_FILES = ("threading.py", "queue.py", "thread.py")
+
+# Profile of the request being served, if it asked for one
+_active: ContextVar[Optional["RequestProfile"]] = ContextVar(
+    "active_profile", default=None
+)
+_NO_STAGE = nullcontext()
+
+
+def _label(frame) -> str:
+    code = frame.f_code
+    filename = os.path.basename(code.co_filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+class RequestProfile:
+    """
+    Sampling profiler for a single request.
+
+    A background thread snapshots the stacks of the event loop thread and of
+    busy `asyncio.to_thread` workers every `interval` seconds. Each sample is
+    prefixed with the thread and the orchestrator stages open at that moment,
+    and identical stacks are counted, giving the collapsed-stack format read
+    by flamegraph.pl and speedscope. Other requests served by the same worker
+    at the same time show up in the samples too; the per-stage wall times are
+    exact.
+    """
+
+    def __init__(self, interval: float):
+        self.id = uuid.uuid4().hex
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self.stages: List[Tuple[str, float]] = []
+        self.duration = 0.0
+        self._open_stages: List[str] = []
+        self._loop_thread = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name=f"profiler-{self.id[:8]}", daemon=True
+        )
+
+    def start(self) -> None:
+        self._started = time.perf_counter()
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self._started
+
+    @contextmanager
+    def stage(self, name: str):
+        self._open_stages.append(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages.append((name, time.perf_counter() - start))
+            self._open_stages.remove(name)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def _sample(self) -> None:
+        stage = "+".join(self._open_stages) or "request"
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            name = names.get(thread_id, str(thread_id))
+            if thread_id != self._loop_thread:
+                if not name.startswith("asyncio"):
+                    continue
+                if os.path.basename(frame.f_code.co_filename) in _IDLE_FILES:
+                    continue
+            stack = []
+            while frame is not None:
+                stack.append(_label(frame))
+                frame = frame.f_back
+            stack.reverse()
+            self.samples[";".join([name, f"stage:{stage}", *stack])] += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.items())
+
+    def server_timing(self) -> str:
+        """Stage durations as a Server-Timing header value."""
+        entries = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.stages]
+        entries.append(f"total;dur={self.duration * 1000:.1f}")
+        return ", ".join(entries)
+
+
+def stage(name: str):
+    """
+    Mark an orchestrator stage in the current request's profile. Returns a
+    shared no-op context when the request is not being profiled.
+    """
+    profile = _active.get()
+    if profile is None:
+        return _NO_STAGE
+    return profile.stage(name)
+
+
+async def run_profiled(coro: Awaitable[T]) -> Tuple[T, RequestProfile]:
+    """Await `coro` under a RequestProfile and store the collapsed stacks."""
+    profile = RequestProfile(settings.PROFILING_INTERVAL_MS / 1000)
+    token = _active.set(profile)
+    profile.start()
+    try:
+        result = await coro
+    finally:
+        profile.stop()
+        _active.reset(token)
+        save(profile)
+    return result, profile
+
+
+def profile_path(profile_id: str) -> Path:
+    return Path(settings.PROFILE_DIR) / f"{profile_id}.collapsed"
+
+
+def save(profile: RequestProfile) -> None:
+    """Write the profile, dropping the oldest ones beyond PROFILE_MAX_FILES."""
+    path = profile_path(profile.id)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(profile.collapsed())
+        stored = sorted(
+            path.parent.glob("*.collapsed"), key=lambda p: p.stat().st_mtime
+        )
+        for old in stored[: -settings.PROFILE_MAX_FILES]:
+            old.unlink(missing_ok=True)
+    except OSError as e:
+        logger.error(f"Could not store profile {profile.id}: {e}")
+        return
+    logger.info(
+        f"Stored profile {profile.id} ({sum(profile.samples.values())} samples, "
+        f"{profile.server_timing()})"
+    )
@@ -1,45 +1,194 @@
-import os
-import uuid
-
-from qdrant_client import QdrantClient
-from qdrant_client.http.models import Distance, PointStruct, VectorParams
+import asyncio
+from typing import List, Optional
 
+from app.config import settings
+from app.services.bm25 import sparse_query
 from app.services.embed_service import get_embedding_service
+from app.services.metrics import metrics
+from app.services.scheduler import embedding_scheduler
+from app.services.vector_store import (
+    BatchBoosts,
+    PayloadBoosts,
+    PayloadFilter,
+    SparseTerms,
+    VectorStore,
+    get_vector_store,
+)
+
+
+async def connect():
+    """Open the pooled vector store connection (called from the app lifespan)"""
+    await get_vector_store().connect()
+
+
+async def close():
+    """Close the pooled vector store connection"""
+    await get_vector_store().close()
 
-client = QdrantClient(url=os.getenv("QDRANT_HOST", "http://localhost:6333"))
-COLLECTION_NAME = "policies"
 
+async def _call(operation: str, coro):
+    """Run a vector store call with a timeout, recording latency and errors."""
+    with metrics.timer(f"vector_store.{operation}"):
+        return await asyncio.wait_for(coro, timeout=settings.QDRANT_TIMEOUT)
 
-def init_collection():
+
+async def init_collection(store: Optional[VectorStore] = None):
     """Initialize collection if it doesn't exist"""
     embedding_service = get_embedding_service()
-    collections = [col.name for col in client.get_collections().collections]
-    if COLLECTION_NAME not in collections:
-        client.recreate_collection(
-            collection_name=COLLECTION_NAME,
-            vectors_config=VectorParams(
-                size=embedding_service.dimension, distance=Distance.COSINE
-            ),
-        )
+    await _call(
+        "init_collection",
+        (store or get_vector_store()).init_collection(embedding_service.dimension),
+    )
 
 
-def add_policy(vector: list[float], metadata: dict) -> str:
-    """Add policy to Qdrant"""
-    embedding_service = get_embedding_service()
-    if not isinstance(vector, list) or len(vector) != embedding_service.dimension:
-        raise ValueError("Invalid vector format")
+async def upsert(
+    ids: list[str],
+    vectors: list[list[float]],
+    payloads: list[dict],
+    store: Optional[VectorStore] = None,
+    sparse_vectors: Optional[List[SparseTerms]] = None,
+):
+    """
+    Insert or overwrite points in the vector store (or in `store`, e.g. a
+    collection being built for a new corpus version)
+    """
+    await _call(
+        "upsert",
+        (store or get_vector_store()).add(ids, vectors, payloads, sparse_vectors),
+    )
 
-    policy_id = str(uuid.uuid4())
-    point = PointStruct(id=policy_id, vector=vector, payload=metadata)
-    client.upsert(collection_name=COLLECTION_NAME, points=[point])
-    return policy_id
 
+async def flush(store: Optional[VectorStore] = None):
+    """Wait until earlier writes to the vector store (or `store`) are durable"""
+    await (store or get_vector_store()).flush()
 
-def search_policies(query: str, limit: int = 3) -> list:
-    """Search for similar policies"""
-    embedding_service = get_embedding_service()
-    query_vector = embedding_service.embed_text(query)
-    results = client.search(
-        collection_name=COLLECTION_NAME, query_vector=query_vector, limit=limit
+
+async def delete(ids: list[str]):
+    """Remove points from the vector store"""
+    if ids:
+        await _call("delete", get_vector_store().delete(ids))
+
+
+async def search(
+    vector: list[float],
+    limit: int = 3,
+    filters: Optional[PayloadFilter] = None,
+    boosts: Optional[PayloadBoosts] = None,
+    fields: Optional[List[str]] = None,
+) -> list:
+    """Search the vector store with a precomputed query vector"""
+    return await _call(
+        "search", get_vector_store().search(vector, limit, filters, boosts, fields)
+    )
+
+
+async def search_batch(
+    vectors: list[list[float]],
+    limit: int = 3,
+    filters: Optional[PayloadFilter] = None,
+    boosts: Optional[BatchBoosts] = None,
+    fields: Optional[List[str]] = None,
+    store: Optional[VectorStore] = None,
+) -> list:
+    """Search the vector store for several query vectors in one call"""
+    return await _call(
+        "search_batch",
+        (store or get_vector_store()).search_batch(
+            vectors, limit, filters, boosts, fields
+        ),
     )
-    return [{"id": r.id, "score": r.score, "data": r.payload} for r in results]
+
+
+async def hybrid_search_batch(
+    vectors: list[list[float]],
+    sparse_queries: List[SparseTerms],
+    limit: int = 3,
+    filters: Optional[PayloadFilter] = None,
+    boosts: Optional[BatchBoosts] = None,
+    fields: Optional[List[str]] = None,
+) -> list:
+    """Dense + lexical search fused by the vector store, one list per query"""
+    return await _call(
+        "hybrid_search_batch",
+        get_vector_store().hybrid_search_batch(
+            vectors, sparse_queries, limit, filters, boosts, fields
+        ),
+    )
+
+
+def hybrid_enabled() -> bool:
+    """Whether the vector store fuses dense and lexical rankings itself"""
+    return get_vector_store().supports_hybrid
+
+
+async def retrieve(ids: list[str], fields: Optional[List[str]] = None) -> list:
+    """Fetch points by ID, optionally projecting their payload"""
+    if not ids:
+        return []
+    return await _call("retrieve", get_vector_store().retrieve(ids, fields))
+
+
+def build_filters(
+    providers: Optional[List[str]] = None, policy_types: Optional[List[str]] = None
+) -> Optional[PayloadFilter]:
+    """Payload filter restricting search to the given providers and/or policy types"""
+    filters = {}
+    if providers:
+        filters["provider"] = list(providers)
+    if policy_types:
+        filters["type"] = list(policy_types)
+    return filters or None
+
+
+async def search_policies(
+    query: str,
+    limit: int = 3,
+    filters: Optional[PayloadFilter] = None,
+    boosts: Optional[PayloadBoosts] = None,
+    fields: Optional[List[str]] = None,
+    keyword_query: Optional[str] = None,
+) -> list:
+    """
+    Search for similar policies, optionally filtered/boosted by payload fields.
+    `fields` projects the returned payload (e.g. to leave out chunk content).
+    With `keyword_query` (hybrid stores only) the results are fused with a
+    lexical search for it.
+    """
+    if keyword_query is not None:
+        return (
+            await search_policies_batch(
+                [query], limit, filters, boosts, fields, [keyword_query]
+            )
+        )[0]
+    embedding_service = get_embedding_service()
+    # Encoding is CPU-bound; keep it off the event loop
+    async with embedding_scheduler.slot():
+        query_vector = await asyncio.to_thread(embedding_service.embed_text, query)
+    return await search(query_vector, limit, filters, boosts, fields)
+
+
+async def search_policies_batch(
+    queries: List[str],
+    limit: int = 3,
+    filters: Optional[PayloadFilter] = None,
+    boosts: Optional[BatchBoosts] = None,
+    fields: Optional[List[str]] = None,
+    keyword_queries: Optional[List[str]] = None,
+) -> List[list]:
+    """
+    Search for several queries with one encode call and one batched vector
+    search. `boosts` may hold one mapping per query. With `keyword_queries`
+    each query is fused with a lexical search in the same request. Results
+    are in query order.
+    """
+    if not queries:
+        return []
+    embedding_service = get_embedding_service()
+    async with embedding_scheduler.slot():
+        query_vectors = await asyncio.to_thread(embedding_service.embed_batch, queries)
+    if keyword_queries is not None:
+        sparse_queries = [sparse_query(q) for q in keyword_queries]
+        return await hybrid_search_batch(
+            query_vectors, sparse_queries, limit, filters, boosts, fields
+        )
+    return await search_batch(query_vectors, limit, filters, boosts, fields)
@@ -0,0 +1,335 @@
+import argparse
+import asyncio
+import fcntl
+import logging
+import shutil
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Optional
+
+from watchfiles import awatch
+
+from app.config import settings
+from app.models.policies import PolicyMetadata
+from app.services.bm25 import BM25Index, sparse_terms
+from app.services.embed_service import get_embedding_service
+from app.services.ingestion import IngestionPipeline, content_hash, policy_to_points
+from app.services.local_index import LocalVectorStore
+from app.services.manifest import IndexManifest
+from app.services.policy_loader import PolicyDocumentLoader, _manifest_target
+from app.services.qdrant_client import flush, init_collection, search_batch, upsert
+from app.services.scheduler import Lane, embedding_scheduler
+from app.services.vector_store import QdrantVectorStore, VectorStore, get_vector_store
+from app.services.versions import read_state, version_dir, write_state
+from app.utils.exceptions import PolicyLoadError
+
+logger = logging.getLogger(__name__)
+
+# Chunks re-queried against a freshly built version before it goes live
+VALIDATION_SAMPLES = 5
+# Points per scroll page when carrying API-added policies into a new version
+CARRY_OVER_PAGE_SIZE = 256
+# Held while a process changes corpus versions (reindex, rollback, restore)
+LOCK_FILENAME = ".lock"
+LOCK_POLL_SECONDS = 0.1
+
+_reindex_lock = asyncio.Lock()
+_background_tasks: set = set()
+
+
+@dataclass
+class ReindexReport:
+    """Outcome of building and activating a new corpus version."""
+
+    version: str
+    previous: Optional[str]
+    documents: int
+    chunks: int
+    seconds: float
+    carried: int = 0
+
+    def to_dict(self) -> dict:
+        return {
+            "version": self.version,
+            "previous": self.previous,
+            "documents": self.documents,
+            "chunks": self.chunks,
+            "carried": self.carried,
+            "seconds": round(self.seconds, 3),
+        }
+
+
+def new_version(policies: List[PolicyMetadata]) -> str:
+    """Sortable version name: build time plus a short hash of the corpus."""
+    digest = content_hash(
+        "\n".join(sorted(f"{p.filename}:{content_hash(p.content)}" for p in policies))
+    )
+    return f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S%f}-{digest[:8]}"
+
+
+def version_store(version: str) -> VectorStore:
+    """The vector store holding one corpus version."""
+    if settings.VECTOR_BACKEND == "local":
+        return LocalVectorStore(str(version_dir(version) / "policies.npz"))
+    return QdrantVectorStore(
+        settings.QDRANT_HOST, f"{settings.QDRANT_COLLECTION_NAME}_{version}"
+    )
+
+
+def is_reindexing() -> bool:
+    return _reindex_lock.locked()
+
+
+@asynccontextmanager
+async def corpus_lock():
+    """
+    Serialize corpus version changes, within this process and across
+    processes (API workers, the reindex and snapshot CLIs) through a file
+    lock under INDEX_VERSIONS_DIR.
+    """
+    async with _reindex_lock:
+        root = Path(settings.INDEX_VERSIONS_DIR)
+        root.mkdir(parents=True, exist_ok=True)
+        with open(root / LOCK_FILENAME, "a") as lock_file:
+            while True:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    await asyncio.sleep(LOCK_POLL_SECONDS)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+async def reindex_policies(
+    docs_path: str = settings.POLICY_DOCS_PATH,
+) -> ReindexReport:
+    """
+    Build the policy corpus into a new versioned collection, validate it and
+    atomically make it the active version. Queries keep hitting the current
+    version until the switch. The previous version is kept for `rollback`;
+    older ones are dropped.
+
+    The docs directory is the source of truth for file policies. Policies
+    added through the API (which have no filename) are copied over from the
+    current version with their stored vectors. One added while the new
+    version is being built can miss the copy.
+    """
+    async with corpus_lock():
+        start = time.perf_counter()
+        loader = PolicyDocumentLoader(docs_path)
+        policies = await asyncio.to_thread(loader.load_all_policies)
+        if not policies:
+            raise PolicyLoadError("No valid policy documents found.")
+
+        version = new_version(policies)
+        store = version_store(version)
+        bm25 = BM25Index()
+        logger.info(f"Building corpus version {version} ({len(policies)} documents)")
+
+        try:
+            await init_collection(store)
+            report = await IngestionPipeline(vector_store=store, bm25_index=bm25).run(
+                policies
+            )
+            await _validate(store, policies, report)
+            carried = await _carry_over_api_policies(store, bm25)
+            version_dir(version).mkdir(parents=True, exist_ok=True)
+            bm25.save(str(version_dir(version) / "bm25.json"))
+            await flush(store)
+            previous = await _activate(version, store)
+        except Exception:
+            await _drop_version(version)
+            raise
+        finally:
+            await store.close()
+
+        # Seed the manifest so in-place syncs against this version stay incremental
+        manifest = IndexManifest(settings.INDEX_MANIFEST_PATH, _manifest_target())
+        for policy in policies:
+            manifest.record(
+                policy.filename,
+                content_hash(policy.content),
+                report.stored.get(policy.filename, []),
+            )
+        manifest.save()
+        await _prune_versions(keep={version, previous})
+
+        result = ReindexReport(
+            version=version,
+            previous=previous,
+            documents=len(policies),
+            chunks=report.chunks,
+            seconds=time.perf_counter() - start,
+            carried=carried,
+        )
+        logger.info(f"Corpus version {version} is live: {result.to_dict()}")
+        return result
+
+
+async def _validate(store: VectorStore, policies: List[PolicyMetadata], report) -> None:
+    """
+    Refuse to activate a version with failed batches, missing chunks, or
+    sample chunks that do not find themselves.
+    """
+    points = [point for policy in policies for point in policy_to_points(policy)]
+    if report.failed_batches:
+        raise PolicyLoadError(f"{report.failed_batches} batches failed to index")
+    if report.chunks != len(points):
+        raise PolicyLoadError(f"Indexed {report.chunks} of {len(points)} chunks")
+
+    step = max(1, len(points) // VALIDATION_SAMPLES)
+    sample = points[::step][:VALIDATION_SAMPLES]
+    async with embedding_scheduler.slot(Lane.BULK):
+        vectors = await asyncio.to_thread(
+            get_embedding_service().embed_batch, [text for _, text, _ in sample]
+        )
+    hits = await search_batch(vectors, limit=3, fields=["parent_id"], store=store)
+    for (point_id, _, _), results in zip(sample, hits):
+        if point_id not in {str(r["id"]) for r in results}:
+            raise PolicyLoadError(f"Validation search did not return chunk {point_id}")
+
+
+async def _carry_over_api_policies(store: VectorStore, bm25: BM25Index) -> int:
+    """
+    Copy the points of API-added policies from the live version into `store`
+    and `bm25`, reusing their vectors. Returns the number of points copied.
+    """
+    live = get_vector_store()
+    if not await live.count():
+        return 0
+
+    carried, offset = 0, None
+    while True:
+        points, offset = await live.scroll(offset, CARRY_OVER_PAGE_SIZE)
+        api_points = [p for p in points if not p["data"].get("filename")]
+        if api_points:
+            await upsert(
+                [str(p["id"]) for p in api_points],
+                [p["vector"] for p in api_points],
+                [p["data"] for p in api_points],
+                store=store,
+                sparse_vectors=[
+                    sparse_terms(p["data"].get("content", "")) for p in api_points
+                ],
+            )
+            for p in api_points:
+                bm25.add(str(p["id"]), p["data"].get("content", ""), p["data"])
+            carried += len(api_points)
+        if offset is None:
+            break
+    if carried:
+        logger.info(f"Carried {carried} API-added chunks into the new version")
+    return carried
+
+
+async def _activate(version: str, store: VectorStore) -> Optional[str]:
+    """
+    Point the live collection name at `version` and record the switch.
+    The BM25 index and local vector store are cached per version, so the
+    next request loads the new version's side indexes.
+    """
+    previous = read_state().get("active")
+    if isinstance(store, QdrantVectorStore):
+        await store.point_alias(settings.QDRANT_COLLECTION_NAME)
+        # The new version decides whether the live store can fuse server-side
+        live = get_vector_store()
+        if isinstance(live, QdrantVectorStore):
+            await live.refresh_schema()
+    write_state(version, previous)
+    return previous
+
+
+async def rollback() -> str:
+    """Reactivate the previous corpus version. Returns the now-active version."""
+    async with corpus_lock():
+        state = read_state()
+        previous = state.get("previous")
+        if not previous:
+            raise PolicyLoadError("No previous corpus version to roll back to")
+
+        store = version_store(previous)
+        try:
+            await _activate(previous, store)
+        finally:
+            await store.close()
+        logger.info(f"Rolled back corpus from {state.get('active')} to {previous}")
+        return previous
+
+
+async def _drop_version(version: str) -> None:
+    store = version_store(version)
+    try:
+        await store.drop()
+    except Exception as e:
+        logger.warning(f"Could not drop corpus version {version}: {e}")
+    finally:
+        await store.close()
+    shutil.rmtree(version_dir(version), ignore_errors=True)
+
+
+async def _prune_versions(keep: set) -> None:
+    root = Path(settings.INDEX_VERSIONS_DIR)
+    if not root.exists():
+        return
+    for path in root.iterdir():
+        if path.is_dir() and path.name not in keep:
+            logger.info(f"Dropping old corpus version {path.name}")
+            await _drop_version(path.name)
+
+
+def start_reindex(docs_path: str = settings.POLICY_DOCS_PATH) -> bool:
+    """Run `reindex_policies` in the background. False if one is already running."""
+    if is_reindexing() or _background_tasks:
+        return False
+
+    async def run():
+        try:
+            await reindex_policies(docs_path)
+        except Exception as e:
+            logger.error(f"Background reindex failed: {e}")
+
+    task = asyncio.create_task(run())
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return True
+
+
+async def watch_policy_docs(docs_path: str = settings.POLICY_DOCS_PATH) -> None:
+    """Reindex whenever .txt files under `docs_path` change."""
+    logger.info(f"Watching {docs_path} for policy changes")
+    async for changes in awatch(
+        docs_path,
+        debounce=int(settings.POLICY_WATCH_DEBOUNCE_SECONDS * 1000),
+        watch_filter=lambda _, path: path.endswith(".txt"),
+    ):
+        logger.info(f"{len(changes)} policy file changes detected; reindexing")
+        try:
+            await reindex_policies(docs_path)
+        except Exception as e:
+            logger.error(f"Reindex after file change failed: {e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Build and activate a new policy corpus version"
+    )
+    parser.add_argument("--docs-path", default=settings.POLICY_DOCS_PATH)
+    parser.add_argument(
+        "--rollback",
+        action="store_true",
+        help="reactivate the previous version instead of reindexing",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.rollback:
+        print(f"✅ Active corpus version: {asyncio.run(rollback())}")
+    else:
+        report = asyncio.run(reindex_policies(args.docs_path))
+        print(f"✅ Corpus version {report.version} is live ({report.chunks} chunks)")
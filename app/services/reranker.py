@@ -0,0 +1,113 @@
+import asyncio
+import hashlib
+import logging
+import math
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+from sentence_transformers import CrossEncoder
+
+from app.config import settings
+from app.services.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def _passage_key(passage: str) -> str:
+    return hashlib.sha1(passage.encode("utf-8")).hexdigest()
+
+
+class CrossEncoderReranker:
+    """
+    Local cross-encoder that scores (query, passage) pairs on CPU.
+
+    Scores are squashed to [0, 1] and cached per (query, passage) pair, so
+    repeated queries against the same policies skip the model entirely.
+    The model is loaded on first use.
+    """
+
+    def __init__(
+        self,
+        model_name: str = settings.RERANKER_MODEL,
+        batch_size: int = settings.RERANKER_BATCH_SIZE,
+        cache_size: int = settings.RERANKER_CACHE_SIZE,
+    ):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.cache_size = cache_size
+        self._model: Optional[CrossEncoder] = None
+        self._cache: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get_model(self) -> CrossEncoder:
+        with self._lock:
+            if self._model is None:
+                logger.info(f"Loading cross-encoder {self.model_name}")
+                self._model = CrossEncoder(
+                    self.model_name, max_length=512, device="cpu"
+                )
+            return self._model
+
+    def load(self) -> None:
+        """Load the model now rather than on the first request."""
+        self._get_model()
+
+    def score(self, query: str, passages: List[str]) -> List[float]:
+        """Relevance of each passage to `query`, in [0, 1]. Blocking."""
+        keys = [(query, _passage_key(p)) for p in passages]
+        scores: List[Optional[float]] = []
+        with self._lock:
+            for key in keys:
+                cached = self._cache.get(key)
+                if cached is not None:
+                    self._cache.move_to_end(key)
+                scores.append(cached)
+
+        missing = [i for i, s in enumerate(scores) if s is None]
+        metrics.increment("retrieval.rerank.cache_hits", len(keys) - len(missing))
+        metrics.increment("retrieval.rerank.cache_misses", len(missing))
+        if missing:
+            logits = self._get_model().predict(
+                [(query, passages[i]) for i in missing],
+                batch_size=self.batch_size,
+                show_progress_bar=False,
+            )
+            with self._lock:
+                for i, logit in zip(missing, logits):
+                    scores[i] = 1.0 / (1.0 + math.exp(-float(logit)))
+                    self._cache[keys[i]] = scores[i]
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return scores
+
+    async def score_within_budget(
+        self, query: str, passages: List[str], budget_ms: float
+    ) -> Optional[List[float]]:
+        """
+        Score off the event loop, giving up after `budget_ms`. Returns None on
+        timeout or model failure so the caller can keep its own ranking; a
+        timed-out call still finishes in the background and warms the cache.
+        """
+        try:
+            with metrics.timer("retrieval.rerank"):
+                return await asyncio.wait_for(
+                    asyncio.to_thread(self.score, query, passages),
+                    timeout=budget_ms / 1000,
+                )
+        except asyncio.TimeoutError:
+            logger.warning(f"Cross-encoder rerank exceeded {budget_ms:.0f}ms budget")
+            metrics.increment("retrieval.rerank.timeouts")
+        except Exception as e:
+            logger.error(f"Cross-encoder rerank failed: {e}")
+        metrics.increment("retrieval.rerank.fallbacks")
+        return None
+
+
+@lru_cache(maxsize=1)
+def get_reranker() -> Optional[CrossEncoderReranker]:
+    """The shared reranker, or None when reranking is disabled."""
+    if not settings.RERANKER_ENABLED:
+        return None
+    return CrossEncoderReranker()
@@ -0,0 +1,159 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from enum import Enum
+from typing import Dict, Optional
+
+from app.config import settings
+from app.services.metrics import metrics
+
+
+class Lane(str, Enum):
+    """Priority class of a request."""
+
+    INTERACTIVE = "interactive"
+    BULK = "bulk"
+
+
+# Lane of the request being served; set once per request by the API layer and
+# inherited by the tasks it spawns
+current_lane: ContextVar[Lane] = ContextVar("current_lane", default=Lane.INTERACTIVE)
+
+
+class LaneScheduler:
+    """
+    Shares a number of slots for an expensive backend between lanes.
+
+    `reserved` slots are only ever given to interactive work, so bulk traffic
+    can never take the whole backend. When a slot frees up, waiting lanes are
+    served by weighted fair queuing: every queued call gets a virtual finish
+    tag advanced by 1 / weight of its lane, and the eligible waiter with the
+    smallest tag goes next. Queue wait is recorded per lane.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        capacity: int,
+        reserved: int,
+        weights: Dict[Lane, float],
+    ):
+        self.name = name
+        self.reserved = reserved
+        self.weights = weights
+        self.in_flight = {lane: 0 for lane in Lane}
+        self._waiters = {lane: deque() for lane in Lane}
+        self._last_finish = {lane: 0.0 for lane in Lane}
+        self._virtual_time = 0.0
+        self.set_capacity(capacity)
+
+    def set_capacity(self, capacity: int) -> None:
+        """
+        Change the number of slots. Extra slots go to waiters right away; on
+        a decrease, running calls finish and new ones wait until below it.
+        """
+        self.capacity = capacity
+        # Bulk always gets at least one slot so it cannot starve completely
+        self.bulk_limit = max(1, capacity - self.reserved)
+        metrics.set_gauge(f"scheduler.{self.name}.capacity", capacity)
+        self._dispatch()
+        self._publish()
+
+    @asynccontextmanager
+    async def slot(self, lane: Optional[Lane] = None):
+        """Hold one backend slot for the block, in `lane` or the current one."""
+        lane = lane or current_lane.get()
+        start = time.perf_counter()
+        await self.acquire(lane)
+        metrics.observe(
+            f"scheduler.{self.name}.queue_wait.{lane.value}",
+            time.perf_counter() - start,
+        )
+        try:
+            yield
+        finally:
+            self.release(lane)
+
+    def available(self, lane: Lane) -> bool:
+        """Whether a call in `lane` would start right away."""
+        return self._can_start(lane) and not self._waiters[lane]
+
+    async def acquire(self, lane: Lane) -> None:
+        """Take a slot in `lane`, waiting for one if needed. Cancellation-safe."""
+        if self.available(lane):
+            self._start(lane)
+        else:
+            await self._wait(lane)
+
+    async def _wait(self, lane: Lane) -> None:
+        tag = max(self._virtual_time, self._last_finish[lane]) + 1 / self.weights[lane]
+        self._last_finish[lane] = tag
+        waiter = (tag, asyncio.get_running_loop().create_future())
+        self._waiters[lane].append(waiter)
+        self._publish()
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            if waiter[1].done() and not waiter[1].cancelled():
+                # The slot was handed over just before the cancellation
+                self.release(lane)
+            else:
+                self._waiters[lane].remove(waiter)
+                self._publish()
+            raise
+
+    def _can_start(self, lane: Lane) -> bool:
+        if sum(self.in_flight.values()) >= self.capacity:
+            return False
+        return lane is Lane.INTERACTIVE or self.in_flight[Lane.BULK] < self.bulk_limit
+
+    def _start(self, lane: Lane) -> None:
+        self.in_flight[lane] += 1
+        self._publish()
+
+    def release(self, lane: Lane) -> None:
+        """Give back a slot taken with `acquire`."""
+        self.in_flight[lane] -= 1
+        self._dispatch()
+        self._publish()
+
+    def _dispatch(self) -> None:
+        """Hand free slots to the eligible waiters with the smallest finish tags."""
+        while True:
+            eligible = [
+                lane for lane in Lane if self._waiters[lane] and self._can_start(lane)
+            ]
+            if not eligible:
+                return
+            lane = min(eligible, key=lambda waiting: self._waiters[waiting][0][0])
+            tag, future = self._waiters[lane].popleft()
+            self._virtual_time = max(self._virtual_time, tag)
+            self.in_flight[lane] += 1
+            future.set_result(None)
+
+    def _publish(self) -> None:
+        for lane in Lane:
+            prefix = f"scheduler.{self.name}"
+            metrics.set_gauge(f"{prefix}.in_flight.{lane.value}", self.in_flight[lane])
+            metrics.set_gauge(f"{prefix}.queued.{lane.value}", len(self._waiters[lane]))
+
+
+LANE_WEIGHTS = {
+    Lane.INTERACTIVE: settings.LANE_WEIGHT_INTERACTIVE,
+    Lane.BULK: settings.LANE_WEIGHT_BULK,
+}
+
+llm_scheduler = LaneScheduler(
+    "llm",
+    capacity=settings.LLM_MAX_CONCURRENCY,
+    reserved=settings.LLM_INTERACTIVE_RESERVED,
+    weights=LANE_WEIGHTS,
+)
+embedding_scheduler = LaneScheduler(
+    "embedding",
+    capacity=settings.EMBED_MAX_CONCURRENCY,
+    reserved=settings.EMBED_INTERACTIVE_RESERVED,
+    weights=LANE_WEIGHTS,
+)
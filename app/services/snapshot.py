@@ -0,0 +1,215 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from app.config import settings
+from app.services.bm25 import sparse_terms
+from app.services.content_store import get_content_store
+from app.services.embed_service import get_embedding_service
+from app.services.manifest import IndexManifest
+from app.services.policy_loader import _manifest_target
+from app.services.qdrant_client import flush, init_collection, upsert
+from app.services.reindex import _activate, _drop_version, corpus_lock, version_store
+from app.services.vector_store import get_vector_store
+from app.services.versions import active_version, bm25_index_path, version_dir
+from app.utils.exceptions import PolicyLoadError
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = 1
+# Points per scroll page on export and per upsert on restore
+SNAPSHOT_PAGE_SIZE = 256
+
+
+@dataclass
+class SnapshotReport:
+    """Outcome of exporting or restoring a corpus snapshot."""
+
+    path: str
+    version: Optional[str]
+    points: int
+    seconds: float
+
+    def to_dict(self) -> dict:
+        return {
+            "path": self.path,
+            "version": self.version,
+            "points": self.points,
+            "seconds": round(self.seconds, 3),
+        }
+
+
+async def export_snapshot(path: str = settings.SNAPSHOT_PATH) -> SnapshotReport:
+    """
+    Write the active corpus version to a single portable .npz file: vectors,
+    payloads, the BM25 side index, the version name and the ingestion
+    manifest, so another node can serve it without re-embedding anything.
+    """
+    start = time.perf_counter()
+    store = get_vector_store()
+    ids, vectors, payloads = [], [], []
+    offset = None
+    while True:
+        points, offset = await store.scroll(offset, SNAPSHOT_PAGE_SIZE)
+        for point in points:
+            ids.append(str(point["id"]))
+            vectors.append(point["vector"])
+            payloads.append(point["data"])
+        if offset is None:
+            break
+    if not ids:
+        raise PolicyLoadError("The policy collection is empty; nothing to snapshot")
+
+    bm25_path = Path(bm25_index_path())
+    bm25 = bm25_path.read_text(encoding="utf-8") if bm25_path.exists() else "{}"
+    meta = {
+        "format": SNAPSHOT_FORMAT,
+        "version": active_version(),
+        "dimension": len(vectors[0]),
+        "points": len(ids),
+        "created": datetime.now(timezone.utc).isoformat(),
+        "sources": IndexManifest(
+            settings.INDEX_MANIFEST_PATH, _manifest_target()
+        ).sources,
+    }
+    await asyncio.to_thread(_write, Path(path), meta, ids, vectors, payloads, bm25)
+
+    report = SnapshotReport(
+        path, meta["version"], len(ids), time.perf_counter() - start
+    )
+    logger.info(f"Exported corpus snapshot: {report.to_dict()}")
+    return report
+
+
+def _write(path: Path, meta, ids, vectors, payloads, bm25: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp.npz")
+    np.savez(
+        tmp_path,
+        meta=np.asarray(json.dumps(meta)),
+        ids=np.asarray(ids, dtype=str),
+        vectors=np.asarray(vectors, dtype=np.float32),
+        payloads=np.asarray(json.dumps(payloads)),
+        bm25=np.asarray(bm25),
+    )
+    os.replace(tmp_path, path)
+
+
+def _read(path: str) -> dict:
+    with np.load(path, allow_pickle=False) as data:
+        return {
+            "meta": json.loads(str(data["meta"])),
+            "ids": [str(i) for i in data["ids"]],
+            "vectors": data["vectors"],
+            "payloads": json.loads(str(data["payloads"])),
+            "bm25": str(data["bm25"]),
+        }
+
+
+async def restore_snapshot(path: str = settings.SNAPSHOT_PATH) -> SnapshotReport:
+    """
+    Load a snapshot into its own corpus version and make it the active one,
+    exactly like a reindex but with the stored vectors instead of re-embedding.
+    """
+    start = time.perf_counter()
+    snapshot = await asyncio.to_thread(_read, path)
+    meta = snapshot["meta"]
+    if meta.get("format") != SNAPSHOT_FORMAT:
+        raise PolicyLoadError(f"Unsupported snapshot format in {path}")
+    dimension = get_embedding_service().dimension
+    if meta["dimension"] != dimension:
+        raise PolicyLoadError(
+            f"Snapshot vectors have dimension {meta['dimension']}, "
+            f"the embedding model produces {dimension}; reindex instead"
+        )
+
+    async with corpus_lock():
+        version = meta["version"] or (
+            f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S%f}-snapshot"
+        )
+        if version == active_version():
+            raise PolicyLoadError(f"Corpus version {version} is already active")
+
+        ids, vectors, payloads = (
+            snapshot["ids"],
+            snapshot["vectors"],
+            snapshot["payloads"],
+        )
+        store = version_store(version)
+        try:
+            await init_collection(store)
+            for offset in range(0, len(ids), SNAPSHOT_PAGE_SIZE):
+                end = offset + SNAPSHOT_PAGE_SIZE
+                await upsert(
+                    ids[offset:end],
+                    vectors[offset:end].tolist(),
+                    payloads[offset:end],
+                    store=store,
+                    sparse_vectors=[
+                        sparse_terms(payload.get("content", ""))
+                        for payload in payloads[offset:end]
+                    ],
+                )
+            version_dir(version).mkdir(parents=True, exist_ok=True)
+            (version_dir(version) / "bm25.json").write_text(
+                snapshot["bm25"], encoding="utf-8"
+            )
+            await flush(store)
+            await _activate(version, store)
+        except Exception:
+            await _drop_version(version)
+            raise
+        finally:
+            await store.close()
+
+        contents = {
+            point_id: payload["content"]
+            for point_id, payload in zip(ids, payloads)
+            if payload.get("content")
+        }
+        await asyncio.to_thread(get_content_store().put_many, contents)
+        manifest = IndexManifest(settings.INDEX_MANIFEST_PATH, _manifest_target())
+        manifest.sources = meta.get("sources", {})
+        manifest.save()
+
+    report = SnapshotReport(path, version, len(ids), time.perf_counter() - start)
+    logger.info(f"Restored corpus snapshot: {report.to_dict()}")
+    return report
+
+
+async def restore_if_empty(
+    path: str = settings.SNAPSHOT_PATH,
+) -> Optional[SnapshotReport]:
+    """Restore `path` if it exists and the policy collection is missing or empty."""
+    if not os.path.exists(path):
+        return None
+    if await get_vector_store().count() > 0:
+        return None
+    logger.info(f"Policy collection is empty; restoring snapshot {path}")
+    return await restore_snapshot(path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Export or restore a portable snapshot of the policy corpus"
+    )
+    parser.add_argument("command", choices=["export", "restore"])
+    parser.add_argument("--path", default=settings.SNAPSHOT_PATH)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.command == "export":
+        report = asyncio.run(export_snapshot(args.path))
+        print(f"✅ Exported {report.points} points to {report.path}")
+    else:
+        report = asyncio.run(restore_snapshot(args.path))
+        print(f"✅ Corpus version {report.version} restored ({report.points} points)")
@@ -0,0 +1,679 @@
+import logging
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import httpx
+import numpy as np
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.http.models import (
+    CreateAlias,
+    CreateAliasOperation,
+    DeleteAlias,
+    DeleteAliasOperation,
+    Distance,
+    FieldCondition,
+    Filter,
+    FormulaQuery,
+    Fusion,
+    FusionQuery,
+    HnswConfigDiff,
+    MatchAny,
+    MatchValue,
+    Modifier,
+    MultExpression,
+    PayloadSchemaType,
+    PointIdsList,
+    PointStruct,
+    Prefetch,
+    QuantizationSearchParams,
+    QueryRequest,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    SearchParams,
+    SparseVector,
+    SparseVectorParams,
+    SumExpression,
+    VectorParams,
+)
+
+from app.config import settings
+from app.services.versions import local_index_path
+
+logger = logging.getLogger(__name__)
+
+# {"provider": ["Reddit", "Meta"]}: keep points whose field equals any listed value
+PayloadFilter = Dict[str, List[str]]
+# {"type": {"legal_framework": 0.15}}: add the bonus to points whose field equals the key
+PayloadBoosts = Dict[str, Dict[str, float]]
+
+# One boost mapping shared by every query of a batch, or one per query
+BatchBoosts = Union[PayloadBoosts, List[Optional[PayloadBoosts]]]
+
+# Lexical term weights of one text: (term ids, weights)
+SparseTerms = Tuple[List[int], List[float]]
+
+# Named sparse vector stored next to the (unnamed) dense vector for hybrid search
+SPARSE_VECTOR_NAME = "lexical"
+
+# Payload fields with a keyword index, usable in filters and boosts
+INDEXED_PAYLOAD_FIELDS = ("provider", "type")
+
+# When boosting, rescore this many times `limit` nearest candidates
+BOOST_PREFETCH_FACTOR = 4
+
+
+def project(payload: dict, fields: Optional[List[str]]) -> dict:
+    """The payload restricted to `fields` (all of it when `fields` is None)."""
+    if fields is None:
+        return payload
+    return {key: payload[key] for key in fields if key in payload}
+
+
+def boosts_per_query(
+    boosts: Optional[BatchBoosts], count: int
+) -> List[Optional[PayloadBoosts]]:
+    """Expand batch `boosts` to one (possibly None) mapping per query."""
+    if isinstance(boosts, list):
+        if len(boosts) != count:
+            raise ValueError(f"Expected {count} boost mappings, got {len(boosts)}")
+        return boosts
+    return [boosts] * count
+
+
+def matches_filter(payload: dict, filters: Optional[PayloadFilter]) -> bool:
+    """True if the payload satisfies every field condition in `filters`."""
+    if not filters:
+        return True
+    return all(payload.get(field) in values for field, values in filters.items())
+
+
+def _unit(vector) -> np.ndarray:
+    array = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(array)
+    return array / norm if norm else array
+
+
+def payload_boost(payload: dict, boosts: Optional[PayloadBoosts]) -> float:
+    """Sum of the bonuses whose field value matches the payload."""
+    if not boosts:
+        return 0.0
+    return sum(
+        bonuses.get(payload.get(field), 0.0) for field, bonuses in boosts.items()
+    )
+
+
+@dataclass(frozen=True)
+class CollectionConfig:
+    """Qdrant collection index/storage tuning and matching search parameters."""
+
+    hnsw_m: int = 16
+    hnsw_ef_construct: int = 100
+    hnsw_ef: int = 128
+    int8_quantization: bool = False
+    quantization_rescore: bool = True
+    quantization_oversampling: float = 2.0
+    on_disk_vectors: bool = False
+    on_disk_payload: bool = False
+    sparse_vectors: bool = False
+
+    @classmethod
+    def from_settings(cls) -> "CollectionConfig":
+        return cls(
+            hnsw_m=settings.QDRANT_HNSW_M,
+            hnsw_ef_construct=settings.QDRANT_HNSW_EF_CONSTRUCT,
+            hnsw_ef=settings.QDRANT_HNSW_EF,
+            int8_quantization=settings.QDRANT_INT8_QUANTIZATION,
+            quantization_rescore=settings.QDRANT_QUANTIZATION_RESCORE,
+            quantization_oversampling=settings.QDRANT_QUANTIZATION_OVERSAMPLING,
+            on_disk_vectors=settings.QDRANT_ON_DISK_VECTORS,
+            on_disk_payload=settings.QDRANT_ON_DISK_PAYLOAD,
+            sparse_vectors=settings.HYBRID_FUSION == "server",
+        )
+
+    def collection_kwargs(self, dimension: int) -> dict:
+        """Arguments for `create_collection`."""
+        quantization = None
+        if self.int8_quantization:
+            quantization = ScalarQuantization(
+                scalar=ScalarQuantizationConfig(
+                    type=ScalarType.INT8, quantile=0.99, always_ram=True
+                )
+            )
+        sparse = None
+        if self.sparse_vectors:
+            # Term weights are BM25 term-frequency parts; Qdrant applies the IDF
+            sparse = {SPARSE_VECTOR_NAME: SparseVectorParams(modifier=Modifier.IDF)}
+        return {
+            "vectors_config": VectorParams(
+                size=dimension, distance=Distance.COSINE, on_disk=self.on_disk_vectors
+            ),
+            "hnsw_config": HnswConfigDiff(
+                m=self.hnsw_m, ef_construct=self.hnsw_ef_construct
+            ),
+            "quantization_config": quantization,
+            "on_disk_payload": self.on_disk_payload,
+            "sparse_vectors_config": sparse,
+        }
+
+    def search_params(self, exact: bool = False) -> SearchParams:
+        quantization = None
+        if self.int8_quantization:
+            quantization = QuantizationSearchParams(
+                rescore=self.quantization_rescore,
+                oversampling=self.quantization_oversampling,
+            )
+        return SearchParams(
+            hnsw_ef=self.hnsw_ef, exact=exact, quantization=quantization
+        )
+
+
+class VectorStore(ABC):
+    """
+    Base class for policy vector stores.
+
+    Search results are returned as dicts of the form
+    {"id": <point id>, "score": <cosine similarity>, "data": <payload>}.
+    Searches take an optional payload filter, applied before ranking, and
+    optional payload boosts added to the similarity score, so the boosted
+    ranking decides which points make the top `limit`. `fields` limits the
+    returned payload to those keys (None = full payload).
+
+    Stores with `supports_hybrid` also index sparse lexical vectors and can
+    fuse dense and lexical rankings themselves (`hybrid_search_batch`).
+    """
+
+    supports_hybrid = False
+
+    async def connect(self) -> None:
+        """Open any long-lived connections. Called once from the app lifespan."""
+
+    async def close(self) -> None:
+        """Release connections opened by `connect`."""
+
+    async def flush(self) -> None:
+        """Wait until earlier writes are durable (stores that write through: no-op)."""
+
+    @abstractmethod
+    async def drop(self) -> None:
+        """Delete the backing collection/index and all its points."""
+
+    @abstractmethod
+    async def count(self) -> int:
+        """Number of stored points (0 if the collection does not exist yet)."""
+
+    @abstractmethod
+    async def scroll(
+        self, offset: Any = None, limit: int = 256
+    ) -> Tuple[list[dict], Any]:
+        """
+        One page of points as {"id", "vector", "data"} dicts, plus the offset
+        of the next page (None after the last page).
+        """
+
+    @abstractmethod
+    async def init_collection(self, dimension: int) -> None:
+        """Create the backing collection/index if it does not exist yet."""
+
+    @abstractmethod
+    async def add(
+        self,
+        ids: list[str],
+        vectors: list[list[float]],
+        payloads: list[dict],
+        sparse_vectors: Optional[List[SparseTerms]] = None,
+    ) -> None:
+        """
+        Insert or overwrite points by ID. `sparse_vectors` are stored only by
+        stores that support hybrid search.
+        """
+
+    @abstractmethod
+    async def delete(self, ids: list[str]) -> None:
+        """Remove points by ID. Unknown IDs are ignored."""
+
+    @abstractmethod
+    async def retrieve(
+        self, ids: list[str], fields: Optional[List[str]] = None
+    ) -> list[dict]:
+        """Fetch points by ID (as {"id", "data"} dicts). Unknown IDs are skipped."""
+
+    @abstractmethod
+    async def search(
+        self,
+        vector: list[float],
+        limit: int = 3,
+        filters: Optional[PayloadFilter] = None,
+        boosts: Optional[PayloadBoosts] = None,
+        fields: Optional[List[str]] = None,
+    ) -> list[dict]:
+        """Return the `limit` nearest points to a single query vector."""
+
+    @abstractmethod
+    async def search_batch(
+        self,
+        vectors: list[list[float]],
+        limit: int = 3,
+        filters: Optional[PayloadFilter] = None,
+        boosts: Optional[BatchBoosts] = None,
+        fields: Optional[List[str]] = None,
+    ) -> list[list[dict]]:
+        """
+        Return the nearest points for each query vector, in input order.
+        `boosts` may be a list with one mapping per query vector.
+        """
+
+    @abstractmethod
+    async def hybrid_search_batch(
+        self,
+        vectors: list[list[float]],
+        sparse_queries: List[SparseTerms],
+        limit: int = 3,
+        filters: Optional[PayloadFilter] = None,
+        boosts: Optional[BatchBoosts] = None,
+        fields: Optional[List[str]] = None,
+    ) -> list[list[dict]]:
+        """
+        Like `search_batch`, but each result list is ordered by the fusion of
+        the dense ranking with the lexical ranking of the matching sparse
+        query. `score` stays the (boosted) dense similarity; the fusion score
+        is returned as `fused`. Only called when `supports_hybrid` is true.
+        """
+
+
+class QdrantVectorStore(VectorStore):
+    """
+    Vector store backed by a remote Qdrant collection.
+
+    Uses a single AsyncQdrantClient whose HTTP pool keeps connections alive
+    between requests instead of reconnecting on every search.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        collection_name: str,
+        config: Optional[CollectionConfig] = None,
+    ):
+        self.url = url
+        self.collection_name = collection_name
+        self.config = config or CollectionConfig.from_settings()
+        self.client: Optional[AsyncQdrantClient] = None
+        self._has_sparse = False
+
+    @property
+    def supports_hybrid(self) -> bool:
+        """
+        Server-side fusion needs HYBRID_FUSION=server and the sparse vector in
+        the collection's schema. The schema is read on connect, on init and
+        when a version switch repoints the alias; until the collection has the
+        sparse vector, queries use client-side fusion.
+        """
+        return self.config.sparse_vectors and self._has_sparse
+
+    async def connect(self) -> None:
+        if self.client is not None:
+            return
+        self.client = AsyncQdrantClient(
+            url=self.url,
+            timeout=settings.QDRANT_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=settings.QDRANT_POOL_SIZE,
+                max_keepalive_connections=settings.QDRANT_POOL_SIZE,
+                keepalive_expiry=settings.QDRANT_KEEPALIVE_EXPIRY,
+            ),
+        )
+        if self.config.sparse_vectors:
+            try:
+                await self.refresh_schema()
+            except Exception as e:
+                logger.warning(f"Could not read the {self.collection_name} schema: {e}")
+
+    async def refresh_schema(self) -> None:
+        """Re-read whether the collection (behind the alias) has sparse vectors."""
+        client = await self._client()
+        if not await self._exists():
+            self._has_sparse = False
+            return
+        params = (await client.get_collection(self.collection_name)).config.params
+        self._has_sparse = SPARSE_VECTOR_NAME in (params.sparse_vectors or {})
+
+    async def close(self) -> None:
+        if self.client is not None:
+            await self.client.close()
+            self.client = None
+
+    async def _client(self) -> AsyncQdrantClient:
+        # Scripts (e.g. policy_loader) run outside the app lifespan
+        if self.client is None:
+            await self.connect()
+        return self.client
+
+    async def _exists(self) -> bool:
+        """Whether the collection exists, directly or as an alias."""
+        client = await self._client()
+        collections = [col.name for col in (await client.get_collections()).collections]
+        aliases = [a.alias_name for a in (await client.get_aliases()).aliases]
+        return self.collection_name in collections + aliases
+
+    async def init_collection(self, dimension: int) -> None:
+        client = await self._client()
+        if not await self._exists():
+            await client.create_collection(
+                collection_name=self.collection_name,
+                **self.config.collection_kwargs(dimension),
+            )
+        # Idempotent; also backfills indexes on collections created before them
+        for field in INDEXED_PAYLOAD_FIELDS:
+            await client.create_payload_index(
+                collection_name=self.collection_name,
+                field_name=field,
+                field_schema=PayloadSchemaType.KEYWORD,
+            )
+        await self.refresh_schema()
+
+    async def drop(self) -> None:
+        client = await self._client()
+        await client.delete_collection(self.collection_name)
+
+    async def count(self) -> int:
+        if not await self._exists():
+            return 0
+        client = await self._client()
+        return (await client.count(self.collection_name, exact=True)).count
+
+    async def scroll(
+        self, offset: Any = None, limit: int = 256
+    ) -> Tuple[list[dict], Any]:
+        client = await self._client()
+        points, next_offset = await client.scroll(
+            collection_name=self.collection_name,
+            offset=offset,
+            limit=limit,
+            with_payload=True,
+            # Only the dense vector, also on collections with sparse vectors
+            with_vectors=[""],
+        )
+        return [
+            {"id": p.id, "vector": p.vector, "data": p.payload} for p in points
+        ], next_offset
+
+    async def point_alias(self, alias: str) -> None:
+        """
+        Atomically (re)point `alias` at this collection. A plain collection
+        already named `alias` (from before versioned collections) is deleted
+        first, which leaves a brief gap once.
+        """
+        client = await self._client()
+        aliases = [a.alias_name for a in (await client.get_aliases()).aliases]
+        collections = [col.name for col in (await client.get_collections()).collections]
+        if alias in collections:
+            logger.warning(f"Replacing unversioned collection {alias} with an alias")
+            await client.delete_collection(alias)
+
+        operations = []
+        if alias in aliases:
+            operations.append(
+                DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=alias))
+            )
+        operations.append(
+            CreateAliasOperation(
+                create_alias=CreateAlias(
+                    collection_name=self.collection_name, alias_name=alias
+                )
+            )
+        )
+        await client.update_collection_aliases(change_aliases_operations=operations)
+
+    async def add(
+        self,
+        ids: list[str],
+        vectors: list[list[float]],
+        payloads: list[dict],
+        sparse_vectors: Optional[List[SparseTerms]] = None,
+    ) -> None:
+        client = await self._client()
+        if self.supports_hybrid and sparse_vectors is not None:
+            vectors = [
+                {
+                    "": vector,
+                    SPARSE_VECTOR_NAME: SparseVector(indices=indices, values=values),
+                }
+                for vector, (indices, values) in zip(vectors, sparse_vectors)
+            ]
+        points = [
+            PointStruct(id=point_id, vector=vector, payload=payload)
+            for point_id, vector, payload in zip(ids, vectors, payloads)
+        ]
+        await client.upsert(collection_name=self.collection_name, points=points)
+
+    async def delete(self, ids: list[str]) -> None:
+        client = await self._client()
+        await client.delete(
+            collection_name=self.collection_name,
+            points_selector=PointIdsList(points=ids),
+        )
+
+    async def retrieve(
+        self, ids: list[str], fields: Optional[List[str]] = None
+    ) -> list[dict]:
+        client = await self._client()
+        points = await client.retrieve(
+            collection_name=self.collection_name,
+            ids=ids,
+            with_payload=list(fields) if fields is not None else True,
+        )
+        return [{"id": p.id, "data": p.payload} for p in points]
+
+    async def search(
+        self,
+        vector: list[float],
+        limit: int = 3,
+        filters: Optional[PayloadFilter] = None,
+        boosts: Optional[PayloadBoosts] = None,
+        fields: Optional[List[str]] = None,
+    ) -> list[dict]:
+        return (await self.search_batch([vector], limit, filters, boosts, fields))[0]
+
+    async def search_batch(
+        self,
+        vectors: list[list[float]],
+        limit: int = 3,
+        filters: Optional[PayloadFilter] = None,
+        boosts: Optional[BatchBoosts] = None,
+        fields: Optional[List[str]] = None,
+    ) -> list[list[dict]]:
+        if not vectors:
+            return []
+        client = await self._client()
+        batch = await client.query_batch_points(
+            collection_name=self.collection_name,
+            requests=[
+                self._query_request(vector, limit, filters, query_boosts, fields)
+                for vector, query_boosts in zip(
+                    vectors, boosts_per_query(boosts, len(vectors))
+                )
+            ],
+        )
+        return [
+            [{"id": r.id, "score": r.score, "data": r.payload} for r in response.points]
+            for response in batch
+        ]
+
+    async def hybrid_search_batch(
+        self,
+        vectors: list[list[float]],
+        sparse_queries: List[SparseTerms],
+        limit: int = 3,
+        filters: Optional[PayloadFilter] = None,
+        boosts: Optional[BatchBoosts] = None,
+        fields: Optional[List[str]] = None,
+    ) -> list[list[dict]]:
+        if not vectors:
+            return []
+        client = await self._client()
+        batch = await client.query_batch_points(
+            collection_name=self.collection_name,
+            requests=[
+                self._hybrid_request(
+                    vector, sparse, limit, filters, query_boosts, fields
+                )
+                for vector, sparse, query_boosts in zip(
+                    vectors, sparse_queries, boosts_per_query(boosts, len(vectors))
+                )
+            ],
+        )
+        results = []
+        for vector, query_boosts, response in zip(
+            vectors, boosts_per_query(boosts, len(vectors)), batch
+        ):
+            query = _unit(vector)
+            results.append(
+                [
+                    {
+                        "id": r.id,
+                        # Cosine of the returned dense vector, boosted like search
+                        "score": float(query @ _unit(r.vector))
+                        + payload_boost(r.payload or {}, query_boosts),
+                        "fused": r.score,
+                        "data": r.payload,
+                    }
+                    for r in response.points
+                ]
+            )
+        return results
+
+    def _query_request(
+        self,
+        vector: list[float],
+        limit: int,
+        filters: Optional[PayloadFilter],
+        boosts: Optional[PayloadBoosts],
+        fields: Optional[List[str]] = None,
+    ) -> QueryRequest:
+        with_payload = list(fields) if fields is not None else True
+        formula = self._boost_formula(boosts)
+        if formula is None:
+            return QueryRequest(
+                query=vector,
+                filter=self._query_filter(filters),
+                params=self.config.search_params(),
+                limit=limit,
+                with_payload=with_payload,
+            )
+
+        # Nearest candidates first, then rescored server-side as
+        # score + sum(bonus * [field == value])
+        return QueryRequest(
+            prefetch=Prefetch(
+                query=vector,
+                filter=self._query_filter(filters),
+                params=self.config.search_params(),
+                limit=limit * BOOST_PREFETCH_FACTOR,
+            ),
+            query=formula,
+            limit=limit,
+            with_payload=with_payload,
+        )
+
+    def _hybrid_request(
+        self,
+        vector: list[float],
+        sparse: SparseTerms,
+        limit: int,
+        filters: Optional[PayloadFilter],
+        boosts: Optional[PayloadBoosts],
+        fields: Optional[List[str]] = None,
+    ) -> QueryRequest:
+        """
+        Dense (boosted) and lexical candidates fused with RRF in one request.
+        Each ranking contributes `limit` candidates.
+        """
+        indices, values = sparse
+        return QueryRequest(
+            prefetch=[
+                self._dense_prefetch(vector, limit, filters, boosts),
+                Prefetch(
+                    query=SparseVector(indices=indices, values=values),
+                    using=SPARSE_VECTOR_NAME,
+                    filter=self._query_filter(filters),
+                    limit=limit,
+                ),
+            ],
+            query=FusionQuery(fusion=Fusion.RRF),
+            limit=limit,
+            with_payload=list(fields) if fields is not None else True,
+            # Only the unnamed dense vector, to report its similarity
+            with_vector=[""],
+        )
+
+    def _dense_prefetch(
+        self,
+        vector: list[float],
+        limit: int,
+        filters: Optional[PayloadFilter],
+        boosts: Optional[PayloadBoosts],
+    ) -> Prefetch:
+        """The dense ranking, boosted like `_query_request`, as a prefetch."""
+        formula = self._boost_formula(boosts)
+        nearest = Prefetch(
+            query=vector,
+            filter=self._query_filter(filters),
+            params=self.config.search_params(),
+            limit=limit if formula is None else limit * BOOST_PREFETCH_FACTOR,
+        )
+        if formula is None:
+            return nearest
+        return Prefetch(prefetch=nearest, query=formula, limit=limit)
+
+    @staticmethod
+    def _query_filter(filters: Optional[PayloadFilter]) -> Optional[Filter]:
+        if not filters:
+            return None
+        return Filter(
+            must=[
+                FieldCondition(key=field, match=MatchAny(any=list(values)))
+                for field, values in filters.items()
+            ]
+        )
+
+    @staticmethod
+    def _boost_formula(boosts: Optional[PayloadBoosts]) -> Optional[FormulaQuery]:
+        bonuses = [
+            MultExpression(
+                mult=[bonus, FieldCondition(key=field, match=MatchValue(value=value))]
+            )
+            for field, values in (boosts or {}).items()
+            for value, bonus in values.items()
+        ]
+        if not bonuses:
+            return None
+        return FormulaQuery(formula=SumExpression(sum=["$score", *bonuses]))
+
+
+def get_vector_store() -> VectorStore:
+    """
+    The vector store selected by the VECTOR_BACKEND setting. For the local
+    backend this follows the active corpus version; Qdrant resolves the
+    version through the collection alias.
+    """
+    if settings.VECTOR_BACKEND == "local":
+        return _local_store(local_index_path())
+    return _vector_store(settings.VECTOR_BACKEND)
+
+
+@lru_cache(maxsize=1)
+def _vector_store(backend: str) -> VectorStore:
+    if backend == "qdrant":
+        return QdrantVectorStore(settings.QDRANT_HOST, settings.QDRANT_COLLECTION_NAME)
+
+    raise ValueError(f"Unknown VECTOR_BACKEND: {backend}")
+
+
+@lru_cache(maxsize=2)
+def _local_store(path: str) -> VectorStore:
+    from app.services.local_index import LocalVectorStore
+
+    return LocalVectorStore(path)
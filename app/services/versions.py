@@ -0,0 +1,65 @@
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+from app.config import settings
+
+_lock = threading.Lock()
+_cached: dict = {"mtime": None, "state": {}}
+
+
+def read_state() -> dict:
+    """
+    The corpus version pointer: {"active": <version>, "previous": <version>}.
+
+    Re-read only when the file changes, so a switch made by another process
+    (e.g. the reindex CLI) is picked up on the next call.
+    """
+    path = Path(settings.INDEX_VERSION_STATE_PATH)
+    try:
+        mtime = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return {}
+
+    with _lock:
+        if _cached["mtime"] != mtime:
+            with open(path, "r", encoding="utf-8") as f:
+                _cached["state"] = json.load(f)
+            _cached["mtime"] = mtime
+        return dict(_cached["state"])
+
+
+def write_state(active: str, previous: Optional[str]) -> None:
+    """Switch the active version (atomic file replace)."""
+    path = Path(settings.INDEX_VERSION_STATE_PATH)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"active": active, "previous": previous}, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def active_version() -> Optional[str]:
+    return read_state().get("active")
+
+
+def version_dir(version: str) -> Path:
+    return Path(settings.INDEX_VERSIONS_DIR) / version
+
+
+def bm25_index_path() -> str:
+    """BM25 index of the active version (or the unversioned default)."""
+    version = active_version()
+    if version is None:
+        return settings.BM25_INDEX_PATH
+    return str(version_dir(version) / "bm25.json")
+
+
+def local_index_path() -> str:
+    """Local vector index of the active version (or the unversioned default)."""
+    version = active_version()
+    if version is None:
+        return settings.LOCAL_INDEX_PATH
+    return str(version_dir(version) / "policies.npz")
@@ -18,6 +18,14 @@ class PolicyLoadError(Exception):
     pass
 
 
+class OverloadedError(Exception):
+    """Raised when a request is shed because the server is at capacity."""
+
+    def __init__(self, message: str, retry_after: int = 1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
 # ─── Agent-Orchestration Errors ───────────────────────────────────────
 
 
@@ -11,8 +11,8 @@
 
 
 
-# Start FastAPI backend
-uvicorn api.main:app --host 0.0.0.0 --port 8000 &
+# Start FastAPI backend (API_WORKERS forked workers sharing one loaded model)
+python -m api.serve --host 0.0.0.0 --port 8000 --workers "${API_WORKERS:-1}" &
 
 # Start Streamlit frontend
 cd ui
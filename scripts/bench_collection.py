@@ -0,0 +1,189 @@
+"""
+Recall/latency benchmark for the Qdrant collection tuning settings.
+
+Builds a synthetic corpus of clustered unit vectors (default 100k chunks of
+dimension 384, like all-MiniLM-L6-v2), loads it into one collection per
+configuration and compares HNSW/quantized search against exact search:
+
+    python scripts/bench_collection.py --url http://localhost:6333
+    python scripts/bench_collection.py --url :memory: --points 2000   # smoke test
+
+Reports recall@limit against an exact NumPy search, p50/p95 query latency and
+an estimate of the RAM needed for vectors and the HNSW graph, to help size
+nodes as the policy corpus grows. (":memory:" is qdrant-client's local mode,
+which always searches exhaustively, so only the real server numbers are
+meaningful.)
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from dataclasses import replace
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.config import settings  # noqa: E402
+from app.services.vector_store import CollectionConfig, QdrantVectorStore  # noqa: E402
+
+CONFIGS = {
+    "m16": CollectionConfig(hnsw_m=16, hnsw_ef_construct=100),
+    "m32": CollectionConfig(hnsw_m=32, hnsw_ef_construct=200),
+    "m16-int8": CollectionConfig(
+        hnsw_m=16, hnsw_ef_construct=100, int8_quantization=True
+    ),
+    "m16-int8-disk": CollectionConfig(
+        hnsw_m=16,
+        hnsw_ef_construct=100,
+        int8_quantization=True,
+        on_disk_vectors=True,
+        on_disk_payload=True,
+    ),
+}
+EF_VALUES = (32, 64, 128, 256)
+UPLOAD_BATCH = 1000
+
+
+def synthetic_corpus(points: int, dim: int, queries: int, seed: int = 7):
+    """Clustered unit vectors (policy chunks share topics) and nearby queries."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(1, points // 100), dim)).astype(np.float32)
+    assignment = rng.integers(0, len(centers), size=points)
+    corpus = centers[assignment] + 0.6 * rng.normal(size=(points, dim)).astype(
+        np.float32
+    )
+    corpus /= np.linalg.norm(corpus, axis=1, keepdims=True)
+
+    picks = rng.integers(0, points, size=queries)
+    query_vectors = corpus[picks] + 0.3 * rng.normal(size=(queries, dim)).astype(
+        np.float32
+    )
+    query_vectors /= np.linalg.norm(query_vectors, axis=1, keepdims=True)
+    return corpus, query_vectors
+
+
+def exact_top_k(corpus: np.ndarray, queries: np.ndarray, k: int) -> list[set]:
+    truth = []
+    for start in range(0, len(queries), 64):
+        scores = queries[start : start + 64] @ corpus.T
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        truth.extend(set(row.tolist()) for row in top)
+    return truth
+
+
+def estimated_ram_mb(config: CollectionConfig, points: int, dim: int) -> float:
+    """Vectors kept in RAM plus HNSW links (~2*m neighbours of 8 bytes on layer 0)."""
+    vectors = 0 if config.on_disk_vectors else points * dim * 4
+    quantized = points * dim if config.int8_quantization else 0
+    graph = points * config.hnsw_m * 2 * 8
+    return (vectors + quantized + graph) / 2**20
+
+
+async def wait_until_indexed(store: QdrantVectorStore, timeout: float = 600) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        info = await store.client.get_collection(store.collection_name)
+        if str(info.status).lower().endswith("green"):
+            return
+        await asyncio.sleep(1)
+    raise TimeoutError(f"{store.collection_name} was not indexed within {timeout}s")
+
+
+async def timed_queries(store, queries, limit, params):
+    latencies, results = [], []
+    for vector in queries:
+        start = time.perf_counter()
+        response = await store.client.query_points(
+            collection_name=store.collection_name,
+            query=vector.tolist(),
+            limit=limit,
+            search_params=params,
+            with_payload=False,
+        )
+        latencies.append(time.perf_counter() - start)
+        results.append({int(p.id) for p in response.points})
+    return np.array(latencies) * 1000, results
+
+
+def report_row(name, ef, latencies, results, truth, limit, ram_mb):
+    recall = np.mean([len(r & t) / limit for r, t in zip(results, truth)])
+    print(
+        f"{name:>14} {ef:>5} {recall:>8.4f} {np.percentile(latencies, 50):>8.2f} "
+        f"{np.percentile(latencies, 95):>8.2f} {ram_mb:>9.1f}"
+    )
+
+
+async def run(args):
+    corpus, queries = synthetic_corpus(args.points, args.dim, args.queries)
+    truth = exact_top_k(corpus, queries, args.limit)
+    ids = list(range(args.points))
+    payload = {"provider": "bench", "type": "platform_policy"}
+
+    print(
+        f"{args.points} points x {args.dim} dims, {args.queries} queries, k={args.limit}"
+    )
+    print(
+        f"{'config':>14} {'ef':>5} {'recall':>8} {'p50 ms':>8} {'p95 ms':>8} {'RAM MB':>9}"
+    )
+    for name in args.configs:
+        config = CONFIGS[name]
+        store = QdrantVectorStore(args.url, f"bench_{name}", config)
+        if args.url == ":memory:":
+            # connect() builds a remote client; local mode needs `location`
+            from qdrant_client import AsyncQdrantClient
+
+            store.client = AsyncQdrantClient(location=":memory:")
+        else:
+            await store.connect()
+        try:
+            await store.client.delete_collection(store.collection_name)
+            await store.init_collection(args.dim)
+            for start in range(0, args.points, UPLOAD_BATCH):
+                end = start + UPLOAD_BATCH
+                await store.add(
+                    ids[start:end],
+                    corpus[start:end].tolist(),
+                    [payload] * len(ids[start:end]),
+                )
+            await wait_until_indexed(store)
+
+            ram_mb = estimated_ram_mb(config, args.points, args.dim)
+            latencies, results = await timed_queries(
+                store, queries, args.limit, config.search_params(exact=True)
+            )
+            report_row(
+                f"{name}/exact", "-", latencies, results, truth, args.limit, ram_mb
+            )
+            for ef in EF_VALUES:
+                params = replace(config, hnsw_ef=ef).search_params()
+                latencies, results = await timed_queries(
+                    store, queries, args.limit, params
+                )
+                report_row(name, ef, latencies, results, truth, args.limit, ram_mb)
+        finally:
+            if not args.keep:
+                await store.client.delete_collection(store.collection_name)
+            await store.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", default=settings.QDRANT_HOST)
+    parser.add_argument("--points", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument(
+        "--configs", nargs="+", choices=sorted(CONFIGS), default=list(CONFIGS)
+    )
+    parser.add_argument(
+        "--keep", action="store_true", help="keep the bench_* collections"
+    )
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
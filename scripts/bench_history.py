@@ -0,0 +1,104 @@
+"""
+Analytics query benchmark for the columnar analysis history.
+
+Writes a synthetic history (default 1M analyses over 90 days, five labels)
+with HistoryStore, in flush-sized files like the audit log produces, then
+times the /history queries over the last week and the full range, before
+and after compaction:
+
+    python scripts/bench_history.py --rows 1000000 --days 90
+
+Reports ms per query (best of 3).
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.models.history import ClassificationLog  # noqa: E402
+from app.services.history_store import HistoryStore  # noqa: E402
+
+LABELS = ["Hate", "Toxic", "Offensive", "Ambiguous", "Neutral"]
+ACTIONS = ["REMOVE", "WARN", "FLAG", "ESCALATE", "ALLOW"]
+PROVIDERS = ["Meta", "Reddit", "YouTube", "X"]
+
+
+def generate(store: HistoryStore, rows: int, days: int, flush: int) -> None:
+    first = datetime.now(timezone.utc) - timedelta(days=days)
+    span = days * 86400
+    for offset in range(0, rows, flush):
+        start = first + timedelta(seconds=span * offset / rows)
+        batch = []
+        for i in range(min(flush, rows - offset)):
+            label = random.randrange(len(LABELS))
+            batch.append(
+                ClassificationLog(
+                    input_text="",
+                    classification=LABELS[label],
+                    policy_match="p1,p2",
+                    moderation_action=ACTIONS[label],
+                    timestamp=start + timedelta(milliseconds=i),
+                    confidence="HIGH",
+                    severity="MEDIUM",
+                    providers=random.sample(PROVIDERS, random.randint(0, 3)),
+                    latency_ms=random.lognormvariate(7, 0.4),
+                )
+            )
+        store.append(batch)
+
+
+def best_ms(fn) -> float:
+    timings = []
+    for _ in range(3):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--flush", type=int, default=2_000)
+    args = parser.parse_args()
+
+    path = tempfile.mkdtemp(prefix="history-bench-")
+    store = HistoryStore(path)
+    try:
+        started = time.perf_counter()
+        generate(store, args.rows, args.days, args.flush)
+        print(f"wrote {args.rows} rows in {time.perf_counter() - started:.1f}s")
+
+        today = date.today()
+        week, full = today - timedelta(6), today - timedelta(args.days)
+        queries = [
+            ("labels/day 7d", lambda: store.distribution("label", week, today)),
+            ("labels/day all", lambda: store.distribution("label", full, today)),
+            (
+                "hate actions 7d",
+                lambda: store.distribution("action", week, today, "hour", ["hate"]),
+            ),
+            ("providers all", lambda: store.provider_hits(full, today)),
+            ("latency/day all", lambda: store.latency(full, today)),
+        ]
+        for phase in ("flushed", "compacted"):
+            if phase == "compacted":
+                started = time.perf_counter()
+                store.compact()
+                print(f"compacted in {time.perf_counter() - started:.1f}s")
+            for name, query in queries:
+                print(f"{phase:>10} {name:>16} {best_ms(query):>8.1f} ms")
+    finally:
+        shutil.rmtree(path)
+
+
+if __name__ == "__main__":
+    main()
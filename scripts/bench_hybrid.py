@@ -0,0 +1,256 @@
+"""
+Quality/latency comparison of client-side and server-side hybrid retrieval.
+
+Indexes data/policy_docs into one Qdrant collection holding both the dense
+vector and the sparse lexical vector of every chunk, then runs a small
+labeled query set through:
+
+    client     dense search, then BM25 side index + RRF and the heuristic
+               rerank in the retriever (HYBRID_FUSION=client)
+    client+ce  the same followed by the cross-encoder (with --cross-encoder)
+    server     one Qdrant request fusing the dense and sparse rankings with
+               RRF, then the heuristic rerank (HYBRID_FUSION=server)
+
+    DIAL_API_KEY=dummy python scripts/bench_hybrid.py --url http://localhost:6333
+    DIAL_API_KEY=dummy python scripts/bench_hybrid.py --url :memory:
+
+Reports hit@1, recall@3 and MRR of the expected policy, and p50/p95 latency
+of the retrieval stage. Query embedding is excluded since both modes share it.
+(app.agents builds a DIALService on import, so the key must be set; no LLM
+calls are made.)
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from unittest import mock
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.agents.retriever import (  # noqa: E402
+    CANDIDATE_CHUNKS,
+    TOP_K,
+    HybridRetriever,
+)
+from app.config import settings  # noqa: E402
+from app.models.schemas import ClassificationLabel, ClassificationResult  # noqa: E402
+from app.services.bm25 import BM25Index, sparse_query, sparse_terms  # noqa: E402
+from app.services.embed_service import get_embedding_service  # noqa: E402
+from app.services.ingestion import policy_to_points  # noqa: E402
+from app.services.policy_loader import PolicyDocumentLoader  # noqa: E402
+from app.services.reranker import CrossEncoderReranker  # noqa: E402
+from app.services.vector_store import CollectionConfig, QdrantVectorStore  # noqa: E402
+
+H, T, O = (
+    ClassificationLabel.hate,
+    ClassificationLabel.toxic,
+    ClassificationLabel.offensive,
+)
+
+# (text, label, classifier reasoning, policy file that should rank first)
+LABELED_QUERIES = [
+    (
+        "They are animals and insects, not people",
+        H,
+        "Dehumanizing comparison of a group to animals",
+        "meta_community_standards.txt",
+    ),
+    (
+        "This post insults our religion and should be punished under section 295A",
+        H,
+        "Deliberate insult of religious beliefs",
+        "indian_legal_framework.txt",
+    ),
+    (
+        "Spreading enmity between regional and language groups online",
+        H,
+        "Promotes hatred between communities",
+        "indian_legal_framework.txt",
+    ),
+    (
+        "The Holocaust never happened, it's a hoax",
+        H,
+        "Denial of a well-documented violent event",
+        "youtube_community_guidelines.txt",
+    ),
+    (
+        "Those people secretly control the world's banks and media",
+        H,
+        "Conspiracy theory blaming a protected group",
+        "youtube_community_guidelines.txt",
+    ),
+    (
+        "Should my channel lose monetization for this hateful video?",
+        T,
+        "Question about monetization after hate speech violations",
+        "youtube_community_guidelines.txt",
+    ),
+    (
+        "Let's quarantine that subreddit, it keeps posting slurs",
+        O,
+        "Slurs and epithets repeatedly posted in a community",
+        "reddit_policy.txt",
+    ),
+    (
+        "Using a slur about my own community as a reclaimed word",
+        O,
+        "Self-referential use of a slur",
+        "reddit_policy.txt",
+    ),
+    (
+        "Ads targeting people who hate immigrants",
+        H,
+        "Advertising that targets hate speech audiences",
+        "google_prohibited_content.txt",
+    ),
+    (
+        "Autocomplete suggests hateful phrases about a religion",
+        T,
+        "Search suggestions containing hate speech",
+        "google_prohibited_content.txt",
+    ),
+    (
+        "Women of that caste are inferior and should be segregated",
+        H,
+        "Statements of inferiority and calls for segregation",
+        "meta_community_standards.txt",
+    ),
+    (
+        "Free speech under Article 19 means I can say anything",
+        T,
+        "Claims of unlimited freedom of expression",
+        "indian_legal_framework.txt",
+    ),
+]
+
+
+async def build_collection(args, store: QdrantVectorStore):
+    policies = PolicyDocumentLoader(args.docs_path).load_all_policies()
+    points = [point for policy in policies for point in policy_to_points(policy)]
+    ids = [point_id for point_id, _, _ in points]
+    texts = [text for _, text, _ in points]
+    payloads = [payload for _, _, payload in points]
+
+    embedder = get_embedding_service()
+    await store.client.delete_collection(store.collection_name)
+    await store.init_collection(embedder.dimension)
+    await store.add(
+        ids, embedder.embed_batch(texts), payloads, [sparse_terms(t) for t in texts]
+    )
+
+    bm25 = BM25Index()
+    for point_id, text, payload in points:
+        bm25.add(point_id, text, payload)
+    return len(points), bm25
+
+
+async def run_mode(store, retriever, queries, vectors, server_fused):
+    latencies, ranks = [], []
+    for (text, label, reasoning, expected), vector in zip(queries, vectors):
+        classification = ClassificationResult(
+            label=label, confidence=0.9, reasoning=reasoning
+        )
+        boosts = retriever._type_boosts(classification)
+        start = time.perf_counter()
+        if server_fused:
+            keyword_query = sparse_query(retriever._keyword_query(text, classification))
+            hits = (
+                await store.hybrid_search_batch(
+                    [vector], [keyword_query], CANDIDATE_CHUNKS, boosts=boosts
+                )
+            )[0]
+        else:
+            hits = await store.search(vector, CANDIDATE_CHUNKS, boosts=boosts)
+        ranked, _ = await retriever._rank(
+            text, classification, hits, None, server_fused
+        )
+        latencies.append(time.perf_counter() - start)
+
+        order = [r["id"] for r in ranked]
+        ranks.append(order.index(expected) + 1 if expected in order else None)
+    return np.array(latencies) * 1000, ranks
+
+
+def report_row(name, latencies, ranks):
+    hit1 = np.mean([r == 1 for r in ranks])
+    recall = np.mean([r is not None and r <= TOP_K for r in ranks])
+    mrr = np.mean([1 / r if r else 0.0 for r in ranks])
+    print(
+        f"{name:>10} {hit1:>7.3f} {recall:>9.3f} {mrr:>7.3f} "
+        f"{np.percentile(latencies, 50):>8.2f} {np.percentile(latencies, 95):>8.2f}"
+    )
+
+
+async def run(args):
+    store = QdrantVectorStore(
+        args.url, "bench_hybrid", CollectionConfig(sparse_vectors=True)
+    )
+    if args.url == ":memory:":
+        # connect() builds a remote client; local mode needs `location`
+        from qdrant_client import AsyncQdrantClient
+
+        store.client = AsyncQdrantClient(location=":memory:")
+    else:
+        await store.connect()
+
+    try:
+        chunks, bm25 = await build_collection(args, store)
+        queries = LABELED_QUERIES * args.repeat
+        vectors = get_embedding_service().embed_batch([q[0] for q in queries])
+        retriever = HybridRetriever()
+        modes = [("client", False, None), ("server", True, None)]
+        if args.cross_encoder:
+            reranker = CrossEncoderReranker(
+                settings.RERANKER_MODEL,
+                settings.RERANKER_BATCH_SIZE,
+                settings.RERANKER_CACHE_SIZE,
+            )
+            modes.insert(1, ("client+ce", False, reranker))
+
+        print(f"{chunks} chunks, {len(queries)} queries, top-{TOP_K} policies")
+        print(
+            f"{'mode':>10} {'hit@1':>7} {'recall@3':>9} {'MRR':>7} "
+            f"{'p50 ms':>8} {'p95 ms':>8}"
+        )
+        with mock.patch("app.agents.retriever.keyword_search", bm25.search):
+            for name, server_fused, reranker in modes:
+                with (
+                    mock.patch(
+                        "app.agents.retriever.get_reranker", return_value=reranker
+                    ),
+                    mock.patch.object(settings, "RERANKER_BUDGET_MS", float("inf")),
+                ):
+                    latencies, ranks = await run_mode(
+                        store, retriever, queries, vectors, server_fused
+                    )
+                report_row(name, latencies, ranks)
+    finally:
+        if not args.keep:
+            await store.client.delete_collection(store.collection_name)
+        await store.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", default=settings.QDRANT_HOST)
+    parser.add_argument("--docs-path", default=settings.POLICY_DOCS_PATH)
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="passes over the query set"
+    )
+    parser.add_argument(
+        "--cross-encoder",
+        action="store_true",
+        help="also time the client path with the cross-encoder rerank",
+    )
+    parser.add_argument(
+        "--keep", action="store_true", help="keep the bench_hybrid collection"
+    )
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
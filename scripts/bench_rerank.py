@@ -0,0 +1,119 @@
+"""
+Microbenchmark for HybridRetriever reranking.
+
+Compares the original per-request substring scan against the precomputed
+term-set / NumPy rerank as the number of candidates and the policy length grow.
+
+    DIAL_API_KEY=dummy python scripts/bench_rerank.py
+
+(app.agents builds a DIALService on import, so the key must be set; no LLM
+or embedding calls are made.)
+"""
+
+import os
+import random
+import sys
+import timeit
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.models.schemas import ClassificationLabel, ClassificationResult  # noqa: E402
+from app.services.bm25 import tokenize  # noqa: E402
+
+with mock.patch("app.agents.retriever.get_embedding_service"):
+    from app.agents.retriever import TYPE_BOOSTS, HybridRetriever  # noqa: E402
+
+    retriever = HybridRetriever()
+
+VOCAB = (
+    "hate harassment discrimination toxic abuse harmful offensive slur "
+    "inappropriate violence threat religion race ethnicity gender content "
+    "policy removal warning suspension community guidelines protected group "
+    "dehumanizing language individuals targeted epithets enforcement"
+).split()
+
+CLASSIFICATION = ClassificationResult(
+    label=ClassificationLabel.hate,
+    confidence=0.9,
+    reasoning=(
+        "The message uses dehumanizing language and slurs targeting a protected "
+        "group based on religion, which constitutes hate and harassment."
+    ),
+)
+
+
+def legacy_score(results, classification):
+    """The pre-index implementation: lowercase and substring-scan every request."""
+    reasoning_terms = retriever._extract_keywords(classification.reasoning)
+    label_terms = ["hate", "harassment", "discrimination"]
+    for r in results:
+        content = r["data"].get("content", "").lower()
+        title = r["data"].get("title", "").lower()
+        reasoning_score = (
+            sum(1 for w in reasoning_terms if w in content or w in title) * 0.05
+        )
+        label_score = sum(1 for w in label_terms if w in content) * 0.1
+        type_bonus = TYPE_BOOSTS.get(classification.label, {}).get(
+            r["data"].get("type", ""), 0.0
+        )
+        final_score = r["score"] + reasoning_score + label_score + type_bonus
+        r["score"] = min(final_score, 1.0)
+        r["explanation"] = retriever._generate_explanation(
+            r["data"]["title"],
+            r["data"]["provider"],
+            reasoning_terms + label_terms,
+            classification.label,
+            final_score,
+        )
+    return results
+
+
+def make_candidates(n: int, words: int, precomputed: bool):
+    rng = random.Random(n * 7919 + words)
+    candidates = []
+    for i in range(n):
+        content = " ".join(rng.choice(VOCAB) for _ in range(words))
+        data = {
+            "title": f"Policy {i} - Hate Speech",
+            "content": content,
+            "provider": "Bench",
+            "type": "community_guidelines",
+        }
+        if precomputed:
+            data["terms"] = frozenset(tokenize(content))
+        candidates.append({"id": str(i), "score": rng.random() * 0.6, "data": data})
+    return candidates
+
+
+def bench(fn, n: int, words: int, precomputed: bool, repeat: int = 5) -> float:
+    base = make_candidates(n, words, precomputed)
+
+    def run():
+        fn([dict(c) for c in base])
+
+    number = max(1, 2000 // (n * max(1, words // 100)))
+    return min(timeit.repeat(run, number=number, repeat=repeat)) / number * 1e6
+
+
+def main():
+    print(
+        f"{'candidates':>10} {'words':>6} {'legacy µs':>11} {'indexed µs':>11} {'speedup':>8}"
+    )
+    for words in (100, 1000, 5000):
+        for n in (8, 32, 128, 512):
+            legacy = bench(lambda c: legacy_score(c, CLASSIFICATION), n, words, False)
+            indexed = bench(
+                lambda c: retriever._score_and_explain(c, "", CLASSIFICATION),
+                n,
+                words,
+                True,
+            )
+            print(
+                f"{n:>10} {words:>6} {legacy:>11.1f} {indexed:>11.1f} "
+                f"{legacy / indexed:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
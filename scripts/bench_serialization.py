@@ -0,0 +1,133 @@
+"""
+Serialization benchmark for analyze responses.
+
+Times single and batch responses built from synthetic policies through:
+
+    default    FastAPI's response_model path (validate, jsonable_encoder,
+               json.dumps) that the endpoints used before
+    orjson     render(): model_dump + orjson, the full response
+    compact    render() with include_policy_text=false (label, confidence,
+               action and policy IDs)
+
+    DIAL_API_KEY=dummy python scripts/bench_serialization.py
+
+Reports µs per response and the body size. (app.api builds a DIALService on
+import, so the key must be set; no LLM calls are made.)
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+
+from app.api.responses import analysis_projection, render  # noqa: E402
+from app.models.schemas import (  # noqa: E402
+    ActionRecommendation,
+    ActionType,
+    AnalyzeBatchResponse,
+    ConfidenceLevel,
+    DetailedAnalyzeResponse,
+    HateSpeechClassification,
+    PolicySummary,
+    SeverityLevel,
+)
+
+SENTENCE = (
+    "Users may not post content that attacks people based on protected "
+    "characteristics such as race, religion or gender identity. "
+)
+
+
+def make_response(policies: int, policy_words: int) -> DetailedAnalyzeResponse:
+    body = (SENTENCE * (policy_words // len(SENTENCE.split()) + 1)).strip()
+    return DetailedAnalyzeResponse(
+        hate_speech=HateSpeechClassification(
+            classification="Hate",
+            confidence=ConfidenceLevel.HIGH,
+            reason="Dehumanizing language targeting a protected group",
+        ),
+        policies=[
+            PolicySummary(
+                id=f"policy-{i}",
+                source="Meta",
+                summary=f"Hate Speech Policy {i}: {body}\nApplies to the slur used.",
+                relevance_score=87.5 - i,
+            )
+            for i in range(policies)
+        ],
+        reasoning="The text violates the hate speech policies of every platform.",
+        action=ActionRecommendation(
+            action=ActionType.ESCALATE,
+            severity=SeverityLevel.HIGH,
+            reasoning="Escalate due to serious hate speech.",
+        ),
+    )
+
+
+def default_path(model_type, model):
+    """What FastAPI does for a returned model with response_model set."""
+    validated = model_type.model_validate(model.model_dump())
+    return json.dumps(
+        jsonable_encoder(validated),
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def bench(fn, number: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--policies", type=int, default=3)
+    parser.add_argument("--policy-words", type=int, default=300)
+    parser.add_argument("--batch", type=int, default=32)
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+
+    single = make_response(args.policies, args.policy_words)
+    batch = AnalyzeBatchResponse(results=[single] * args.batch)
+    compact = analysis_projection(None, include_policy_text=False)
+    cases = [
+        ("single", DetailedAnalyzeResponse, single, compact),
+        (
+            f"batch x{args.batch}",
+            AnalyzeBatchResponse,
+            batch,
+            {"results": {"__all__": compact}},
+        ),
+    ]
+
+    print(f"{args.policies} policies of ~{args.policy_words} words per response")
+    print(f"{'response':>10} {'path':>8} {'µs':>10} {'bytes':>9} {'speedup':>8}")
+    for name, model_type, model, include in cases:
+        baseline = bench(lambda: default_path(model_type, model), args.number)
+        rows = [
+            ("default", baseline, len(default_path(model_type, model))),
+            (
+                "orjson",
+                bench(lambda: render(model).body, args.number),
+                len(render(model).body),
+            ),
+            (
+                "compact",
+                bench(lambda: render(model, include).body, args.number),
+                len(render(model, include).body),
+            ),
+        ]
+        for path, micros, size in rows:
+            print(
+                f"{name:>10} {path:>8} {micros:>10.1f} {size:>9} "
+                f"{baseline / micros:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
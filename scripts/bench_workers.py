@@ -0,0 +1,174 @@
+"""
+Memory and throughput of the pre-fork server as the worker count grows.
+
+Starts `python -m api.serve` for each worker count (with and, given
+--compare-no-preload, without the preloaded shared model), drives
+GET /policy/search (one query embedding + vector search per request) with
+concurrent clients, and reports per-worker memory and requests per second:
+
+    DIAL_API_KEY=dummy python scripts/bench_workers.py --workers 1 2 4
+
+RSS counts shared model pages in every worker; PSS splits them between the
+processes sharing them, and USS is what each worker holds alone. The server
+runs against a throwaway local vector index, so Qdrant is not needed.
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+QUERIES = [
+    "dehumanizing language about a religious group",
+    "slurs targeting immigrants",
+    "threats of violence against a community",
+    "insulting religious beliefs",
+]
+
+
+def memory_kb(pid: int) -> dict:
+    """Rss, Pss and Private (USS) from /proc/<pid>/smaps_rollup, in kB."""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if parts[0].rstrip(":") in (
+                "Rss",
+                "Pss",
+                "Private_Clean",
+                "Private_Dirty",
+            ):
+                values[parts[0].rstrip(":")] = int(parts[1])
+    return {
+        "rss": values["Rss"],
+        "pss": values["Pss"],
+        "uss": values["Private_Clean"] + values["Private_Dirty"],
+    }
+
+
+def children(pid: int) -> list:
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(p) for p in f.read().split()]
+
+
+def start_server(workers: int, port: int, preload: bool, tmp: str):
+    env = dict(
+        os.environ,
+        VECTOR_BACKEND="local",
+        LOCAL_INDEX_PATH=os.path.join(tmp, "policies.npz"),
+        INDEX_VERSION_STATE_PATH=os.path.join(tmp, "versions.json"),
+        CONTENT_STORE_PATH=os.path.join(tmp, "content.db"),
+        SNAPSHOT_RESTORE_ON_STARTUP="false",
+        POLICY_WATCH_ENABLED="false",
+    )
+    command = [
+        sys.executable,
+        "-m",
+        "api.serve",
+        "--workers",
+        str(workers),
+        "--port",
+        str(port),
+    ]
+    if not preload:
+        command.append("--no-preload")
+    return subprocess.Popen(
+        command,
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+async def wait_ready(url: str, process, timeout: float = 300) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError("Server exited during startup")
+            try:
+                response = await client.get(url, params={"query": "warmup"})
+                if response.status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.5)
+    raise TimeoutError("Server did not become ready")
+
+
+async def load(url: str, concurrency: int, seconds: float) -> tuple:
+    done = errors = 0
+    deadline = time.monotonic() + seconds
+
+    async def client_loop(client, offset):
+        nonlocal done, errors
+        i = offset
+        while time.monotonic() < deadline:
+            response = await client.get(
+                url, params={"query": QUERIES[i % len(QUERIES)]}
+            )
+            if response.status_code == 200:
+                done += 1
+            else:
+                errors += 1
+            i += 1
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+        await asyncio.gather(*(client_loop(client, i) for i in range(concurrency)))
+    return done / seconds, errors
+
+
+async def run(args):
+    print(
+        f"{'workers':>7} {'preload':>7} {'RSS MB':>8} {'PSS MB':>8} {'USS MB':>8} "
+        f"{'total PSS':>9} {'req/s':>8}"
+    )
+    modes = [True, False] if args.compare_no_preload else [True]
+    for workers in args.workers:
+        for preload in modes:
+            with tempfile.TemporaryDirectory() as tmp:
+                process = start_server(workers, args.port, preload, tmp)
+                url = f"http://127.0.0.1:{args.port}/policy/search"
+                try:
+                    await wait_ready(url, process)
+                    # Every worker loads its lazy state before measuring
+                    await load(url, args.concurrency, 2)
+                    rps, errors = await load(url, args.concurrency, args.seconds)
+                    usage = [memory_kb(pid) for pid in children(process.pid)]
+                finally:
+                    process.terminate()
+                    process.wait(timeout=30)
+
+            mean = {k: sum(u[k] for u in usage) / len(usage) / 1024 for k in usage[0]}
+            total_pss = sum(u["pss"] for u in usage) / 1024
+            print(
+                f"{workers:>7} {str(preload):>7} {mean['rss']:>8.0f} {mean['pss']:>8.0f} "
+                f"{mean['uss']:>8.0f} {total_pss:>9.0f} {rps:>8.1f}"
+                + (f"  ({errors} errors)" if errors else "")
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument(
+        "--compare-no-preload",
+        action="store_true",
+        help="also run each worker count with per-worker model loading",
+    )
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+import asyncio
+
+import httpx
+import pytest
+from app.models.schemas import (
+    ActionRecommendation,
+    ActionType,
+    ConfidenceLevel,
+    DetailedAnalyzeResponse,
+    HateSpeechClassification,
+    SeverityLevel,
+)
+from app.services.admission import AdmissionController
+from app.services.metrics import metrics
+from app.services.scheduler import Lane
+from app.utils.exceptions import OverloadedError
+from fastapi import FastAPI
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+async def hold(controller, release: asyncio.Event):
+    async with controller.admit():
+        await release.wait()
+
+
+async def admitted(controller):
+    while controller.in_flight == 0:
+        await asyncio.sleep(0.001)
+
+
+@pytest.mark.asyncio
+async def test_requests_queue_then_get_shed_when_queue_is_full():
+    controller = AdmissionController("test", 1, 1, queue_timeout=5)
+    release = asyncio.Event()
+    running = asyncio.create_task(hold(controller, release))
+    waiting = asyncio.create_task(hold(controller, release))
+    await asyncio.sleep(0)
+
+    assert (controller.in_flight, controller.queued) == (1, 1)
+    with pytest.raises(OverloadedError) as rejected:
+        async with controller.admit():
+            pass
+    assert rejected.value.retry_after >= 1
+
+    release.set()
+    await asyncio.gather(running, waiting)
+    gauges = metrics.snapshot()["gauges"]
+    assert gauges["admission.test.in_flight"] == 0
+    assert gauges["admission.test.queued"] == 0
+    assert metrics.snapshot()["counters"]["admission.test.rejected.queue_full"] == 1
+
+
+@pytest.mark.asyncio
+async def test_queued_request_is_shed_after_queue_timeout():
+    controller = AdmissionController("test", 1, 4, queue_timeout=0.01)
+    release = asyncio.Event()
+    running = asyncio.create_task(hold(controller, release))
+    await asyncio.sleep(0)
+
+    with pytest.raises(OverloadedError):
+        async with controller.admit():
+            pass
+
+    assert controller.queued == 0
+    assert metrics.snapshot()["counters"]["admission.test.rejected.queue_timeout"] == 1
+    release.set()
+    await running
+
+
+@pytest.mark.asyncio
+async def test_interactive_is_admitted_while_bulk_saturates():
+    controller = AdmissionController("test", 2, 1, queue_timeout=5, reserved=1)
+    release = asyncio.Event()
+
+    async def hold_bulk():
+        async with controller.admit(Lane.BULK):
+            await release.wait()
+
+    bulk = [asyncio.create_task(hold_bulk()) for _ in range(2)]
+    await asyncio.sleep(0)
+    assert (controller.in_flight, controller.queued) == (1, 1)
+    with pytest.raises(OverloadedError):
+        async with controller.admit(Lane.BULK):
+            pass
+
+    async with controller.admit(Lane.INTERACTIVE):
+        assert controller.in_flight == 2
+
+    release.set()
+    await asyncio.gather(*bulk)
+    assert controller.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_analyze_returns_429_with_retry_after_when_saturated(mocker):
+    from app.api import routes
+
+    controller = AdmissionController("analyze", 1, 0, queue_timeout=1)
+    mocker.patch.object(routes, "analysis_admission", controller)
+    release = asyncio.Event()
+
+    async def blocked(*args):
+        await release.wait()
+        return DetailedAnalyzeResponse(
+            hate_speech=HateSpeechClassification(
+                classification="Neutral", confidence=ConfidenceLevel.HIGH, reason="-"
+            ),
+            policies=[],
+            reasoning="-",
+            action=ActionRecommendation(
+                action=ActionType.ALLOW, severity=SeverityLevel.NONE, reasoning="-"
+            ),
+        )
+
+    mocker.patch.object(routes.orchestrator, "run", side_effect=blocked)
+    app = FastAPI()
+    app.include_router(routes.router)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        first = asyncio.create_task(
+            client.post("/api/v1/analyze", json={"text": "hello there"})
+        )
+        await asyncio.wait_for(admitted(controller), timeout=1)
+
+        shed = await client.post("/api/v1/analyze", json={"text": "hello again"})
+        release.set()
+        response = await asyncio.wait_for(first, timeout=1)
+
+    assert response.status_code == 200
+    assert shed.status_code == 429
+    assert int(shed.headers["Retry-After"]) >= 1
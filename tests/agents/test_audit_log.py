@@ -0,0 +1,115 @@
+import asyncio
+from datetime import date
+
+import pytest
+from app.models.schemas import (
+    ActionRecommendation,
+    ActionType,
+    ConfidenceLevel,
+    DetailedAnalyzeResponse,
+    HateSpeechClassification,
+    PolicySummary,
+    SeverityLevel,
+)
+from app.services.audit_log import AuditLog
+from app.services.history_store import HistoryStore
+from app.services.metrics import metrics
+
+RESPONSE = DetailedAnalyzeResponse(
+    hate_speech=HateSpeechClassification(
+        classification="Toxic", confidence=ConfidenceLevel.MEDIUM, reason="Insult"
+    ),
+    policies=[
+        PolicySummary(id="p1", source="Reddit", summary="...", relevance_score=80.0),
+        PolicySummary(source="Meta", summary="...", relevance_score=70.0),
+    ],
+    reasoning="Targets an individual.",
+    action=ActionRecommendation(
+        action=ActionType.WARN, severity=SeverityLevel.MEDIUM, reasoning="Warn."
+    ),
+)
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def rows(log: AuditLog) -> list:
+    return (
+        log.store._connection()
+        .execute(
+            "SELECT input_text, classification, policy_match, moderation_action "
+            "FROM classification_log ORDER BY id"
+        )
+        .fetchall()
+    )
+
+
+def test_record_is_a_no_op_until_started(tmp_path):
+    log = AuditLog(str(tmp_path / "audit.db"))
+    log.record("hello", RESPONSE)
+    assert log.store is None
+
+
+@pytest.mark.asyncio
+async def test_full_batches_are_flushed_without_waiting_for_the_interval(tmp_path):
+    log = AuditLog(str(tmp_path / "audit.db"), batch_size=2, flush_interval=60)
+    log.start()
+    log.record("you are an idiot", RESPONSE)
+    log.record("so dumb", RESPONSE)
+    for _ in range(100):
+        if log.store.count() == 2:
+            break
+        await asyncio.sleep(0.01)
+
+    assert rows(log)[0] == ("you are an idiot", "Toxic", "p1,Meta", "WARN")
+    await log.stop()
+
+
+@pytest.mark.asyncio
+async def test_stop_writes_everything_still_queued(tmp_path):
+    log = AuditLog(str(tmp_path / "audit.db"), batch_size=100, flush_interval=60)
+    log.start()
+    for i in range(5):
+        log.record(f"message {i}", RESPONSE)
+    await asyncio.sleep(0)
+
+    await log.stop()
+
+    assert log.store.count() == 5
+    assert metrics.snapshot()["counters"]["audit_log.written"] == 5
+
+
+@pytest.mark.asyncio
+async def test_entries_are_dropped_when_the_queue_is_full(tmp_path):
+    log = AuditLog(str(tmp_path / "audit.db"), max_queue=1, flush_interval=60)
+    log.start()
+    for i in range(3):
+        log.record(f"message {i}", RESPONSE)
+
+    assert metrics.snapshot()["counters"]["audit_log.dropped"] == 2
+    await log.stop()
+
+
+@pytest.mark.asyncio
+async def test_batches_are_also_written_to_the_history(tmp_path):
+    log = AuditLog(str(tmp_path / "audit.db"), history_path=str(tmp_path / "h"))
+    log.start()
+    log.record("so dumb", RESPONSE, latency_ms=120.0)
+    await log.stop()
+
+    history = HistoryStore(str(tmp_path / "h"))
+    day = (
+        log.store._connection()
+        .execute("SELECT date(timestamp) FROM classification_log")
+        .fetchone()[0]
+    )
+    start = end = date.fromisoformat(day)
+    assert history.distribution("label", start, end) == [
+        {"bucket": f"{day}T00:00:00+00:00", "label": "toxic", "count": 1}
+    ]
+    assert history.provider_hits(start, end)["providers"][0]["hit_rate"] == 1.0
+    assert history.latency(start, end)[0]["p50_ms"] == pytest.approx(120.0)
@@ -0,0 +1,96 @@
+from app.services.bm25 import (
+    BM25Index,
+    reciprocal_rank_fusion,
+    sparse_query,
+    sparse_terms,
+    tokenize,
+)
+
+
+def build_index() -> BM25Index:
+    index = BM25Index()
+    index.add("1", "Slurs and epithets are prohibited", {"title": "Slurs"})
+    index.add("2", "Threats of violence are prohibited", {"title": "Threats"})
+    index.add("3", "Spam and scams are removed", {"title": "Spam"})
+    return index
+
+
+def test_tokenize_drops_stopwords_and_case():
+    assert tokenize("The Slurs and THE epithets") == ["slurs", "epithets"]
+
+
+def test_search_ranks_matching_documents():
+    results = build_index().search("epithets slurs", limit=2)
+
+    assert [r["id"] for r in results] == ["1"]
+    assert results[0]["data"] == {"title": "Slurs"}
+
+
+def test_rare_terms_outscore_common_ones():
+    results = build_index().search("prohibited violence")
+
+    assert results[0]["id"] == "2"
+    assert {r["id"] for r in results} == {"1", "2"}
+
+
+def test_remove_and_readd_update_postings():
+    index = build_index()
+    index.remove(["1"])
+    assert index.search("slurs") == []
+
+    index.add("2", "Slurs now live here", {})
+    assert [r["id"] for r in index.search("slurs")] == ["2"]
+    assert index.search("violence") == []
+
+
+def test_save_and_load_roundtrip(tmp_path):
+    path = str(tmp_path / "bm25.json")
+    original = build_index()
+    original.save(path)
+
+    loaded = BM25Index.load(path)
+
+    assert len(loaded) == 3
+    assert loaded.search("scams") == original.search("scams")
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    dense = [
+        {"id": "a", "score": 0.9, "data": {}},
+        {"id": "b", "score": 0.8, "data": {}},
+    ]
+    sparse = [
+        {"id": "c", "score": 7.0, "data": {}},
+        {"id": "b", "score": 5.0, "data": {}},
+    ]
+
+    fused = reciprocal_rank_fusion([dense, sparse], k=60)
+
+    assert fused[0]["id"] == "b"
+    assert {f["id"] for f in fused} == {"a", "b", "c"}
+    assert fused[0]["source_scores"] == [0.8, 5.0]
+    assert all(0 < f["fused"] <= 1 for f in fused)
+    # Scores stay dense similarities; "c" was not found by the dense search
+    assert [f["score"] for f in fused] == [0.8, 0.9, 0.8]
+
+
+def test_search_respects_payload_filters():
+    index = BM25Index()
+    index.add("1", "Hate speech is prohibited", {"provider": "Meta"})
+    index.add("2", "Hate speech is removed", {"provider": "Reddit"})
+
+    results = index.search("hate speech", filters={"provider": ["Reddit"]})
+
+    assert [r["id"] for r in results] == ["2"]
+
+
+def test_sparse_terms_saturate_term_frequency():
+    ids, weights = sparse_terms("slurs slurs slurs threats")
+    query_ids, query_weights = sparse_query("Slurs and slurs")
+
+    assert ids == sorted(ids) and len(ids) == 2
+    by_id = dict(zip(ids, weights))
+    assert query_ids == [i for i in ids if by_id[i] == max(weights)]
+    assert query_weights == [1.0]
+    # Three occurrences weigh more than one, but far less than three times
+    assert 1 < max(weights) / min(weights) < 3
@@ -0,0 +1,42 @@
+from app.services.chunker import chunk_policy_text
+
+SAMPLE = """Sample Policy - Hate Speech
+
+Intro paragraph describing the policy.
+
+Prohibited Content:
+- Slurs against protected groups
+- Dehumanizing language
+
+Platform-Specific Policies:
+
+Ads:
+- No hateful ads
+"""
+
+
+def test_chunks_split_on_headings():
+    chunks = chunk_policy_text(SAMPLE)
+
+    assert [c.section for c in chunks] == [
+        "Sample Policy - Hate Speech",
+        "Prohibited Content",
+        "Platform-Specific Policies > Ads",
+    ]
+    assert chunks[1].text.startswith("Prohibited Content:\n- Slurs")
+    assert [c.chunk_index for c in chunks] == [0, 1, 2]
+
+
+def test_long_sections_are_windowed_with_overlap():
+    lines = "\n".join(f"- rule number {i} applies here" for i in range(10))
+    chunks = chunk_policy_text(f"Rules:\n{lines}", max_words=15, overlap_words=5)
+
+    assert len(chunks) > 1
+    assert all(c.section == "Rules" for c in chunks)
+    # The last line of each window is repeated at the start of the next one
+    for prev, nxt in zip(chunks, chunks[1:]):
+        assert prev.text.splitlines()[-1] == nxt.text.splitlines()[1]
+
+
+def test_empty_text_returns_no_chunks():
+    assert chunk_policy_text("   \n\n") == []
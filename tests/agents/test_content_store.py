@@ -0,0 +1,35 @@
+import pytest
+from app.services import content_store
+from app.services.content_store import ContentStore, fetch_contents
+
+
+def test_put_get_and_delete(tmp_path):
+    store = ContentStore(str(tmp_path / "content.db"))
+    store.put_many({"a": "Rules:\n- no slurs", "b": "Enforcement:\n- bans"})
+    store.put_many({"a": "Rules:\n- no slurs or threats"})
+
+    assert store.get_many(["a", "b", "missing"]) == {
+        "a": "Rules:\n- no slurs or threats",
+        "b": "Enforcement:\n- bans",
+    }
+
+    store.delete(["a"])
+    assert store.get_many(["a", "b"]) == {"b": "Enforcement:\n- bans"}
+
+
+@pytest.mark.asyncio
+async def test_fetch_contents_backfills_from_vector_store(mocker, tmp_path):
+    store = ContentStore(str(tmp_path / "content.db"))
+    store.put_many({"a": "cached"})
+    mocker.patch.object(content_store, "get_content_store", return_value=store)
+    retrieve = mocker.patch.object(
+        content_store,
+        "retrieve",
+        return_value=[{"id": "b", "data": {"content": "from payload"}}],
+    )
+
+    contents = await fetch_contents(["a", "b"])
+
+    assert contents == {"a": "cached", "b": "from payload"}
+    retrieve.assert_awaited_once_with(["b"], fields=["content"])
+    assert store.get_many(["b"]) == {"b": "from payload"}
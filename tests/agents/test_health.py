@@ -0,0 +1,55 @@
+import pytest
+from app.services import health
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(mocker):
+    mocker.patch.object(health, "_state", "starting")
+    mocker.patch.object(health, "_warmup", {})
+    mocker.patch.object(health.settings, "WARMUP_ENABLED", True)
+    mocker.patch.object(health.settings, "LLM_PING_ENABLED", False)
+    mocker.patch.object(health, "get_reranker", return_value=None)
+    embedding_service = mocker.Mock(dimension=4)
+    mocker.patch.object(health, "get_embedding_service", return_value=embedding_service)
+    return embedding_service
+
+
+@pytest.mark.asyncio
+async def test_warm_up_primes_the_model_and_store_then_reports_ready(
+    mocker, fresh_state
+):
+    search = mocker.patch.object(health.qdrant_client, "search", return_value=[])
+
+    assert await health.warm_up() is True
+
+    fresh_state.embed_text.assert_called_once_with(health.WARMUP_TEXT)
+    search.assert_awaited_once_with([1.0, 0.0, 0.0, 0.0], limit=1)
+    assert health.readiness_state() == "ready"
+    report = health.warmup_report()
+    assert report["vector_store"]["status"] == "up"
+    assert report["llm"] == {"status": "skipped"}
+
+
+@pytest.mark.asyncio
+async def test_warm_up_fails_when_the_vector_store_is_down(mocker):
+    mocker.patch.object(
+        health.qdrant_client, "search", side_effect=ConnectionError("refused")
+    )
+
+    assert await health.warm_up() is False
+    assert health.readiness_state() == "failed"
+    assert health.warmup_report()["vector_store"]["error"] == "refused"
+
+
+@pytest.mark.asyncio
+async def test_health_is_degraded_when_only_the_llm_is_down(mocker):
+    mocker.patch.object(health.settings, "LLM_PING_ENABLED", True)
+    mocker.patch.object(health.qdrant_client, "search", return_value=[])
+    llm_service = mocker.Mock()
+    llm_service.ping = mocker.AsyncMock(side_effect=RuntimeError("timeout"))
+
+    report = await health.check_health(llm_service)
+
+    assert report["status"] == "degraded"
+    assert report["dependencies"]["llm"]["status"] == "down"
+    assert "latency_ms" in report["dependencies"]["embedding"]
@@ -0,0 +1,97 @@
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from app.models.history import ClassificationLog
+from app.services.history_store import HistoryStore
+
+DAY = date(2026, 10, 19)
+
+
+def entry(label: str, hour: int, latency_ms: float, providers=("Reddit",), day=DAY):
+    return ClassificationLog(
+        input_text="...",
+        classification=label,
+        policy_match="p1",
+        moderation_action="WARN" if label == "Toxic" else "REMOVE",
+        timestamp=datetime(day.year, day.month, day.day, hour, tzinfo=timezone.utc),
+        confidence="HIGH",
+        severity="MEDIUM",
+        providers=list(providers),
+        latency_ms=latency_ms,
+    )
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = HistoryStore(str(tmp_path / "history"))
+    store.append(
+        [entry("Hate", 1, 100.0, ("Reddit", "Meta")), entry("Toxic", 1, 200.0)]
+    )
+    store.append(
+        [entry("Hate", 2, 300.0, ()), entry("Hate", 1, 50.0, day=DAY - timedelta(1))]
+    )
+    return store
+
+
+def test_files_are_partitioned_by_date_and_label(store):
+    partitions = sorted(
+        p.relative_to(store.path).as_posix() for p in store.path.glob("*/*")
+    )
+    assert partitions == [
+        "date=2026-10-18/label=hate",
+        "date=2026-10-19/label=hate",
+        "date=2026-10-19/label=toxic",
+    ]
+
+
+def test_distribution_counts_per_bucket_within_the_date_range(store):
+    assert store.distribution("label", DAY, DAY, "hour") == [
+        {"bucket": "2026-10-19T01:00:00+00:00", "label": "hate", "count": 1},
+        {"bucket": "2026-10-19T01:00:00+00:00", "label": "toxic", "count": 1},
+        {"bucket": "2026-10-19T02:00:00+00:00", "label": "hate", "count": 1},
+    ]
+
+
+def test_label_filter_and_action_breakdown(store):
+    result = store.distribution("action", DAY - timedelta(1), DAY, labels=["Hate"])
+    assert [(r["bucket"][:10], r["action"], r["count"]) for r in result] == [
+        ("2026-10-18", "REMOVE", 1),
+        ("2026-10-19", "REMOVE", 2),
+    ]
+
+
+def test_provider_hit_rates(store):
+    hits = store.provider_hits(DAY, DAY)
+    assert hits["analyses"] == 3
+    assert hits["providers"] == [
+        {"provider": "Reddit", "hits": 2, "hit_rate": 0.6667},
+        {"provider": "Meta", "hits": 1, "hit_rate": 0.3333},
+    ]
+
+
+def test_latency_percentiles_per_bucket(store):
+    (day,) = store.latency(DAY, DAY)
+    assert day["count"] == 3
+    assert day["mean_ms"] == pytest.approx(200.0)
+    assert day["p50_ms"] == pytest.approx(200.0)
+    assert day["p99_ms"] == pytest.approx(300.0)
+
+
+def test_compaction_keeps_every_row(store):
+    store.append([entry("Hate", 3, 10.0)])
+    assert store.compact(before=DAY + timedelta(1)) == 2
+    partition = store.path / "date=2026-10-19/label=hate"
+    assert len(list(partition.glob("*.parquet"))) == 1
+    assert sum(r["count"] for r in store.distribution("label", DAY, DAY)) == 4
+
+
+def test_compaction_leaves_the_current_day_alone(store):
+    assert store.compact(before=DAY) == 0
+    assert len(list(store.path.glob("date=2026-10-19/label=hate/*.parquet"))) == 2
+
+
+def test_queries_on_an_empty_store(tmp_path):
+    store = HistoryStore(str(tmp_path / "missing"))
+    assert store.distribution("label", DAY, DAY) == []
+    assert store.provider_hits(DAY, DAY) == {"analyses": 0, "providers": []}
+    assert store.latency(DAY, DAY) == []
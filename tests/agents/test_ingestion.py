@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+from app.models.policies import PolicyMetadata
+from app.services.bm25 import BM25Index
+from app.services.ingestion import IngestionPipeline
+
+
+def make_policy(name: str, sections: int = 2) -> PolicyMetadata:
+    content = "\n\n".join(
+        f"Section {i}:\n- rule {i} for {name}" for i in range(sections)
+    )
+    return PolicyMetadata(
+        filename=f"{name}.txt",
+        provider="Test",
+        policy_type="community_guidelines",
+        title=f"{name} policy",
+        content=content,
+        word_count=len(content.split()),
+    )
+
+
+@pytest.fixture
+def embedder(mocker):
+    service = mocker.Mock()
+    service.embed_batch.side_effect = lambda texts: [[0.1, 0.2] for _ in texts]
+    mocker.patch("app.services.ingestion.get_embedding_service", return_value=service)
+    mocker.patch("app.services.ingestion.get_bm25_index", return_value=BM25Index())
+    mocker.patch("app.services.ingestion.save_bm25_index")
+    mocker.patch("app.services.ingestion.get_content_store")
+    return service
+
+
+@pytest.mark.asyncio
+async def test_run_batches_chunks_and_reports_throughput(mocker, embedder):
+    upsert = mocker.patch("app.services.ingestion.upsert", new=mocker.AsyncMock())
+
+    pipeline = IngestionPipeline(batch_size=3, concurrency=2, max_retries=0)
+    report = await pipeline.run([make_policy("a"), make_policy("b"), make_policy("c")])
+
+    assert report.documents == 3
+    assert report.chunks == 6
+    assert report.batches == 2
+    assert upsert.await_count == 2
+    assert embedder.embed_batch.call_count == 2
+    assert set(report.stored) == {"a.txt", "b.txt", "c.txt"}
+    assert report.docs_per_second > 0
+
+
+@pytest.mark.asyncio
+async def test_run_bounds_concurrent_batches(mocker, embedder):
+    in_flight, peak = 0, 0
+
+    async def slow_upsert(ids, vectors, payloads):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+
+    mocker.patch("app.services.ingestion.upsert", new=slow_upsert)
+
+    pipeline = IngestionPipeline(batch_size=1, concurrency=2, max_retries=0)
+    report = await pipeline.run([make_policy(str(i)) for i in range(5)])
+
+    assert report.batches == 10
+    assert peak <= 2
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_is_retried_then_reported(mocker, embedder):
+    upsert = mocker.patch(
+        "app.services.ingestion.upsert",
+        new=mocker.AsyncMock(
+            side_effect=[
+                RuntimeError("boom"),
+                None,
+                RuntimeError("down"),
+                RuntimeError("down"),
+            ]
+        ),
+    )
+
+    pipeline = IngestionPipeline(
+        batch_size=2, concurrency=1, max_retries=1, retry_backoff=0
+    )
+    report = await pipeline.run([make_policy("a"), make_policy("b")])
+
+    assert upsert.await_count == 4
+    assert report.chunks == 2
+    assert report.failed_batches == 1
+    assert report.failed_chunks == 2
+    assert report.errors == ["down"]
@@ -0,0 +1,70 @@
+import pytest
+from app.services.limiter import AIMDLimiter
+from app.services.metrics import metrics
+from app.services.scheduler import Lane, LaneScheduler
+
+WEIGHTS = {Lane.INTERACTIVE: 1, Lane.BULK: 1}
+
+
+class RateLimited(Exception):
+    pass
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def make_limiter(capacity=4, floor=1, ceiling=8):
+    scheduler = LaneScheduler("test", capacity, reserved=0, weights=WEIGHTS)
+    limiter = AIMDLimiter(
+        scheduler,
+        floor=floor,
+        ceiling=ceiling,
+        is_overload=lambda e: isinstance(e, RateLimited),
+    )
+    return scheduler, limiter
+
+
+def test_healthy_calls_raise_the_limit_up_to_the_ceiling():
+    scheduler, limiter = make_limiter()
+    for _ in range(5):
+        limiter._on_success(0.1)
+    assert scheduler.capacity == 5
+
+    for _ in range(100):
+        limiter._on_success(0.1)
+    assert scheduler.capacity == 8
+    assert metrics.snapshot()["gauges"]["scheduler.test.limit"] == 8
+
+
+def test_overload_error_halves_the_limit_once_per_round_trip():
+    scheduler, limiter = make_limiter(capacity=8)
+    limiter._on_success(10.0)
+
+    for _ in range(3):
+        with pytest.raises(RateLimited):
+            with limiter.track():
+                raise RateLimited()
+
+    assert scheduler.capacity == 4
+    assert metrics.snapshot()["counters"]["scheduler.test.limit_decrease.overload"] == 1
+
+
+def test_other_errors_leave_the_limit_alone():
+    scheduler, limiter = make_limiter(capacity=8)
+    with pytest.raises(ValueError):
+        with limiter.track():
+            raise ValueError("bad json")
+    assert scheduler.capacity == 8
+
+
+def test_latency_spike_backs_off_but_not_below_the_floor():
+    scheduler, limiter = make_limiter(capacity=2, floor=2)
+    limiter._on_success(0.01)
+    limiter._on_success(1.0)
+
+    assert scheduler.capacity == 2
+    assert "scheduler.test.limit_decrease.latency" in metrics.snapshot()["counters"]
@@ -0,0 +1,140 @@
+import pytest
+from app.services import local_index
+from app.services.local_index import LocalVectorStore
+
+
+@pytest.mark.asyncio
+async def test_add_and_search_returns_nearest_first(tmp_path):
+    store = LocalVectorStore(str(tmp_path / "index.npz"))
+    await store.init_collection(3)
+    await store.add(
+        ["a", "b", "c"],
+        [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.7, 0.7, 0.0]],
+        [{"title": "A"}, {"title": "B"}, {"title": "C"}],
+    )
+
+    results = await store.search([1.0, 0.1, 0.0], limit=2)
+
+    assert [r["id"] for r in results] == ["a", "c"]
+    assert results[0]["data"] == {"title": "A"}
+    assert results[0]["score"] == pytest.approx(0.995, abs=1e-3)
+
+
+@pytest.mark.asyncio
+async def test_search_batch_preserves_query_order(tmp_path):
+    store = LocalVectorStore(str(tmp_path / "index.npz"))
+    await store.add(["a", "b"], [[1.0, 0.0], [0.0, 1.0]], [{}, {}])
+
+    results = await store.search_batch([[0.0, 1.0], [1.0, 0.0]], limit=1)
+
+    assert [r[0]["id"] for r in results] == ["b", "a"]
+
+
+@pytest.mark.asyncio
+async def test_add_overwrites_existing_id_and_persists(tmp_path):
+    path = str(tmp_path / "index.npz")
+    store = LocalVectorStore(path)
+    await store.add(["a"], [[1.0, 0.0]], [{"v": 1}])
+    await store.add(["a"], [[0.0, 1.0]], [{"v": 2}])
+    await store.flush()
+
+    reloaded = LocalVectorStore(path)
+    results = await reloaded.search([0.0, 1.0], limit=5)
+
+    assert len(results) == 1
+    assert results[0]["data"] == {"v": 2}
+
+
+@pytest.mark.asyncio
+async def test_writes_are_saved_off_the_event_loop(tmp_path, mocker):
+    path = tmp_path / "index.npz"
+    store = LocalVectorStore(str(path))
+    to_thread = mocker.spy(local_index.asyncio, "to_thread")
+
+    for i in range(10):
+        await store.add([str(i)], [[1.0, float(i)]], [{}])
+    assert not path.exists()
+    await store.close()
+
+    # Batches added while a save was running are coalesced into the next one
+    assert 1 <= to_thread.call_count < 10
+    assert await LocalVectorStore(str(path)).count() == 10
+
+
+@pytest.mark.asyncio
+async def test_search_on_empty_index_returns_no_results(tmp_path):
+    store = LocalVectorStore(str(tmp_path / "index.npz"))
+    assert await store.search([1.0, 0.0]) == []
+
+
+@pytest.mark.asyncio
+async def test_init_collection_rejects_dimension_mismatch(tmp_path):
+    store = LocalVectorStore(str(tmp_path / "index.npz"))
+    await store.add(["a"], [[1.0, 0.0]], [{}])
+
+    with pytest.raises(ValueError):
+        await store.init_collection(3)
+
+
+@pytest.mark.asyncio
+async def test_delete_removes_points(tmp_path):
+    path = str(tmp_path / "index.npz")
+    store = LocalVectorStore(path)
+    await store.add(["a", "b"], [[1.0, 0.0], [0.0, 1.0]], [{}, {}])
+
+    await store.delete(["a", "missing"])
+    await store.flush()
+
+    results = await LocalVectorStore(path).search([1.0, 0.0], limit=5)
+    assert [r["id"] for r in results] == ["b"]
+
+
+@pytest.mark.asyncio
+async def test_search_applies_filters_and_boosts(tmp_path):
+    store = LocalVectorStore(str(tmp_path / "index.npz"))
+    await store.add(
+        ["a", "b", "c"],
+        [[1.0, 0.0], [0.9, 0.1], [0.8, 0.2]],
+        [
+            {"provider": "Meta", "type": "platform_policy"},
+            {"provider": "Reddit", "type": "platform_policy"},
+            {"provider": "Reddit", "type": "legal_framework"},
+        ],
+    )
+
+    filtered = await store.search([1.0, 0.0], limit=3, filters={"provider": ["Reddit"]})
+    boosted = await store.search(
+        [1.0, 0.0], limit=1, boosts={"type": {"legal_framework": 0.2}}
+    )
+    none_left = await store.search([1.0, 0.0], filters={"provider": ["YouTube"]})
+
+    assert [r["id"] for r in filtered] == ["b", "c"]
+    assert boosted[0]["id"] == "c"
+    assert none_left == []
+
+
+@pytest.mark.asyncio
+async def test_search_batch_applies_boosts_per_query(tmp_path):
+    store = LocalVectorStore(str(tmp_path / "index.npz"))
+    await store.add(
+        ["a", "b"],
+        [[1.0, 0.0], [0.9, 0.1]],
+        [{"type": "platform_policy"}, {"type": "legal_framework"}],
+    )
+
+    results = await store.search_batch(
+        [[1.0, 0.0], [1.0, 0.0]],
+        limit=1,
+        boosts=[None, {"type": {"legal_framework": 0.2}}],
+    )
+
+    assert [r[0]["id"] for r in results] == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_hybrid_search_is_refused_with_a_clear_error(tmp_path):
+    store = LocalVectorStore(str(tmp_path / "index.npz"))
+
+    assert not store.supports_hybrid
+    with pytest.raises(NotImplementedError, match="HYBRID_FUSION=client"):
+        await store.hybrid_search_batch([[1.0, 0.0]], [([1], [1.0])])
@@ -0,0 +1,96 @@
+import pytest
+from app.services.bm25 import BM25Index
+from app.services.content_store import ContentStore
+from app.services.local_index import LocalVectorStore
+from app.services.policy_loader import PolicyDocumentLoader
+
+
+@pytest.fixture
+def env(mocker, tmp_path):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    store = LocalVectorStore(str(tmp_path / "index.npz"))
+
+    embedder = mocker.Mock(dimension=2)
+    embedder.embed_batch.side_effect = lambda texts: [[1.0, 0.5] for _ in texts]
+    for target in (
+        "app.services.policy_loader.get_embedding_service",
+        "app.services.ingestion.get_embedding_service",
+        "app.services.qdrant_client.get_embedding_service",
+    ):
+        mocker.patch(target, return_value=embedder)
+    mocker.patch("app.services.qdrant_client.get_vector_store", return_value=store)
+    bm25 = BM25Index()
+    contents = ContentStore(str(tmp_path / "content.db"))
+    for module in ("ingestion", "policy_loader"):
+        mocker.patch(f"app.services.{module}.get_bm25_index", return_value=bm25)
+        mocker.patch(f"app.services.{module}.save_bm25_index")
+        mocker.patch(f"app.services.{module}.get_content_store", return_value=contents)
+    mocker.patch(
+        "app.services.policy_loader.settings.INDEX_MANIFEST_PATH",
+        str(tmp_path / "manifest.json"),
+    )
+    return docs, store, embedder, bm25, contents
+
+
+async def sync(docs, full: bool = False):
+    loader = PolicyDocumentLoader(str(docs))
+    return await loader.sync_policies_in_vector_db(
+        loader.load_all_policies(), full=full
+    )
+
+
+@pytest.mark.asyncio
+async def test_sync_is_incremental_and_idempotent(env):
+    docs, store, embedder, bm25, contents = env
+    (docs / "a.txt").write_text("Rules:\n- no slurs\n\nEnforcement:\n- bans")
+    (docs / "b.txt").write_text("Rules:\n- no threats")
+
+    first = await sync(docs)
+    assert sorted(first.added) == ["a.txt", "b.txt"]
+    assert first.upserted_chunks == 3
+    assert len(store._ids) == 3
+    first_ids = list(store._ids)
+
+    embedder.embed_batch.reset_mock()
+    second = await sync(docs)
+    assert sorted(second.unchanged) == ["a.txt", "b.txt"]
+    assert second.upserted_chunks == 0
+    embedder.embed_batch.assert_not_called()
+    assert len(store._ids) == 3
+
+    # Editing one section only re-embeds that section; removing a file deletes it
+    (docs / "a.txt").write_text("Rules:\n- no slurs\n\nEnforcement:\n- permanent bans")
+    (docs / "b.txt").unlink()
+    third = await sync(docs)
+    assert third.updated == ["a.txt"]
+    assert third.removed == ["b.txt"]
+    assert third.upserted_chunks == 1
+    assert third.deleted_chunks == 2
+    assert sorted(p["parent_id"] for p in store._payloads) == ["a.txt", "a.txt"]
+    assert set(bm25.doc_tfs) == set(store._ids)
+    assert bm25.search("permanent")[0]["data"]["parent_id"] == "a.txt"
+    assert bm25.search("threats") == []
+    assert set(contents.get_many(store._ids)) == set(store._ids)
+    assert contents.get_many(first_ids).keys() <= set(store._ids)
+
+
+@pytest.mark.asyncio
+async def test_full_sync_re_embeds_everything_and_leaves_no_orphans(env):
+    docs, store, embedder, bm25, contents = env
+    (docs / "a.txt").write_text("Rules:\n- no slurs\n\nEnforcement:\n- bans")
+    (docs / "b.txt").write_text("Rules:\n- no threats")
+    await sync(docs)
+
+    (docs / "a.txt").write_text("Rules:\n- no slurs\n\nEnforcement:\n- permanent bans")
+    (docs / "b.txt").unlink()
+    embedder.embed_batch.reset_mock()
+    report = await sync(docs, full=True)
+
+    assert report.removed == ["b.txt"]
+    assert report.upserted_chunks == 2
+    assert report.deleted_chunks == 2
+    assert sum(len(c.args[0]) for c in embedder.embed_batch.call_args_list) == 2
+    assert sorted(p["parent_id"] for p in store._payloads) == ["a.txt", "a.txt"]
+    assert set(bm25.doc_tfs) == set(store._ids)
+    assert bm25.search("threats") == []
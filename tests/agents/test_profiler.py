@@ -0,0 +1,52 @@
+import asyncio
+import time
+
+import pytest
+from app.services import profiler
+
+
+@pytest.fixture(autouse=True)
+def profile_dir(mocker, tmp_path):
+    mocker.patch.object(profiler.settings, "PROFILE_DIR", str(tmp_path))
+    mocker.patch.object(profiler.settings, "PROFILING_INTERVAL_MS", 1)
+    mocker.patch.object(profiler.settings, "PROFILE_MAX_FILES", 2)
+    return tmp_path
+
+
+def busy_classify(seconds: float) -> None:
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+async def fake_run():
+    with profiler.stage("classify"):
+        busy_classify(0.05)
+    with profiler.stage("reason"):
+        await asyncio.sleep(0.01)
+    return "done"
+
+
+def test_stage_is_a_shared_no_op_without_a_profile():
+    assert profiler.stage("classify") is profiler.stage("retrieve")
+
+
+@pytest.mark.asyncio
+async def test_run_profiled_samples_stages_and_stores_collapsed_stacks():
+    result, profile = await profiler.run_profiled(fake_run())
+
+    assert result == "done"
+    assert [name for name, _ in profile.stages] == ["classify", "reason"]
+    assert "classify;dur=" in profile.server_timing()
+
+    collapsed = profiler.profile_path(profile.id).read_text()
+    busy = [line for line in collapsed.splitlines() if "busy_classify" in line]
+    assert busy and all(";stage:classify;" in line for line in busy)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in collapsed.splitlines())
+
+
+@pytest.mark.asyncio
+async def test_only_the_newest_profiles_are_kept(profile_dir):
+    for _ in range(3):
+        await profiler.run_profiled(asyncio.sleep(0))
+    assert len(list(profile_dir.glob("*.collapsed"))) == 2
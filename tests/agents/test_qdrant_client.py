@@ -0,0 +1,154 @@
+import asyncio
+
+import pytest
+from app.services import qdrant_client
+from app.services.metrics import metrics
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+@pytest.mark.asyncio
+async def test_search_records_latency(mocker):
+    store = mocker.Mock()
+    store.search = mocker.AsyncMock(
+        return_value=[{"id": "1", "score": 0.9, "data": {}}]
+    )
+    mocker.patch("app.services.qdrant_client.get_vector_store", return_value=store)
+
+    results = await qdrant_client.search([0.1, 0.2], limit=1)
+
+    assert results[0]["id"] == "1"
+    assert metrics.snapshot()["timers"]["vector_store.search"]["count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_search_times_out_and_counts_error(mocker):
+    async def slow_search(vector, limit, filters=None, boosts=None, fields=None):
+        await asyncio.sleep(1)
+
+    store = mocker.Mock()
+    store.search = slow_search
+    mocker.patch("app.services.qdrant_client.get_vector_store", return_value=store)
+    mocker.patch("app.services.qdrant_client.settings.QDRANT_TIMEOUT", 0.01)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await qdrant_client.search([0.1, 0.2])
+
+    assert metrics.snapshot()["counters"]["vector_store.search.errors"] == 1
+
+
+def test_query_request_pushes_filter_and_boost_into_qdrant():
+    from app.services.vector_store import QdrantVectorStore
+
+    store = QdrantVectorStore("http://localhost:6333", "policies")
+    plain = store._query_request([0.1, 0.2], 5, {"provider": ["Reddit"]}, None)
+    boosted = store._query_request(
+        [0.1, 0.2], 5, {"provider": ["Reddit"]}, {"type": {"legal_framework": 0.15}}
+    )
+
+    assert plain.filter.must[0].match.any == ["Reddit"]
+    assert plain.prefetch is None
+    assert boosted.prefetch.filter.must[0].key == "provider"
+    assert boosted.prefetch.limit == 20
+    assert boosted.query.formula.sum[0] == "$score"
+    assert boosted.query.formula.sum[1].mult[0] == 0.15
+
+
+def test_collection_config_enables_int8_quantization_with_rescoring():
+    from app.services.vector_store import CollectionConfig
+
+    config = CollectionConfig(hnsw_m=32, int8_quantization=True, on_disk_vectors=True)
+
+    kwargs = config.collection_kwargs(384)
+    params = config.search_params()
+
+    assert kwargs["hnsw_config"].m == 32
+    assert kwargs["vectors_config"].on_disk is True
+    assert kwargs["quantization_config"].scalar.type == "int8"
+    assert params.quantization.rescore is True
+    assert CollectionConfig().search_params().quantization is None
+
+
+def test_hybrid_request_fuses_boosted_dense_and_lexical_rankings():
+    from app.services.vector_store import QdrantVectorStore
+
+    store = QdrantVectorStore("http://localhost:6333", "policies")
+    request = store._hybrid_request(
+        [0.1, 0.2],
+        ([7, 42], [1.0, 1.0]),
+        5,
+        {"provider": ["Reddit"]},
+        {"type": {"legal_framework": 0.15}},
+    )
+
+    dense, lexical = request.prefetch
+    assert request.query.fusion == "rrf"
+    assert dense.query.formula.sum[0] == "$score"
+    assert dense.prefetch.limit == 20
+    assert lexical.using == "lexical"
+    assert lexical.query.indices == [7, 42]
+    assert lexical.filter.must[0].key == "provider"
+
+
+@pytest.mark.asyncio
+async def test_hybrid_search_recalls_keyword_match_in_one_request():
+    from app.services.bm25 import sparse_query, sparse_terms
+    from app.services.vector_store import CollectionConfig, QdrantVectorStore
+    from qdrant_client import AsyncQdrantClient
+
+    store = QdrantVectorStore(
+        ":memory:", "policies", CollectionConfig(sparse_vectors=True)
+    )
+    store.client = AsyncQdrantClient(location=":memory:")
+    texts = ["no slurs allowed", "threats of violence", "spam links removed"]
+    ids = [f"00000000-0000-0000-0000-00000000000{i}" for i in range(3)]
+    await store.init_collection(2)
+    assert store.supports_hybrid
+    await store.add(
+        ids,
+        [[1.0, 0.0], [0.9, 0.1], [0.8, 0.2]],
+        [{"content": t} for t in texts],
+        [sparse_terms(t) for t in texts],
+    )
+
+    dense = await store.search([1.0, 0.0], limit=1)
+    hybrid = await store.hybrid_search_batch(
+        [[1.0, 0.0]], [sparse_query("spam links")], limit=3
+    )
+
+    assert dense[0]["data"]["content"] == "no slurs allowed"
+    assert hybrid[0][0]["data"]["content"] == "spam links removed"
+    # Ordered by fusion, but scored by dense similarity
+    assert hybrid[0][0]["score"] == pytest.approx(0.8 / (0.8**2 + 0.2**2) ** 0.5)
+
+
+@pytest.mark.asyncio
+async def test_hybrid_follows_the_collection_schema_not_the_setting():
+    from app.services.bm25 import sparse_terms
+    from app.services.vector_store import CollectionConfig, QdrantVectorStore
+    from qdrant_client import AsyncQdrantClient
+
+    client = AsyncQdrantClient(location=":memory:")
+    # A collection built before HYBRID_FUSION=server, without sparse vectors
+    old = QdrantVectorStore(":memory:", "policies", CollectionConfig())
+    old.client = client
+    await old.init_collection(2)
+    store = QdrantVectorStore(
+        ":memory:", "policies", CollectionConfig(sparse_vectors=True)
+    )
+    store.client = client
+    await store.refresh_schema()
+
+    assert not store.supports_hybrid
+    await store.add(
+        ["00000000-0000-0000-0000-000000000001"],
+        [[1.0, 0.0]],
+        [{"content": "no slurs"}],
+        [sparse_terms("no slurs")],
+    )
+    assert await store.count() == 1
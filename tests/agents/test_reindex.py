@@ -0,0 +1,124 @@
+import asyncio
+import fcntl
+import hashlib
+
+import numpy as np
+import pytest
+from app.models.policies import PolicyInput
+from app.services import reindex
+from app.services.bm25 import get_bm25_index
+from app.services.content_store import ContentStore
+from app.services.policy_store import store_policy
+from app.services.vector_store import get_vector_store
+from app.services.versions import read_state
+from app.utils.exceptions import PolicyLoadError
+
+
+def fake_embed(texts):
+    vectors = []
+    for text in texts:
+        seed = int(hashlib.sha1(text.encode()).hexdigest()[:8], 16)
+        vectors.append(np.random.default_rng(seed).normal(size=8).tolist())
+    return vectors
+
+
+@pytest.fixture
+def env(mocker, tmp_path):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    embedder = mocker.Mock(dimension=8)
+    embedder.embed_batch.side_effect = fake_embed
+    for target in (
+        "app.services.policy_loader.get_embedding_service",
+        "app.services.ingestion.get_embedding_service",
+        "app.services.qdrant_client.get_embedding_service",
+        "app.services.reindex.get_embedding_service",
+    ):
+        mocker.patch(target, return_value=embedder)
+    mocker.patch(
+        "app.services.ingestion.get_content_store",
+        return_value=ContentStore(str(tmp_path / "content.db")),
+    )
+    settings = "app.services.reindex.settings"
+    mocker.patch(f"{settings}.VECTOR_BACKEND", "local")
+    mocker.patch(f"{settings}.INDEX_VERSIONS_DIR", str(tmp_path / "versions"))
+    mocker.patch(f"{settings}.INDEX_VERSION_STATE_PATH", str(tmp_path / "state.json"))
+    mocker.patch(f"{settings}.INDEX_MANIFEST_PATH", str(tmp_path / "manifest.json"))
+    return docs, tmp_path / "versions"
+
+
+@pytest.mark.asyncio
+async def test_reindex_switches_versions_and_rolls_back(env):
+    docs, versions = env
+    (docs / "a.txt").write_text("Rules:\n- no slurs\n\nEnforcement:\n- bans")
+
+    first = await reindex.reindex_policies(str(docs))
+    assert read_state() == {"active": first.version, "previous": None}
+    assert len(get_vector_store()._ids) == 2
+    assert get_bm25_index().search("slurs")[0]["data"]["parent_id"] == "a.txt"
+
+    (docs / "b.txt").write_text("Rules:\n- no threats")
+    second = await reindex.reindex_policies(str(docs))
+    assert second.previous == first.version
+    assert len(get_vector_store()._ids) == 3
+    assert get_bm25_index().search("threats")
+
+    assert await reindex.rollback() == first.version
+    assert len(get_vector_store()._ids) == 2
+    assert get_bm25_index().search("threats") == []
+
+    # Only the active and previous versions are kept
+    third = await reindex.reindex_policies(str(docs))
+    assert sorted(p.name for p in versions.iterdir() if p.is_dir()) == sorted(
+        [first.version, third.version]
+    )
+
+
+@pytest.mark.asyncio
+async def test_reindex_keeps_policies_added_through_the_api(env):
+    docs, _ = env
+    (docs / "a.txt").write_text("Rules:\n- no slurs")
+    await reindex.reindex_policies(str(docs))
+    policy_id = await store_policy(
+        PolicyInput(text="Rules:\n- no doxxing", provider="Reddit", type="rules")
+    )
+
+    second = await reindex.reindex_policies(str(docs))
+
+    assert second.carried == 1
+    hit = get_bm25_index().search("doxxing")[0]
+    assert hit["data"]["parent_id"] == policy_id
+    vector = fake_embed([hit["data"]["content"]])[0]
+    results = await get_vector_store().search(vector, limit=1)
+    assert results[0]["data"]["parent_id"] == policy_id
+
+
+@pytest.mark.asyncio
+async def test_failed_validation_keeps_active_version(mocker, env):
+    docs, versions = env
+    (docs / "a.txt").write_text("Rules:\n- no slurs")
+    first = await reindex.reindex_policies(str(docs))
+
+    (docs / "a.txt").write_text("Rules:\n- no slurs or threats")
+    mocker.patch("app.services.reindex.search_batch", return_value=[[]])
+    with pytest.raises(PolicyLoadError):
+        await reindex.reindex_policies(str(docs))
+
+    assert read_state()["active"] == first.version
+    assert [p.name for p in versions.iterdir() if p.is_dir()] == [first.version]
+
+
+@pytest.mark.asyncio
+async def test_version_changes_wait_for_the_lock_held_by_another_process(env):
+    docs, versions = env
+    (docs / "a.txt").write_text("Rules:\n- no slurs")
+    await reindex.reindex_policies(str(docs))
+
+    with open(versions / reindex.LOCK_FILENAME, "a") as other_process:
+        fcntl.flock(other_process, fcntl.LOCK_EX)
+        pending = asyncio.create_task(reindex.reindex_policies(str(docs)))
+        await asyncio.sleep(0.3)
+        assert not pending.done()
+        fcntl.flock(other_process, fcntl.LOCK_UN)
+
+    assert (await asyncio.wait_for(pending, 5)).previous is not None
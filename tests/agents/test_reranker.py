@@ -0,0 +1,56 @@
+import time
+
+import pytest
+
+from app.services.metrics import metrics
+from app.services.reranker import CrossEncoderReranker
+
+
+class FakeCrossEncoder:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.pairs_scored = 0
+
+    def predict(self, pairs, batch_size=32, show_progress_bar=False):
+        time.sleep(self.delay)
+        self.pairs_scored += len(pairs)
+        # Longer passages are "more relevant"
+        return [len(passage) / 10 - 2 for _, passage in pairs]
+
+
+def make_reranker(model, cache_size=128):
+    reranker = CrossEncoderReranker(model_name="fake", cache_size=cache_size)
+    reranker._model = model
+    return reranker
+
+
+def test_score_caches_repeated_pairs():
+    model = FakeCrossEncoder()
+    reranker = make_reranker(model)
+
+    first = reranker.score("query", ["short", "a much longer passage"])
+    second = reranker.score("query", ["a much longer passage", "new one"])
+
+    assert all(0.0 <= s <= 1.0 for s in first + second)
+    assert first[1] > first[0]
+    assert second[0] == first[1]
+    assert model.pairs_scored == 3
+
+
+def test_cache_is_bounded():
+    reranker = make_reranker(FakeCrossEncoder(), cache_size=2)
+
+    reranker.score("q", ["one", "two", "three"])
+
+    assert len(reranker._cache) == 2
+
+
+@pytest.mark.asyncio
+async def test_score_within_budget_falls_back_on_timeout():
+    metrics.reset()
+    reranker = make_reranker(FakeCrossEncoder(delay=0.2))
+
+    scores = await reranker.score_within_budget("q", ["passage"], budget_ms=10)
+
+    assert scores is None
+    assert metrics.snapshot()["counters"]["retrieval.rerank.fallbacks"] == 1
@@ -0,0 +1,81 @@
+import orjson
+import pytest
+from app.api.responses import analysis_projection, render
+from app.models.schemas import (
+    ActionRecommendation,
+    ActionType,
+    ConfidenceLevel,
+    DetailedAnalyzeResponse,
+    HateSpeechClassification,
+    PolicySummary,
+    SeverityLevel,
+)
+from fastapi import HTTPException
+
+
+@pytest.fixture
+def response():
+    return DetailedAnalyzeResponse(
+        hate_speech=HateSpeechClassification(
+            classification="Hate", confidence=ConfidenceLevel.HIGH, reason="Slur"
+        ),
+        policies=[
+            PolicySummary(
+                id="p1",
+                source="Meta",
+                summary="Hate Speech: No attacks on protected groups.\nApplies.",
+                relevance_score=91.2,
+            )
+        ],
+        reasoning="Violates Meta's hate speech policy.",
+        action=ActionRecommendation(
+            action=ActionType.ESCALATE,
+            severity=SeverityLevel.HIGH,
+            reasoning="Escalate due to serious hate speech.",
+        ),
+    )
+
+
+def test_render_defaults_to_the_full_response(response):
+    body = orjson.loads(render(response, analysis_projection(None)).body)
+    assert body == response.model_dump(mode="json")
+
+
+def test_without_policy_text_only_references_remain(response):
+    include = analysis_projection(None, include_policy_text=False)
+    body = orjson.loads(render(response, include).body)
+
+    assert "reasoning" not in body
+    assert body["hate_speech"] == {"classification": "Hate", "confidence": "High"}
+    assert body["action"] == {"action": "ESCALATE", "severity": "High"}
+    assert body["policies"] == [{"id": "p1", "source": "Meta", "relevance_score": 91.2}]
+
+
+def test_fields_selects_top_level_fields(response):
+    include = analysis_projection("hate_speech, action")
+    body = orjson.loads(render(response, include).body)
+    assert set(body) == {"hate_speech", "action"}
+
+
+def test_unknown_fields_are_rejected():
+    with pytest.raises(HTTPException) as error:
+        analysis_projection("hate_speech,summary")
+    assert error.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_analyze_without_query_string_returns_the_full_body(mocker, response):
+    import httpx
+    from app.api import routes
+    from fastapi import FastAPI
+
+    mocker.patch.object(routes.orchestrator, "run", return_value=response)
+    app = FastAPI()
+    app.include_router(routes.router)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        reply = await client.post("/api/v1/analyze", json={"text": "hello there"})
+
+    assert reply.status_code == 200
+    assert reply.json() == response.model_dump(mode="json")
@@ -110,3 +110,253 @@ def test_score_and_explain_keywords_boost():
     )
     assert scored[0]["score"] > 0.5
     assert "Matched" in scored[0]["explanation"]
+
+
+def test_aggregate_chunks_groups_by_parent():
+    retriever = HybridRetriever()
+    hits = [
+        {
+            "id": "c2",
+            "score": 0.8,
+            "data": {
+                "parent_id": "reddit_policy.txt",
+                "chunk_index": 2,
+                "section": "Enforcement Actions",
+                "content": "Enforcement Actions:\n- Bans",
+                "title": "Reddit Policy",
+            },
+        },
+        {
+            "id": "c1",
+            "score": 0.6,
+            "data": {
+                "parent_id": "reddit_policy.txt",
+                "chunk_index": 1,
+                "section": "Prohibited Content",
+                "content": "Prohibited Content:\n- Slurs",
+                "title": "Reddit Policy",
+            },
+        },
+        {"id": "p9", "score": 0.5, "data": {"content": "Standalone policy"}},
+    ]
+
+    parents = retriever._aggregate_chunks(hits)
+
+    assert [p["id"] for p in parents] == ["reddit_policy.txt", "p9"]
+    assert parents[0]["score"] == 0.8
+    assert parents[0]["data"]["content"] == (
+        "Prohibited Content:\n- Slurs\n\nEnforcement Actions:\n- Bans"
+    )
+
+
+@pytest.mark.asyncio
+async def test_execute_recalls_keyword_only_matches(mocker):
+    mocker.patch(
+        "app.agents.retriever.search_policies",
+        return_value=[
+            {
+                "id": "d1",
+                "score": 0.7,
+                "data": {"parent_id": "meta", "title": "Meta", "content": "Hate"},
+            }
+        ],
+    )
+    mocker.patch(
+        "app.agents.retriever.keyword_search",
+        return_value=[
+            {
+                "id": "k1",
+                "score": 4.2,
+                "data": {
+                    "parent_id": "india",
+                    "title": "IPC 153A",
+                    "content": "enmity",
+                },
+            }
+        ],
+    )
+    classification = ClassificationResult(
+        label=ClassificationLabel.hate, confidence=0.9, reasoning="promotes enmity"
+    )
+
+    result = await HybridRetriever()._execute("they promote enmity", classification)
+
+    assert {p.id for p in result.policies} == {"meta", "india"}
+    assert result.total_candidates == 2
+
+
+def test_score_and_explain_uses_precomputed_terms():
+    retriever = HybridRetriever()
+    classification = ClassificationResult(
+        label=ClassificationLabel.toxic, confidence=0.9, reasoning="abusive threats"
+    )
+    results = [
+        {
+            "id": "p1",
+            "score": 0.4,
+            "data": {
+                "title": "Policy",
+                "content": "",
+                "terms": ["abuse", "threats"],
+                "type": "general",
+            },
+        },
+        {"id": "p2", "score": 0.4, "data": {"title": "Other", "content": "unrelated"}},
+    ]
+
+    scored = retriever._score_and_explain(results, "text", classification)
+
+    # "threats" (reasoning, 0.05) + "abuse" (label, 0.1)
+    assert scored[0]["score"] == pytest.approx(0.55)
+    assert scored[1]["score"] == pytest.approx(0.4)
+    assert "threats" in scored[0]["explanation"]
+
+
+@pytest.mark.asyncio
+async def test_cross_encoder_rerank_reorders_and_reports(mocker):
+    from app.services.metrics import metrics
+
+    metrics.reset()
+    reranker = mocker.Mock()
+    reranker.score_within_budget = mocker.AsyncMock(return_value=[0.1, 0.2, 0.9, 0.3])
+    mocker.patch("app.agents.retriever.get_reranker", return_value=reranker)
+    ranked = [
+        {"id": str(i), "score": 0.5, "data": {"title": f"P{i}"}, "matched_terms": []}
+        for i in range(4)
+    ]
+
+    retriever = HybridRetriever()
+    reranked = await retriever._cross_encoder_rerank("text", ranked, "hate")
+
+    assert [r["id"] for r in reranked] == ["2", "3", "1", "0"]
+    assert reranked[0]["score"] == 0.9
+    assert metrics.snapshot()["counters"]["retrieval.rerank.top_k_changed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cross_encoder_rerank_keeps_order_on_fallback(mocker):
+    reranker = mocker.Mock()
+    reranker.score_within_budget = mocker.AsyncMock(return_value=None)
+    mocker.patch("app.agents.retriever.get_reranker", return_value=reranker)
+    ranked = [
+        {"id": "a", "score": 0.7, "data": {}},
+        {"id": "b", "score": 0.6, "data": {}},
+    ]
+
+    retriever = HybridRetriever()
+
+    assert await retriever._cross_encoder_rerank("text", ranked, "hate") is ranked
+
+
+@pytest.mark.asyncio
+async def test_execute_passes_filters_and_type_boost_to_search(mocker):
+    mock_search = mocker.patch("app.agents.retriever.search_policies", return_value=[])
+    mock_keyword = mocker.patch("app.agents.retriever.keyword_search", return_value=[])
+    classification = ClassificationResult(
+        label=ClassificationLabel.hate, confidence=0.9, reasoning="slurs"
+    )
+    filters = {"provider": ["Reddit"]}
+
+    await HybridRetriever()._execute("text", classification, filters)
+
+    kwargs = mock_search.call_args.kwargs
+    assert kwargs["filters"] == filters
+    assert kwargs["boosts"]["type"]["legal_framework"] == 0.15
+    assert mock_keyword.call_args.kwargs["filters"] == filters
+
+
+@pytest.mark.asyncio
+async def test_execute_loads_candidate_content_in_one_lookup(mocker):
+    hits = [
+        {
+            "id": f"c{i}",
+            "score": 0.9 - i * 0.1,
+            "data": {"parent_id": f"p{i}", "title": f"P{i}", "chunk_index": 0},
+        }
+        for i in range(5)
+    ]
+    search = mocker.patch("app.agents.retriever.search_policies", return_value=hits)
+    mocker.patch("app.agents.retriever.keyword_search", return_value=[])
+    fetch = mocker.patch(
+        "app.agents.retriever.fetch_contents",
+        side_effect=lambda ids: {i: f"text of {i}" for i in ids},
+    )
+    classification = ClassificationResult(
+        label=ClassificationLabel.neutral, confidence=0.9, reasoning="fine"
+    )
+
+    result = await HybridRetriever()._execute("text", classification)
+
+    assert "content" not in search.call_args.kwargs["fields"]
+    assert "terms" not in search.call_args.kwargs["fields"]
+    fetch.assert_awaited_once_with(["c0", "c1", "c2", "c3", "c4"])
+    assert [p.content for p in result.policies] == [
+        "text of c0",
+        "text of c1",
+        "text of c2",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_execute_scores_keywords_on_loaded_content(mocker):
+    hits = [
+        {"id": f"c{i}", "score": 0.5, "data": {"parent_id": f"p{i}", "title": "P"}}
+        for i in range(2)
+    ]
+    mocker.patch("app.agents.retriever.search_policies", return_value=hits)
+    mocker.patch("app.agents.retriever.keyword_search", return_value=[])
+    mocker.patch(
+        "app.agents.retriever.fetch_contents",
+        return_value={"c0": "nothing here", "c1": "abuse is removed"},
+    )
+    classification = ClassificationResult(
+        label=ClassificationLabel.toxic, confidence=0.9, reasoning="bad"
+    )
+
+    result = await HybridRetriever()._execute("text", classification)
+
+    assert [p.id for p in result.policies] == ["p1", "p0"]
+    assert result.policies[0].relevance_score == pytest.approx(0.6)
+
+
+@pytest.mark.asyncio
+async def test_run_batch_searches_once_with_per_item_boosts(mocker):
+    hits = [{"id": "c0", "score": 0.9, "data": {"parent_id": "p0", "title": "P0"}}]
+    search = mocker.patch(
+        "app.agents.retriever.search_policies_batch", return_value=[hits, []]
+    )
+    mocker.patch("app.agents.retriever.keyword_search", return_value=[])
+    fetch = mocker.patch(
+        "app.agents.retriever.fetch_contents",
+        side_effect=lambda ids: {i: f"text of {i}" for i in ids},
+    )
+    classifications = [
+        ClassificationResult(label=label, confidence=0.9, reasoning="r")
+        for label in (ClassificationLabel.hate, ClassificationLabel.neutral)
+    ]
+
+    results = await HybridRetriever().run_batch(["one", "two"], classifications)
+
+    search.assert_awaited_once()
+    assert search.call_args.args[0] == ["one", "two"]
+    boosts = search.call_args.kwargs["boosts"]
+    assert boosts[0]["type"]["legal_framework"] == 0.15
+    assert boosts[1] != boosts[0]
+    fetch.assert_awaited_once_with(["c0"])
+    assert [p.content for p in results[0].policies] == ["text of c0"]
+    assert results[1].policies == []
+
+
+@pytest.mark.asyncio
+async def test_execute_uses_server_side_fusion_when_available(mocker):
+    mocker.patch("app.agents.retriever.hybrid_enabled", return_value=True)
+    search = mocker.patch("app.agents.retriever.search_policies", return_value=[])
+    keyword = mocker.patch("app.agents.retriever.keyword_search")
+    classification = ClassificationResult(
+        label=ClassificationLabel.hate, confidence=0.9, reasoning="slurs"
+    )
+
+    await HybridRetriever()._execute("text", classification)
+
+    assert search.call_args.kwargs["keyword_query"] == "text slurs"
+    keyword.assert_not_called()
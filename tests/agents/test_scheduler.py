@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+from app.services.metrics import metrics
+from app.services.scheduler import Lane, LaneScheduler, current_lane
+
+WEIGHTS = {Lane.INTERACTIVE: 3, Lane.BULK: 1}
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+async def hold(scheduler, lane, release: asyncio.Event, order: list = None):
+    async with scheduler.slot(lane):
+        if order is not None:
+            order.append(lane)
+        await release.wait()
+
+
+@pytest.mark.asyncio
+async def test_bulk_cannot_take_reserved_slots():
+    scheduler = LaneScheduler("test", capacity=2, reserved=1, weights=WEIGHTS)
+    release = asyncio.Event()
+    bulk = [asyncio.create_task(hold(scheduler, Lane.BULK, release)) for _ in range(2)]
+    await asyncio.sleep(0)
+    assert scheduler.in_flight[Lane.BULK] == 1
+    assert len(scheduler._waiters[Lane.BULK]) == 1
+
+    interactive = asyncio.create_task(hold(scheduler, Lane.INTERACTIVE, release))
+    await asyncio.sleep(0)
+    assert scheduler.in_flight[Lane.INTERACTIVE] == 1
+
+    release.set()
+    await asyncio.gather(*bulk, interactive)
+    assert sum(scheduler.in_flight.values()) == 0
+    timers = metrics.snapshot()["timers"]
+    assert "scheduler.test.queue_wait.bulk" in timers
+    assert "scheduler.test.queue_wait.interactive" in timers
+
+
+@pytest.mark.asyncio
+async def test_waiting_lanes_are_served_by_weight():
+    scheduler = LaneScheduler("test", capacity=1, reserved=0, weights=WEIGHTS)
+    gate = asyncio.Event()
+    blocker = asyncio.create_task(hold(scheduler, Lane.BULK, gate))
+    await asyncio.sleep(0)
+
+    order = []
+    release = asyncio.Event()
+    release.set()
+    waiters = [
+        asyncio.create_task(hold(scheduler, lane, release, order))
+        for lane in [Lane.BULK] * 4 + [Lane.INTERACTIVE] * 6
+    ]
+    await asyncio.sleep(0)
+    gate.set()
+    await asyncio.gather(blocker, *waiters)
+
+    # Interactive (weight 3) gets three turns for each bulk turn
+    assert order[:4] == [Lane.INTERACTIVE] * 3 + [Lane.BULK]
+
+
+@pytest.mark.asyncio
+async def test_slot_defaults_to_the_current_lane():
+    scheduler = LaneScheduler("test", capacity=1, reserved=0, weights=WEIGHTS)
+    token = current_lane.set(Lane.BULK)
+    try:
+        async with scheduler.slot():
+            assert scheduler.in_flight[Lane.BULK] == 1
+    finally:
+        current_lane.reset(token)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_the_queue():
+    scheduler = LaneScheduler("test", capacity=1, reserved=0, weights=WEIGHTS)
+    release = asyncio.Event()
+    running = asyncio.create_task(hold(scheduler, Lane.INTERACTIVE, release))
+    waiting = asyncio.create_task(hold(scheduler, Lane.INTERACTIVE, release))
+    await asyncio.sleep(0)
+
+    waiting.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+    assert not scheduler._waiters[Lane.INTERACTIVE]
+
+    release.set()
+    await running
+    assert scheduler.in_flight[Lane.INTERACTIVE] == 0
@@ -0,0 +1,120 @@
+import hashlib
+
+import numpy as np
+import pytest
+from app.services import reindex, snapshot
+from app.services.bm25 import get_bm25_index
+from app.services.content_store import ContentStore
+from app.services.vector_store import get_vector_store
+from app.services.versions import read_state
+from app.utils.exceptions import PolicyLoadError
+
+
+def fake_embed(texts):
+    vectors = []
+    for text in texts:
+        seed = int(hashlib.sha1(text.encode()).hexdigest()[:8], 16)
+        vectors.append(np.random.default_rng(seed).normal(size=8).tolist())
+    return vectors
+
+
+def use_node(mocker, root):
+    """Point the index state at `root`, as if running on a fresh node."""
+    settings = "app.services.reindex.settings"
+    mocker.patch(f"{settings}.INDEX_VERSIONS_DIR", str(root / "versions"))
+    mocker.patch(f"{settings}.INDEX_VERSION_STATE_PATH", str(root / "state.json"))
+    mocker.patch(f"{settings}.INDEX_MANIFEST_PATH", str(root / "manifest.json"))
+    contents = ContentStore(str(root / "content.db"))
+    for module in ("ingestion", "snapshot"):
+        mocker.patch(f"app.services.{module}.get_content_store", return_value=contents)
+    return contents
+
+
+@pytest.fixture
+def embedder(mocker):
+    embedder = mocker.Mock(dimension=8)
+    embedder.embed_batch.side_effect = fake_embed
+    for module in (
+        "policy_loader",
+        "ingestion",
+        "qdrant_client",
+        "reindex",
+        "snapshot",
+    ):
+        mocker.patch(
+            f"app.services.{module}.get_embedding_service", return_value=embedder
+        )
+    mocker.patch("app.services.reindex.settings.VECTOR_BACKEND", "local")
+    return embedder
+
+
+@pytest.mark.asyncio
+async def test_restore_serves_snapshot_without_reembedding(mocker, tmp_path, embedder):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "a.txt").write_text("Rules:\n- no slurs\n\nEnforcement:\n- bans")
+    use_node(mocker, tmp_path / "old")
+    built = await reindex.reindex_policies(str(docs))
+    path = str(tmp_path / "policies.npz")
+    exported = await snapshot.export_snapshot(path)
+    assert exported.points == 2
+
+    contents = use_node(mocker, tmp_path / "new")
+    embedder.embed_batch.reset_mock()
+    assert await get_vector_store().count() == 0
+
+    restored = await snapshot.restore_if_empty(path)
+
+    embedder.embed_batch.assert_not_called()
+    assert restored.version == built.version
+    assert read_state()["active"] == built.version
+    assert len(get_vector_store()._ids) == 2
+    assert get_bm25_index().search("slurs")[0]["data"]["parent_id"] == "a.txt"
+    assert len(contents.get_many(get_vector_store()._ids)) == 2
+    # Already populated: nothing to do
+    assert await snapshot.restore_if_empty(path) is None
+
+
+@pytest.mark.asyncio
+async def test_restore_rejects_dimension_mismatch(mocker, tmp_path, embedder):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "a.txt").write_text("Rules:\n- no slurs")
+    use_node(mocker, tmp_path / "old")
+    await reindex.reindex_policies(str(docs))
+    path = str(tmp_path / "policies.npz")
+    await snapshot.export_snapshot(path)
+
+    use_node(mocker, tmp_path / "new")
+    embedder.dimension = 16
+    with pytest.raises(PolicyLoadError):
+        await snapshot.restore_snapshot(path)
+    assert read_state() == {}
+
+
+@pytest.mark.asyncio
+async def test_export_reads_dense_vectors_from_a_hybrid_collection(mocker, tmp_path):
+    from app.services.bm25 import sparse_terms
+    from app.services.vector_store import CollectionConfig, QdrantVectorStore
+    from qdrant_client import AsyncQdrantClient
+
+    store = QdrantVectorStore(
+        ":memory:", "policies", CollectionConfig(sparse_vectors=True)
+    )
+    store.client = AsyncQdrantClient(location=":memory:")
+    await store.init_collection(2)
+    await store.add(
+        ["00000000-0000-0000-0000-000000000001"],
+        [[0.6, 0.8]],
+        [{"content": "no slurs"}],
+        [sparse_terms("no slurs")],
+    )
+    mocker.patch("app.services.snapshot.get_vector_store", return_value=store)
+    use_node(mocker, tmp_path)
+    path = str(tmp_path / "policies.npz")
+
+    await snapshot.export_snapshot(path)
+
+    written = snapshot._read(path)
+    assert written["meta"]["dimension"] == 2
+    assert written["vectors"].tolist() == [pytest.approx([0.6, 0.8])]
@@ -0,0 +1,119 @@
+import asyncio
+
+import pytest
+from app.api import stream
+from app.services.admission import AdmissionController
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture
+def client(mocker):
+    mocker.patch.object(
+        stream, "analysis_admission", AdmissionController("test", 8, 8, 1)
+    )
+    app = FastAPI()
+    app.include_router(stream.router)
+    return TestClient(app)
+
+
+def fake_result(mocker, label: str):
+    result = mocker.Mock()
+    result.model_dump.return_value = {"hate_speech": {"classification": label}}
+    return result
+
+
+def test_replies_arrive_in_completion_order_with_their_ids(client, mocker):
+    delays = {"slow message": 0.2, "fast message": 0.0}
+
+    async def run(text, filters):
+        await asyncio.sleep(delays[text])
+        return fake_result(mocker, text)
+
+    mocker.patch.object(stream.orchestrator, "run", side_effect=run)
+
+    with client.websocket_connect("/api/v1/ws/analyze") as ws:
+        ws.send_json({"id": "a", "text": "slow message"})
+        ws.send_json({"id": "b", "text": "fast message"})
+        replies = [ws.receive_json(), ws.receive_json()]
+
+    assert [r["id"] for r in replies] == ["b", "a"]
+    assert replies[1]["result"]["hate_speech"]["classification"] == "slow message"
+
+
+def test_invalid_and_failing_messages_get_error_replies(client, mocker):
+    mocker.patch.object(
+        stream.orchestrator, "run", side_effect=ValueError("Input is empty")
+    )
+
+    with client.websocket_connect("/api/v1/ws/analyze") as ws:
+        ws.send_text("not json")
+        invalid = ws.receive_json()
+        ws.send_json({"id": "c", "text": ""})
+        failed = ws.receive_json()
+
+    assert invalid["id"] is None and "Invalid message" in invalid["error"]
+    assert failed == {"id": "c", "error": "Error analyzing input: Input is empty"}
+
+
+@pytest.mark.asyncio
+async def test_stream_stops_reading_at_the_in_flight_limit(mocker):
+    release = asyncio.Event()
+    mocker.patch.object(
+        stream, "analysis_admission", AdmissionController("test", 8, 8, 1)
+    )
+
+    async def blocked(*args):
+        await release.wait()
+
+    mocker.patch.object(stream.orchestrator, "run", side_effect=blocked)
+    websocket = mocker.Mock()
+    messages = [f'{{"id": "{i}", "text": "message {i}"}}' for i in range(5)]
+    websocket.receive_text = mocker.AsyncMock(side_effect=messages)
+    websocket.send_text = mocker.AsyncMock()
+
+    serving = asyncio.create_task(stream.AnalysisStream(websocket, None, 2).serve())
+    await asyncio.sleep(0.01)
+    assert websocket.receive_text.await_count == 2
+
+    serving.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await serving
+
+
+@pytest.mark.asyncio
+async def test_stream_stops_reading_while_the_client_does_not_read(mocker):
+    mocker.patch.object(
+        stream, "analysis_admission", AdmissionController("test", 8, 8, 1)
+    )
+    mocker.patch.object(
+        stream.orchestrator, "run", return_value=fake_result(mocker, "Neutral")
+    )
+    client_reads = asyncio.Event()
+
+    async def send_text(text):
+        await client_reads.wait()
+
+    messages = [f'{{"id": "{i}", "text": "message {i}"}}' for i in range(5)]
+
+    async def receive_text():
+        if messages:
+            return messages.pop(0)
+        await asyncio.Event().wait()
+
+    websocket = mocker.Mock()
+    websocket.receive_text = mocker.AsyncMock(side_effect=receive_text)
+    websocket.send_text = mocker.AsyncMock(side_effect=send_text)
+
+    serving = asyncio.create_task(stream.AnalysisStream(websocket, None, 2).serve())
+    await asyncio.sleep(0.01)
+    # Both analyses are done, but their replies are stuck on the socket
+    assert websocket.receive_text.await_count == 2
+
+    client_reads.set()
+    await asyncio.sleep(0.01)
+    assert websocket.send_text.await_count == 5
+    assert websocket.receive_text.await_count == 6
+    serving.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await serving
@@ -5,7 +5,9 @@ from config import API_URL
 def analyze_text(text: str) -> dict:
     """Send user text to the API and return structured response."""
     payload = {"text": text}
-    response = requests.post(API_URL, json=payload)
+    # Reviewer requests go ahead of bulk backfills on the server
+    headers = {"X-Priority": "interactive"}
+    response = requests.post(API_URL, json=payload, headers=headers)
 
     if response.status_code != 200:
         raise RuntimeError(f"API Error: {response.status_code} - {response.text}")